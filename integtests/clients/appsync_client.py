@@ -102,22 +102,20 @@ class AppSyncClient:
         )
         return self.client.execute(query).get("deleteUserSessions")
 
-    def list_sessions(self):
+    def list_sessions(self, limit=100):
         query = dsl_gql(
             DSLQuery(
-                self.schema.Query.listSessions.select(
-                    self.schema.Session.id,
-                    self.schema.Session.startTime,
-                    self.schema.Session.title,
-                    self.schema.Session.history.select(
-                        self.schema.SessionHistoryItem.type,
-                        self.schema.SessionHistoryItem.content,
-                        self.schema.SessionHistoryItem.metadata,
+                self.schema.Query.listSessions.args(input={"limit": limit}).select(
+                    self.schema.SessionsResult.items.select(
+                        self.schema.Session.id,
+                        self.schema.Session.startTime,
+                        self.schema.Session.title,
                     ),
+                    self.schema.SessionsResult.nextToken,
                 )
             )
         )
-        return self.client.execute(query).get("listSessions")
+        return self.client.execute(query).get("listSessions").get("items")
 
     def get_session(self, id):
         query = dsl_gql(
@@ -12,6 +12,7 @@ export interface ChatBotDynamoDBTablesProps {
 export class ChatBotDynamoDBTables extends Construct {
   public readonly sessionsTable: dynamodb.Table;
   public readonly byUserIdIndex: string = "byUserId";
+  public readonly byUserIdStartTimeIndex: string = "byUserIdStartTime";
 
   constructor(scope: Construct, id: string, props: ChatBotDynamoDBTablesProps) {
     super(scope, id);
@@ -45,6 +46,15 @@ export class ChatBotDynamoDBTables extends Construct {
       partitionKey: { name: "UserId", type: dynamodb.AttributeType.STRING },
     });
 
+    // Lists the sessions of a user by last activity without their history
+    sessionsTable.addGlobalSecondaryIndex({
+      indexName: this.byUserIdStartTimeIndex,
+      partitionKey: { name: "UserId", type: dynamodb.AttributeType.STRING },
+      sortKey: { name: "StartTime", type: dynamodb.AttributeType.STRING },
+      projectionType: dynamodb.ProjectionType.INCLUDE,
+      nonKeyAttributes: ["Title"],
+    });
+
     this.sessionsTable = sessionsTable;
   }
 }
@@ -17,6 +17,7 @@ from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.event_handler.appsync import Router
 from genai_core.auth import UserPermissions
 from decimal import Decimal
+from typing import Optional
 
 tracer = Tracer()
 router = Router()
@@ -24,6 +25,9 @@ logger = Logger()
 permissions = UserPermissions(router)
 
 name_regex = r"^[\w\s+_-]+$"
+memory_strategy_regex = (
+    "^(" + "|".join(s.value for s in genai_core.types.ChatMemoryStrategy) + ")$"
+)
 
 
 class CreateApplicationRequest(BaseModel):
@@ -44,6 +48,9 @@ class CreateApplicationRequest(BaseModel):
     maxTokens: int = Field(ge=1, le=8192)
     temperature: Decimal = Field(ge=0, le=1)
     topP: Decimal = Field(ge=0, le=1)
+    memoryStrategy: Optional[str] = Field(None, pattern=memory_strategy_regex)
+    memoryWindowSize: Optional[int] = Field(None, ge=1, le=100)
+    memoryMaxTokens: Optional[int] = Field(None, ge=100, le=100000)
 
 
 class UpdateApplicationRequest(BaseModel):
@@ -65,6 +72,9 @@ class UpdateApplicationRequest(BaseModel):
     maxTokens: int = Field(ge=1, le=8192)
     temperature: Decimal = Field(ge=0, le=1)
     topP: Decimal = Field(ge=0, le=1)
+    memoryStrategy: Optional[str] = Field(None, pattern=memory_strategy_regex)
+    memoryWindowSize: Optional[int] = Field(None, ge=1, le=100)
+    memoryMaxTokens: Optional[int] = Field(None, ge=100, le=100000)
 
 
 @router.resolver(field_name="listApplications")
@@ -110,6 +120,9 @@ def list_applications():
                 "maxTokens": app.get("MaxTokens", 512),
                 "temperature": app.get("Temperature", 0.6),
                 "topP": app.get("TopP", 0.9),
+                "memoryStrategy": app.get("MemoryStrategy", "buffer"),
+                "memoryWindowSize": app.get("MemoryWindowSize"),
+                "memoryMaxTokens": app.get("MemoryMaxTokens"),
                 "createTime": app.get("CreateTime"),
                 "updateTime": app.get("UpdateTime"),
             }
@@ -164,6 +177,9 @@ def get_application(id: str):
             "maxTokens": app.get("MaxTokens", 512),
             "temperature": app.get("Temperature", 0.6),
             "topP": app.get("TopP", 0.9),
+            "memoryStrategy": app.get("MemoryStrategy", "buffer"),
+            "memoryWindowSize": app.get("MemoryWindowSize"),
+            "memoryMaxTokens": app.get("MemoryMaxTokens"),
             "createTime": app.get("CreateTime"),
             "updateTime": app.get("UpdateTime"),
         }
@@ -224,6 +240,9 @@ def update_application(input: dict):
         request.maxTokens,
         request.temperature,
         request.topP,
+        request.memoryStrategy,
+        request.memoryWindowSize,
+        request.memoryMaxTokens,
     )
 
     return {
@@ -243,6 +262,9 @@ def update_application(input: dict):
         "maxTokens": application.get("MaxTokens", 512),
         "temperature": application.get("Temperature", 0.6),
         "topP": application.get("TopP", 0.9),
+        "memoryStrategy": application.get("MemoryStrategy", "buffer"),
+        "memoryWindowSize": application.get("MemoryWindowSize"),
+        "memoryMaxTokens": application.get("MemoryMaxTokens"),
         "createTime": application.get("CreateTime"),
         "updateTime": application.get("UpdateTime"),
     }
@@ -265,6 +287,9 @@ def _create_application(request: CreateApplicationRequest):
         request.maxTokens,
         request.temperature,
         request.topP,
+        request.memoryStrategy,
+        request.memoryWindowSize,
+        request.memoryMaxTokens,
     )
 
     return {
@@ -284,6 +309,9 @@ def _create_application(request: CreateApplicationRequest):
         "maxTokens": application.get("MaxTokens", 512),
         "temperature": application.get("Temperature", 0.6),
         "topP": application.get("TopP", 0.9),
+        "memoryStrategy": application.get("MemoryStrategy", "buffer"),
+        "memoryWindowSize": application.get("MemoryWindowSize"),
+        "memoryMaxTokens": application.get("MemoryMaxTokens"),
         "createTime": application.get("CreateTime"),
         "updateTime": application.get("UpdateTime"),
     }
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, Field
 from common.constant import SAFE_FILE_NAME_REGEX, UserRole
 from common.validation import WorkspaceIdValidation
@@ -32,25 +33,34 @@ def get_file(fileName: str):
     return result
 
 
+class ListSessionsRequest(BaseModel):
+    limit: int = Field(50, ge=1, le=100)
+    nextToken: Optional[str] = Field(None, min_length=1, max_length=1024)
+
+
 @router.resolver(field_name="listSessions")
 @tracer.capture_method
-def get_sessions():
+def get_sessions(input: Optional[dict] = None):
+    request = ListSessionsRequest(**(input or {}))
     user_id = genai_core.auth.get_user_id(router)
     if user_id is None:
         raise genai_core.types.CommonError("User not found")
 
-    sessions = genai_core.sessions.list_sessions_by_user_id(user_id)
+    result = genai_core.sessions.list_user_sessions(
+        user_id, limit=request.limit, next_token=request.nextToken
+    )
 
-    return [
-        {
-            "id": session.get("SessionId"),
-            "title": session.get("History", [{}])[0]
-            .get("data", {})
-            .get("content", "<no title>"),
-            "startTime": f'{session.get("StartTime")}Z',
-        }
-        for session in sessions
-    ]
+    return {
+        "items": [
+            {
+                "id": session.get("SessionId"),
+                "title": session.get("Title", "<no title>"),
+                "startTime": f'{session.get("StartTime")}Z',
+            }
+            for session in result["items"]
+        ],
+        "nextToken": result["next_token"],
+    }
 
 
 @router.resolver(field_name="getSession")
@@ -8,6 +8,7 @@ import genai_core.types
 import genai_core.kendra
 import genai_core.bedrock_kb
 import genai_core.parameters
+import genai_core.splitters
 import genai_core.workspaces
 from pydantic import BaseModel, Field
 from aws_lambda_powertools import Logger, Tracer
@@ -204,7 +205,7 @@ def _create_workspace_aurora(request: CreateWorkspaceAuroraRequest, config: dict
     if request.metric not in ["inner", "cosine", "l2"]:
         raise genai_core.types.CommonError("Invalid metric")
 
-    if request.chunkingStrategy not in ["recursive"]:
+    if request.chunkingStrategy not in genai_core.splitters.list_chunking_strategies():
         raise genai_core.types.CommonError("Invalid chunking strategy")
 
     if request.chunkSize < 100 or request.chunkSize > 10000:
@@ -268,7 +269,7 @@ def _create_workspace_open_search(
     if len(request.languages) == 0 or len(request.languages) > 3:
         raise genai_core.types.CommonError("Invalid languages")
 
-    if request.chunkingStrategy not in ["recursive"]:
+    if request.chunkingStrategy not in genai_core.splitters.list_chunking_strategies():
         raise genai_core.types.CommonError("Invalid chunking strategy")
 
     if request.chunkSize < 100 or request.chunkSize > 10000:
@@ -112,6 +112,13 @@ def handler(event, context: LambdaContext):
             "systemPromptRag": application_item.get("SystemPromptRag", ""),
             "condenseSystemPrompt": application_item.get("CondenseSystemPrompt", ""),
         }
+        memory = {
+            "strategy": application_item.get("MemoryStrategy", "buffer"),
+        }
+        if application_item.get("MemoryWindowSize") is not None:
+            memory["windowSize"] = int(application_item.get("MemoryWindowSize"))
+        if application_item.get("MemoryMaxTokens") is not None:
+            memory["maxTokens"] = int(application_item.get("MemoryMaxTokens"))
         message = {
             "action": request["action"],
             "modelInterface": request["modelInterface"],
@@ -120,6 +127,7 @@ def handler(event, context: LambdaContext):
             "userId": event["identity"]["sub"],
             "userGroups": user_roles,
             "systemPrompts": system_prompts,
+            "memory": memory,
             "data": {
                 "mode": request["data"]["mode"] or "chain",
                 "text": request["data"]["text"],
@@ -138,6 +138,7 @@ export class ChatBotApi extends Construct {
       ...props,
       sessionsTable: chatTables.sessionsTable,
       byUserIdIndex: chatTables.byUserIdIndex,
+      byUserIdStartTimeIndex: chatTables.byUserIdStartTimeIndex,
       applicationTable: applicationTables.applicationTable,
       api,
       userFeedbackBucket: chatBuckets.userFeedbackBucket,
@@ -24,6 +24,7 @@ export interface ApiResolversProps {
   readonly userPool: cognito.UserPool;
   readonly sessionsTable: dynamodb.Table;
   readonly byUserIdIndex: string;
+  readonly byUserIdStartTimeIndex: string;
   readonly applicationTable: dynamodb.Table;
   readonly filesBucket: s3.Bucket;
   readonly userFeedbackBucket: s3.Bucket;
@@ -72,6 +73,8 @@ export class ApiResolvers extends Construct {
           API_KEYS_SECRETS_ARN: props.shared.apiKeysSecret.secretArn,
           SESSIONS_TABLE_NAME: props.sessionsTable.tableName,
           SESSIONS_BY_USER_ID_INDEX_NAME: props.byUserIdIndex,
+          SESSIONS_BY_USER_ID_START_TIME_INDEX_NAME:
+            props.byUserIdStartTimeIndex,
           APPLICATIONS_TABLE_NAME: props.applicationTable.tableName,
           USER_FEEDBACK_BUCKET_NAME: props.userFeedbackBucket?.bucketName ?? "",
           UPLOAD_BUCKET_NAME: props.ragEngines?.uploadBucket?.bucketName ?? "",
@@ -7,7 +7,7 @@ from aws_lambda_powertools import Logger
 from botocore.exceptions import ClientError, BotoCoreError
 from genai_core.langchain import DynamoDBChatMessageHistory
 import genai_core.clients
-from genai_core.utils.websocket import send_to_client
+from genai_core.utils.websocket import TokenCoalescer, send_to_client
 from genai_core.types import ChatbotAction
 
 logger = Logger()
@@ -74,21 +74,23 @@ def save_session_history(session_id, user_id, prompt, response_content):
             user_id=user_id,
         )
 
-        # Add user message with metadata
-        user_metadata = {
-            "provider": "bedrock-agents",
-            "sessionId": session_id,
-        }
-        chat_history.add_user_message(prompt)
-        chat_history.add_metadata(user_metadata)
+        # Both messages and their metadata are stored with one write
+        with chat_history.write_batch():
+            # Add user message with metadata
+            user_metadata = {
+                "provider": "bedrock-agents",
+                "sessionId": session_id,
+            }
+            chat_history.add_user_message(prompt)
+            chat_history.add_metadata(user_metadata)
 
-        # Add AI message with metadata
-        ai_metadata = {
-            "provider": "bedrock-agents",
-            "sessionId": session_id,
-        }
-        chat_history.add_ai_message(response_content)
-        chat_history.add_metadata(ai_metadata)
+            # Add AI message with metadata
+            ai_metadata = {
+                "provider": "bedrock-agents",
+                "sessionId": session_id,
+            }
+            chat_history.add_ai_message(response_content)
+            chat_history.add_metadata(ai_metadata)
 
         logger.info("Session history saved successfully")
         return True
@@ -100,14 +102,15 @@ def save_session_history(session_id, user_id, prompt, response_content):
         try:
             if chat_history:
                 # Try to save at least the response
-                chat_history.add_ai_message(f"Error occurred: {str(e)}")
-                chat_history.add_metadata(
-                    {
-                        "provider": "bedrock-agents",
-                        "sessionId": session_id,
-                        "error_recovery": True,
-                    }
-                )
+                with chat_history.write_batch():
+                    chat_history.add_ai_message(f"Error occurred: {str(e)}")
+                    chat_history.add_metadata(
+                        {
+                            "provider": "bedrock-agents",
+                            "sessionId": session_id,
+                            "error_recovery": True,
+                        }
+                    )
                 logger.info("Saved error message to session history")
         except Exception as recovery_error:
             logger.error(f"Error recovery failed: {str(recovery_error)}")
@@ -211,7 +214,7 @@ def handle_run(record, context):
         # Handle streaming or standard response
         if "text/event-stream" in response.get("contentType", ""):
             # Handle streaming response
-            sequence_number = 0
+            coalescer = TokenCoalescer(user_id, session_id, send=send_to_client)
             accumulated_content = ""
             for line in response["response"].iter_lines(chunk_size=10):
                 if line:
@@ -239,6 +242,7 @@ def handle_run(record, context):
                         if chunk_data.get("type") == "thinking":
                             thinking_content = chunk_data.get("content")
                             if thinking_content:
+                                coalescer.flush()
                                 send_to_client(
                                     {
                                         "type": "text",
@@ -260,32 +264,15 @@ def handle_run(record, context):
                             chunk_content = chunk_data.get("content")
 
                             if chunk_content:
-                                sequence_number += 1
                                 accumulated_content += chunk_content
                                 # Send streaming token to client
-                                send_to_client(
-                                    {
-                                        "type": "text",
-                                        "action": ChatbotAction.LLM_NEW_TOKEN.value,
-                                        "timestamp": str(
-                                            int(round(datetime.now().timestamp()))
-                                        ),
-                                        "userId": user_id,
-                                        "data": {
-                                            "sessionId": session_id,
-                                            "token": {
-                                                "runId": session_id,
-                                                "sequenceNumber": sequence_number,
-                                                "value": chunk_content,
-                                            },
-                                        },
-                                    }
-                                )
+                                coalescer.add_token(chunk_content, run_id=session_id)
                     except json.JSONDecodeError:
                         continue
 
             # Send final response with accumulated content
             logger.info("Sending final response to end streaming")
+            coalescer.flush()
 
             # Send done thinking step if we had thinking steps
             if accumulated_content:
@@ -6,6 +6,7 @@ from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from genai_core.types import ChatbotAction
+from genai_core.utils.websocket import flush_on_exit
 
 # Import testable functions from separate module
 from bedrock_agents_core import handle_run, handle_heartbeat
@@ -30,6 +31,7 @@ def record_handler(record: SQSRecord, context: LambdaContext):
 
 @logger.inject_lambda_context(log_event=False)
 @tracer.capture_lambda_handler
+@flush_on_exit
 def handler(event, context: LambdaContext):
     batch = event["Records"]
 
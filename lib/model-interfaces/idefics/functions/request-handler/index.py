@@ -13,7 +13,7 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 from genai_core.langchain import DynamoDBChatMessageHistory
 from genai_core.registry import registry
 from genai_core.types import ChatbotAction
-from genai_core.utils.websocket import send_to_client
+from genai_core.utils.websocket import TokenCoalescer, flush_on_exit, send_to_client
 
 print(boto3.__version__)
 
@@ -21,31 +21,13 @@ processor = BatchProcessor(event_type=EventType.SQS)
 tracer = Tracer()
 logger = Logger()
 
-sequence_number = 0
 
-
-def on_llm_new_token(user_id, session_id, self, *args, **kwargs):
+def on_llm_new_token(coalescer: TokenCoalescer, self, *args, **kwargs):
     chunk = args[0]
     if chunk is None or len(chunk) == 0:
         return
-    global sequence_number
-    sequence_number += 1
 
-    send_to_client(
-        {
-            "type": "text",
-            "action": ChatbotAction.LLM_NEW_TOKEN.value,
-            "userId": user_id,
-            "timestamp": str(int(round(datetime.now().timestamp()))),
-            "data": {
-                "sessionId": session_id,
-                "token": {
-                    "sequenceNumber": sequence_number,
-                    "value": chunk,
-                },
-            },
-        }
-    )
+    coalescer.add_token(chunk)
 
 
 def handle_run(record):
@@ -76,8 +58,9 @@ def handle_run(record):
     messages = chat_history.messages
 
     adapter = registry.get_adapter(f"{provider}.{model_id}")
+    coalescer = TokenCoalescer(user_id, session_id)
     adapter.on_llm_new_token = lambda *args, **kwargs: on_llm_new_token(
-        user_id, session_id, *args, **kwargs
+        coalescer, *args, **kwargs
     )
     model = adapter(
         model_id=model_id,
@@ -96,6 +79,7 @@ def handle_run(record):
     ai_response = model.handle_run(
         input=run_input, model_kwargs=model_kwargs, files=files
     )
+    coalescer.flush()
 
     # Add user files and mesage to chat history
     user_message_metadata = {
@@ -108,9 +92,6 @@ def handle_run(record):
         "prompts": [model.clean_prompt(run_input)],
         "files": files or [],
     }
-    chat_history.add_user_message(prompt)
-    chat_history.add_metadata(user_message_metadata)
-
     # Add AI files and message to chat history
     ai_response_metadata = {
         "provider": provider,
@@ -123,8 +104,13 @@ def handle_run(record):
         "files": ai_response.get("files", []),
     }
     ai_text_response = ai_response.get("content", "")
-    chat_history.add_ai_message(ai_text_response)
-    chat_history.add_metadata(ai_response_metadata)
+
+    # Both messages and their metadata are stored with one write
+    with chat_history.write_batch():
+        chat_history.add_user_message(prompt)
+        chat_history.add_metadata(user_message_metadata)
+        chat_history.add_ai_message(ai_text_response)
+        chat_history.add_metadata(ai_response_metadata)
 
     response = {
         "sessionId": session_id,
@@ -203,6 +189,7 @@ def handle_failed_records(records):
 
 @logger.inject_lambda_context(log_event=False)
 @tracer.capture_lambda_handler
+@flush_on_exit
 def handler(event, context: LambdaContext):
     batch = event["Records"]
 
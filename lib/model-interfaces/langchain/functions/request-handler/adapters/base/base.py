@@ -1,5 +1,9 @@
 import os
 import re
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from aws_lambda_powertools import Logger
 from langchain.callbacks.base import BaseCallbackHandler
@@ -16,18 +20,33 @@ from langchain.chains.conversational_retrieval.prompts import (
 )
 from typing import Dict, List, Any
 
-from genai_core.langchain import WorkspaceRetriever, DynamoDBChatMessageHistory
-from genai_core.types import ChatbotMode
+from genai_core.langchain import (
+    WorkspaceRetriever,
+    DynamoDBChatMessageHistory,
+    WindowedChatMessageHistory,
+    summarize_messages,
+)
+from genai_core.types import ChatbotMode, ChatMemoryStrategy
 from genai_core.types import CommonError
 from genai_core.clients import get_bedrock_client
+from genai_core.utils.resources import get_thread_resource
 
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.outputs import LLMResult, ChatGeneration
 from langchain_core.messages.ai import AIMessage, AIMessageChunk
 from langchain_core.messages.human import HumanMessage
+from langchain_core.language_models import BaseLanguageModel
 from langchain_aws import ChatBedrockConverse
 
 logger = Logger()
+# Runs the summary updates while the answers are generated
+memory_executor = ThreadPoolExecutor(max_workers=4)
+
+# The llm clients are reused by the requests of the container for this
+# duration (seconds), the API keys they use can be rotated
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", "300"))
+llm_cache: Dict[tuple, tuple] = {}
+llm_cache_lock = threading.Lock()
 
 
 class Mode(Enum):
@@ -80,11 +99,14 @@ class ModelAdapter:
         mode=ChatbotMode.CHAIN.value,
         disable_streaming=False,
         model_kwargs={},
+        memory={},
     ):
         self.session_id = session_id
         self.user_id = user_id
         self._mode = mode
         self.model_kwargs = model_kwargs
+        self.memory = memory
+        self.memory_update = None
         # Disable streaming since the guardrails are applied after the full response
         # With the exception of Bedrock models
         self.disable_streaming = (
@@ -95,7 +117,7 @@ class ModelAdapter:
         self.__bind_callbacks()
 
         self.chat_history = self.get_chat_history()
-        self.llm = self.get_llm(model_kwargs)
+        self.llm = self.get_cached_llm(model_kwargs)
 
     def __bind_callbacks(self):
         callback_methods = [method for method in dir(self) if method.startswith("on_")]
@@ -172,6 +194,42 @@ class ModelAdapter:
     def get_embeddings_model(self, embeddings):
         raise ValueError("embeddings must be implemented")
 
+    def get_cached_llm(self, model_kwargs={}):
+        """Returns the llm of get_llm(). It is created once per adapter,
+        model and model_kwargs for LLM_CACHE_TTL seconds, each request gets
+        a copy with its own callbacks."""
+        try:
+            key = (
+                type(self).__module__,
+                type(self).__qualname__,
+                getattr(self, "model_id", None),
+                self.disable_streaming,
+                json.dumps(model_kwargs, sort_keys=True, default=str),
+            )
+        except (TypeError, ValueError):
+            return self.get_llm(model_kwargs)
+
+        now = time.monotonic()
+        with llm_cache_lock:
+            cached = llm_cache.get(key)
+        if cached is not None and now - cached[1] < LLM_CACHE_TTL:
+            return cached[0].model_copy(update={"callbacks": [self.callback_handler]})
+
+        llm = self.get_llm(model_kwargs)
+        if LLM_CACHE_TTL <= 0 or not isinstance(llm, BaseLanguageModel):
+            return llm
+
+        try:
+            cached_llm = llm.model_copy(update={"callbacks": None})
+        except AttributeError:
+            logger.debug("The llm can not be copied, it is not cached")
+            return llm
+
+        with llm_cache_lock:
+            llm_cache[key] = (cached_llm, now)
+
+        return llm
+
     def get_chat_history(self):
         return DynamoDBChatMessageHistory(
             table_name=os.environ["SESSIONS_TABLE_NAME"],
@@ -179,14 +237,88 @@ class ModelAdapter:
             user_id=self.user_id,
         )
 
+    def get_summary_history(self):
+        """Returns the chat history used by the background summary update.
+        The boto3 resources are not thread safe, it uses the DynamoDB
+        resource of the memory thread instead of the one of the request."""
+        return DynamoDBChatMessageHistory(
+            table_name=os.environ["SESSIONS_TABLE_NAME"],
+            session_id=self.session_id,
+            user_id=self.user_id,
+            dynamodb=get_thread_resource("dynamodb"),
+        )
+
+    def get_memory_history(self):
+        """Returns the part of the chat history used in the prompts, based
+        on the memory strategy of the application."""
+        try:
+            strategy = ChatMemoryStrategy(
+                self.memory.get("strategy") or ChatMemoryStrategy.BUFFER.value
+            )
+        except ValueError:
+            logger.warning("Unknown memory strategy", memory=self.memory)
+            strategy = ChatMemoryStrategy.BUFFER
+
+        if strategy == ChatMemoryStrategy.BUFFER:
+            return self.chat_history
+
+        return WindowedChatMessageHistory(
+            self.chat_history,
+            strategy,
+            window_size=self.memory.get("windowSize"),
+            max_tokens=self.memory.get("maxTokens"),
+        )
+
     def get_memory(self, output_key=None, return_messages=False):
         return ConversationBufferMemory(
             memory_key="chat_history",
-            chat_memory=self.chat_history,
+            chat_memory=self.get_memory_history(),
             return_messages=return_messages,
             output_key=output_key,
         )
 
+    def get_summary_llm(self):
+        llm = self.get_cached_llm({"streaming": False})
+        # The summary is not part of the answer (prompts, usage and tokens)
+        llm.callbacks = None
+        return llm
+
+    def start_memory_update(self):
+        """Adds the turns that left the memory window to the rolling summary
+        of the session in the background, the next turns use it."""
+        memory_history = self.get_memory_history()
+        if not isinstance(memory_history, WindowedChatMessageHistory):
+            return
+
+        try:
+            update = memory_history.get_summary_update()
+            if update is None:
+                return
+            llm = self.get_summary_llm()
+        except Exception as e:
+            logger.exception(e)
+            return
+
+        summary, messages, message_count = update
+        self.memory_update = memory_executor.submit(
+            self._update_summary, llm, summary, messages, message_count
+        )
+
+    def _update_summary(self, llm, summary, messages, message_count):
+        try:
+            summary = summarize_messages(llm, summary, messages)
+            self.get_summary_history().update_summary(summary, message_count)
+        except Exception as e:
+            # The previous summary and the window are used until it succeeds
+            logger.exception(e)
+
+    def wait_for_memory_update(self):
+        """Waits for the background summary update, for example before the
+        function is frozen once the response is sent."""
+        if self.memory_update is not None:
+            self.memory_update.result()
+            self.memory_update = None
+
     def get_prompt(self, custom_prompt=None):
         template = """The following is a friendly conversation between a human and an AI. If the AI does not know the answer to a question, it truthfully says it does not know.
 
@@ -234,7 +366,7 @@ class ModelAdapter:
             retriever = WorkspaceRetriever(workspace_id=workspace_id)
             # Only stream the last llm call (otherwise the internal
             # llm response will be visible)
-            llm_without_streaming = self.get_llm({"streaming": False})
+            llm_without_streaming = self.get_cached_llm({"streaming": False})
             history_aware_retriever = create_history_aware_retriever(
                 llm_without_streaming,
                 retriever,
@@ -257,7 +389,7 @@ class ModelAdapter:
 
         conversation = RunnableWithMessageHistory(
             chain,
-            lambda session_id: self.chat_history,
+            lambda session_id: self.get_memory_history(),
             history_messages_key="chat_history",
             input_messages_key="input",
             output_messages_key="output",
@@ -377,7 +509,7 @@ class ModelAdapter:
             conversation = ConversationalRetrievalChain.from_llm(
                 self.llm,
                 WorkspaceRetriever(workspace_id=workspace_id),
-                condense_question_llm=self.get_llm({"streaming": False}),
+                condense_question_llm=self.get_cached_llm({"streaming": False}),
                 condense_question_prompt=self.get_condense_question_prompt(
                     custom_prompt=system_prompts.get("condenseSystemPrompt")
                 ),
@@ -558,48 +690,53 @@ class ModelAdapter:
             return guardrail_response
 
         if self._mode == ChatbotMode.CHAIN.value:
-            if isinstance(self.llm, ChatBedrockConverse):
-                response = self.run_with_chain_v2(
+            self.start_memory_update()
+
+        # The messages and metadata of the turn are stored with one write
+        with self.chat_history.write_batch():
+            if self._mode == ChatbotMode.CHAIN.value:
+                if isinstance(self.llm, ChatBedrockConverse):
+                    response = self.run_with_chain_v2(
+                        prompt,
+                        workspace_id,
+                        images,
+                        documents,
+                        videos,
+                        user_groups,
+                        system_prompts=system_prompts,
+                    )
+                else:
+                    response = self.run_with_chain(
+                        prompt,
+                        workspace_id,
+                        user_groups,
+                        system_prompts=system_prompts,
+                    )
+                guardrail_response = self.apply_bedrock_guardrails(
+                    source="OUTPUT", content=response.get("content")
+                )
+                if guardrail_response is not None:
+                    # Replace the last message in the history
+                    logger.info("Blocking ouput message using Guardrails")
+                    self.chat_history.replace_last_message(
+                        guardrail_response.get("content")
+                    )
+                    return guardrail_response
+
+                return response
+
+            elif self._mode in [
+                ChatbotMode.IMAGE_GENERATION.value,
+                ChatbotMode.VIDEO_GENERATION.value,
+            ]:
+                # Media generation
+                return self.run_with_media_generation_chain(
                     prompt,
-                    workspace_id,
+                    user_groups,
                     images,
                     documents,
                     videos,
-                    user_groups,
-                    system_prompts=system_prompts,
-                )
-            else:
-                response = self.run_with_chain(
-                    prompt,
-                    workspace_id,
-                    user_groups,
-                    system_prompts=system_prompts,
                 )
-            guardrail_response = self.apply_bedrock_guardrails(
-                source="OUTPUT", content=response.get("content")
-            )
-            if guardrail_response is not None:
-                # Replace the last message in the history
-                logger.info("Blocking ouput message using Guardrails")
-                self.chat_history.replace_last_message(
-                    guardrail_response.get("content")
-                )
-                return guardrail_response
-
-            return response
-
-        elif self._mode in [
-            ChatbotMode.IMAGE_GENERATION.value,
-            ChatbotMode.VIDEO_GENERATION.value,
-        ]:
-            # Media generation
-            return self.run_with_media_generation_chain(
-                prompt,
-                user_groups,
-                images,
-                documents,
-                videos,
-            )
 
         raise ValueError(f"unknown mode {self._mode}")
 
@@ -457,37 +457,9 @@ class BedrockAgentAdapter(ModelAdapter):
             trace = json_dumps_decimal(response.get("trace", {}))
 
             # Add the agent's response to the chat history
-            # We need to manually add the message to DynamoDB to handle
-            # float values
             from langchain_core.messages import AIMessage
-            from langchain.schema import messages_to_dict, _message_to_dict
-            from datetime import datetime
-
-            # Get existing messages
-            messages = messages_to_dict(self.chat_history.get_messages_from_storage())
-
-            # Create and add the AI message
-            ai_message = AIMessage(content=completion)
-            _message = _message_to_dict(ai_message)
-            messages.append(_message)
-
-            # Save to DynamoDB with proper float handling
-            try:
-                # Convert all floats to Decimal and handle binary data for
-                # DynamoDB compatibility
-                messages_json = json.dumps(messages, cls=CustomJSONEncoder)
-                messages_with_decimal = json.loads(messages_json, parse_float=Decimal)
-
-                self.chat_history.table.put_item(
-                    Item={
-                        "SessionId": self.session_id,
-                        "UserId": self.user_id,
-                        "StartTime": datetime.now().isoformat(),
-                        "History": messages_with_decimal,
-                    }
-                )
-            except Exception as err:
-                logger.exception(f"Error saving message to DynamoDB: {err}")
+
+            self.chat_history.add_message(AIMessage(content=completion))
 
             # Create metadata for the response
             metadata = json_dumps_decimal(
@@ -506,31 +478,12 @@ class BedrockAgentAdapter(ModelAdapter):
             if user_groups and (
                 "admin" in user_groups or "workspace_manager" in user_groups
             ):
-                # We need to manually add the metadata to avoid float issues
+                # add_metadata converts floats to Decimal, the trace can also
+                # contain bytes that are base64 encoded first.
                 try:
-                    # Get the latest messages again (including our newly added
-                    # AI message)
-                    messages = messages_to_dict(
-                        self.chat_history.get_messages_from_storage()
+                    self.chat_history.add_metadata(
+                        json.loads(json.dumps(metadata, cls=CustomJSONEncoder))
                     )
-                    if messages:
-                        # Add metadata to the last message
-                        messages[-1]["data"]["additional_kwargs"] = metadata
-
-                        # Save to DynamoDB with proper float handling
-                        messages_json = json.dumps(messages, cls=CustomJSONEncoder)
-                        messages_with_decimal = json.loads(
-                            messages_json, parse_float=Decimal
-                        )
-
-                        self.chat_history.table.put_item(
-                            Item={
-                                "SessionId": self.session_id,
-                                "UserId": self.user_id,
-                                "StartTime": datetime.now().isoformat(),
-                                "History": messages_with_decimal,
-                            }
-                        )
                 except Exception as err:
                     logger.exception(f"Error adding metadata to DynamoDB: {err}")
 
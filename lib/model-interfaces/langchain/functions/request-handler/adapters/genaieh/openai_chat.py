@@ -4,6 +4,7 @@ EH Gateway Chat Adapter for OpenAI Models.
 
 from typing import Dict, List, Optional, Any
 from aws_lambda_powertools import Logger
+from genai_core.model_providers.genaieh.genaieh_client import OpenAIStreamParser
 from genai_core.model_providers.genaieh.types import ApiError
 from .base import GenAIEHGatewayAdapter
 
@@ -66,17 +67,25 @@ class GenAIEHOpenAIChatAdapter(GenAIEHGatewayAdapter):
             # Check if streaming is enabled and supported
             if self.model_kwargs.get("streaming", False) and not self.disable_streaming:
                 logger.info("Invoking openai streaming chat endpoint")
-                response = self.genaieh_client.invoke_openai_stream_chat(
-                    body=request_body
+                parser = OpenAIStreamParser()
+                stream = self.genaieh_client.stream_openai_chat(
+                    body=request_body, parser=parser
                 )
-                if isinstance(response, ApiError):
+                if isinstance(stream, ApiError):
                     return {
                         "sessionId": self.session_id,
                         "type": "error",
-                        "content": response.message,
+                        "content": stream.message,
                         "metadata": {"sessionId": self.session_id},
                     }
 
+                # The stream is read on this thread, the tokens are sent to
+                # the client as they are received
+                chunks = []
+                for delta in stream:
+                    chunks.append(delta)
+                    self._on_openai_chunk(delta)
+                response = {"chunks": chunks, "stream": True, "usage": parser.usage}
                 full_response = self._process_openai_streaming_response(response)
             else:
                 logger.info("Invoking openai non-streaming chat endpoint")
@@ -109,26 +118,16 @@ class GenAIEHOpenAIChatAdapter(GenAIEHGatewayAdapter):
             )
             return self.handle_genaieh_error(e, "open ai chat processing")
 
-    def _process_openai_streaming_response(self, response: Dict[str, Any]) -> str:
-        """Process openai response and return complete text."""
-        full_response = ""
+    def _on_openai_chunk(self, token: str) -> None:
         try:
-            # stream response back
-            if "chunks" in response:
-                chunks = response["chunks"]
-                for chunk in chunks:
-                    token = chunk
-                    logger.info("Sending stream events to on_llm_new_token")
-                    self.on_llm_new_token(
-                        token, run_id=None, chunk=chunk, parent_run_id=None
-                    )
-                    full_response += token
-                return full_response
-            else:
-                return full_response
+            self.on_llm_new_token(token, run_id=None, chunk=token, parent_run_id=None)
         except Exception as e:
-            logger.error(f"Error processing openai stream response: {e}")
-        return str(response)
+            # The stream goes on, the final response has the whole text
+            logger.exception(e)
+
+    def _process_openai_streaming_response(self, response: Dict[str, Any]) -> str:
+        """Return the complete text of a streamed openai response."""
+        return "".join(response.get("chunks", []))
 
     def _extract_openai_chat_response(
         self, response: str | Dict[str, Any] | Any
@@ -58,7 +58,7 @@ class SMLlama2ChatAdapter(ModelAdapter):
     def get_memory(self, output_key=None, return_messages=False):
         return Llama2ConversationBufferMemory(
             memory_key="chat_history",
-            chat_memory=self.chat_history,
+            chat_memory=self.get_memory_history(),
             return_messages=return_messages,
             output_key=output_key,
         )
@@ -1,31 +1,47 @@
 import os
 import json
+import time
 import uuid
 from datetime import datetime
 from genai_core.registry import registry
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities import parameters
-from aws_lambda_powertools.utilities.batch import BatchProcessor, EventType
+from aws_lambda_powertools.utilities.batch import EventType
 from aws_lambda_powertools.utilities.batch.exceptions import BatchProcessingError
 from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 import adapters  # noqa: F401 Needed to register the adapters
-from genai_core.utils.websocket import send_to_client
+from genai_core.utils.batch import ConcurrentBatchProcessor
+from genai_core.utils.websocket import TokenCoalescer, flush_on_exit, send_to_client
 from genai_core.types import ChatbotAction
 
-processor = BatchProcessor(event_type=EventType.SQS)
-tracer = Tracer()
-logger = Logger()
-
 AWS_REGION = os.environ["AWS_REGION"]
 API_KEYS_SECRETS_ARN = os.environ["API_KEYS_SECRETS_ARN"]
+# Records of a batch handled at the same time
+MAX_CONCURRENT_RECORDS = int(os.environ.get("MAX_CONCURRENT_RECORDS", "4"))
+# The API keys are read again from Secrets Manager after this duration (seconds)
+API_KEYS_MAX_AGE = int(os.environ.get("API_KEYS_MAX_AGE", "300"))
+
+processor = ConcurrentBatchProcessor(
+    event_type=EventType.SQS, max_concurrency=MAX_CONCURRENT_RECORDS
+)
+tracer = Tracer()
+logger = Logger()
 
-sequence_number = 0
+# The first request of the execution environment is a cold start
+cold_start = True
 
 
 def on_llm_new_token(
-    user_id, session_id, self, token, run_id, chunk, parent_run_id, *args, **kwargs
+    coalescer: TokenCoalescer,
+    self,
+    token,
+    run_id,
+    chunk,
+    parent_run_id,
+    *args,
+    **kwargs,
 ):
     if self.disable_streaming:
         logger.debug("Streaming is disabled, ignoring token")
@@ -41,26 +57,8 @@ def on_llm_new_token(
         text = token
     if text is None or len(text) == 0:
         return
-    global sequence_number
-    sequence_number += 1
-    run_id = str(run_id)
 
-    send_to_client(
-        {
-            "type": "text",
-            "action": ChatbotAction.LLM_NEW_TOKEN.value,
-            "userId": user_id,
-            "timestamp": str(int(round(datetime.now().timestamp()))),
-            "data": {
-                "sessionId": session_id,
-                "token": {
-                    "runId": run_id,
-                    "sequenceNumber": sequence_number,
-                    "value": text,
-                },
-            },
-        }
-    )
+    coalescer.add_token(text, run_id=str(run_id))
 
 
 def handle_heartbeat(record):
@@ -94,13 +92,30 @@ def handle_run(record):
     documents = data.get("documents", [])
     videos = data.get("videos", [])
     system_prompts = record.get("systemPrompts", {})
+    memory = record.get("memory", {})
     if not session_id:
         session_id = str(uuid.uuid4())
 
+    global cold_start
+    is_cold_start = cold_start
+    cold_start = False
+    setup_start = time.perf_counter()
+
     adapter = registry.get_adapter(f"{provider}.{model_id}")
 
-    adapter.on_llm_new_token = lambda *args, **kwargs: on_llm_new_token(
-        user_id, session_id, *args, **kwargs
+    # The records of a batch run concurrently, the token callback is set
+    # on a subclass per request instead of the shared adapter class
+    coalescer = TokenCoalescer(user_id, session_id)
+    adapter = type(
+        adapter.__name__,
+        (adapter,),
+        {
+            "__module__": adapter.__module__,
+            "__qualname__": adapter.__qualname__,
+            "on_llm_new_token": lambda *args, **kwargs: on_llm_new_token(
+                coalescer, *args, **kwargs
+            ),
+        },
     )
 
     model = adapter(
@@ -109,30 +124,45 @@ def handle_run(record):
         session_id=session_id,
         user_id=user_id,
         model_kwargs=data.get("modelKwargs", {}),
+        memory=memory,
     )
 
-    response = model.run(
-        prompt=prompt,
-        workspace_id=workspace_id,
-        user_groups=user_groups,
-        images=images,
-        documents=documents,
-        videos=videos,
-        system_prompts=system_prompts,
-    )
+    run_start = time.perf_counter()
+    try:
+        response = model.run(
+            prompt=prompt,
+            workspace_id=workspace_id,
+            user_groups=user_groups,
+            images=images,
+            documents=documents,
+            videos=videos,
+            system_prompts=system_prompts,
+        )
 
-    logger.debug(response)
+        logger.debug(response)
+        logger.info(
+            "Request timing",
+            coldStart=is_cold_start,
+            setupMs=round((run_start - setup_start) * 1000),
+            runMs=round((time.perf_counter() - run_start) * 1000),
+        )
 
-    send_to_client(
-        {
-            "type": "text",
-            "action": ChatbotAction.FINAL_RESPONSE.value,
-            "timestamp": str(int(round(datetime.now().timestamp()))),
-            "userId": user_id,
-            "userGroups": user_groups,
-            "data": response,
-        }
-    )
+        # The buffered tokens are sent before the final response
+        coalescer.flush()
+        send_to_client(
+            {
+                "type": "text",
+                "action": ChatbotAction.FINAL_RESPONSE.value,
+                "timestamp": str(int(round(datetime.now().timestamp()))),
+                "userId": user_id,
+                "userGroups": user_groups,
+                "data": response,
+            }
+        )
+    finally:
+        # The summary of the conversation can still be updated in the
+        # background, also when the request failed
+        model.wait_for_memory_update()
 
 
 @tracer.capture_method
@@ -206,12 +236,16 @@ def handle_failed_records(records):
 
 @logger.inject_lambda_context(log_event=False)
 @tracer.capture_lambda_handler
+@flush_on_exit
 def handler(event, context: LambdaContext):
     batch = event["Records"]
 
-    api_keys = parameters.get_secret(API_KEYS_SECRETS_ARN, transform="json")
+    api_keys = parameters.get_secret(
+        API_KEYS_SECRETS_ARN, transform="json", max_age=API_KEYS_MAX_AGE
+    )
     for key in api_keys:
-        os.environ[key] = api_keys[key]
+        if os.environ.get(key) != api_keys[key]:
+            os.environ[key] = api_keys[key]
 
     try:
         with processor(records=batch, handler=record_handler):
@@ -5,6 +5,7 @@ import { RagDynamoDBTables } from "../rag-dynamodb-tables";
 import * as path from "path";
 import * as cdk from "aws-cdk-lib";
 import * as logs from "aws-cdk-lib/aws-logs";
+import * as iam from "aws-cdk-lib/aws-iam";
 import * as lambda from "aws-cdk-lib/aws-lambda";
 import * as events from "aws-cdk-lib/aws-events";
 import * as targets from "aws-cdk-lib/aws-events-targets";
@@ -116,13 +117,14 @@ export class RssSubscription extends Construct {
       targets: [new targets.LambdaFunction(triggerRssIngestorsFunction)],
     });
 
+    const crawlQueuedRssPostsScheduleMinutes = 5;
     const crawlQueuedRssPostsFunction = new lambda.Function(
       this,
       "crawlQueuedRssPostsFunction",
       {
         vpc: props.shared.vpc,
         description:
-          "Functions polls the RSS items for pending urls and invokes Website crawler inference. Max of 10 URLs per invoke.",
+          "Functions polls the RSS items for pending urls and invokes Website crawler inference at a target rate.",
         code: props.shared.sharedCode.bundleWithLambdaAsset(
           path.join(__dirname, "./functions/batch-crawl-rss-posts")
         ),
@@ -153,6 +155,8 @@ export class RssSubscription extends Construct {
           WEBSITE_CRAWLING_WORKFLOW_ARN:
             props.websiteCrawlerStateMachine.stateMachineArn,
           PROCESSING_BUCKET_NAME: props.processingBucket.bucketName,
+          RSS_CRAWL_SCHEDULE_MINUTES:
+            crawlQueuedRssPostsScheduleMinutes.toString(),
         },
       }
     );
@@ -161,8 +165,17 @@ export class RssSubscription extends Construct {
     props.websiteCrawlerStateMachine.grantStartExecution(
       crawlQueuedRssPostsFunction
     );
+    // Lists the running executions to limit the crawls started per run
+    crawlQueuedRssPostsFunction.addToRolePolicy(
+      new iam.PolicyStatement({
+        actions: ["states:ListExecutions"],
+        resources: [props.websiteCrawlerStateMachine.stateMachineArn],
+      })
+    );
     new events.Rule(this, "CrawlQueuedRssPostsScheduleRule", {
-      schedule: events.Schedule.rate(cdk.Duration.minutes(5)),
+      schedule: events.Schedule.rate(
+        cdk.Duration.minutes(crawlQueuedRssPostsScheduleMinutes)
+      ),
       targets: [new targets.LambdaFunction(crawlQueuedRssPostsFunction)],
     });
 
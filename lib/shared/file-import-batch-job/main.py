@@ -38,7 +38,13 @@ def main():
 
     try:
         extension = os.path.splitext(INPUT_OBJECT_KEY)[-1].lower()
-        if extension == ".txt":
+        # Markdown is kept as is for the markdown chunking strategy, which
+        # splits it at the headings. The other strategies keep the loader.
+        keep_markdown = (
+            extension in [".md", ".markdown"]
+            and workspace.get("chunking_strategy") == "markdown"
+        )
+        if extension == ".txt" or keep_markdown:
             object = s3_client.get_object(
                 Bucket=INPUT_BUCKET_NAME, Key=INPUT_OBJECT_KEY
             )
@@ -74,6 +80,7 @@ def add_chunks(workspace: dict, document: dict, content: str):
         chunks=chunks,
         chunk_complements=None,
         replace=True,
+        incremental=True,
     )
 
 
@@ -4,6 +4,7 @@ import uuid
 from aws_lambda_powertools import Logger
 import boto3
 from datetime import datetime
+from typing import Optional
 from botocore.exceptions import ClientError
 from boto3.dynamodb.conditions import Attr
 import genai_core.roles
@@ -96,6 +97,9 @@ def create_application(
     maxTokens: int,
     temperature: Decimal,
     topP: Decimal,
+    memoryStrategy: Optional[str] = None,
+    memoryWindowSize: Optional[int] = None,
+    memoryMaxTokens: Optional[int] = None,
 ):
     application_id = str(uuid.uuid4())
     timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
@@ -121,10 +125,13 @@ def create_application(
         "MaxTokens": maxTokens,
         "Temperature": temperature,
         "TopP": topP,
+        "MemoryStrategy": memoryStrategy
+        or genai_core.types.ChatMemoryStrategy.BUFFER.value,
         "CreateTime": timestamp,
         "UpdateTime": timestamp,
     }
 
+    _set_memory_limits(item, memoryWindowSize, memoryMaxTokens)
     ddb_response = table.put_item(Item=item)
 
     logger.info(
@@ -152,10 +159,14 @@ def update_application(
     maxTokens: int,
     temperature: Decimal,
     topP: Decimal,
+    memoryStrategy: Optional[str] = None,
+    memoryWindowSize: Optional[int] = None,
+    memoryMaxTokens: Optional[int] = None,
 ):
     response = table.get_item(Key={"Id": id})
     if response.get("Item") is None:
         raise genai_core.types.CommonError("Unknown application")
+    stored = response.get("Item")
 
     timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
     validate_request(workspace=workspace, roles=roles, model=model)
@@ -178,10 +189,15 @@ def update_application(
         "MaxTokens": maxTokens,
         "Temperature": temperature,
         "TopP": topP,
-        "CreateTime": response.get("Item").get("CreateTime"),
+        # The strategy is kept when it is not part of the update
+        "MemoryStrategy": memoryStrategy
+        or stored.get("MemoryStrategy")
+        or genai_core.types.ChatMemoryStrategy.BUFFER.value,
+        "CreateTime": stored.get("CreateTime"),
         "UpdateTime": timestamp,
     }
 
+    _set_memory_limits(item, memoryWindowSize, memoryMaxTokens)
     ddb_response = table.put_item(Item=item)
 
     logger.info(
@@ -192,6 +208,17 @@ def update_application(
     return item
 
 
+def _set_memory_limits(
+    item: dict, memoryWindowSize: Optional[int], memoryMaxTokens: Optional[int]
+):
+    # Without a value the defaults of the strategy are used. The item
+    # replaces the stored one, so a previous value is removed.
+    if memoryWindowSize is not None:
+        item["MemoryWindowSize"] = memoryWindowSize
+    if memoryMaxTokens is not None:
+        item["MemoryMaxTokens"] = memoryMaxTokens
+
+
 def delete_application(id):
     try:
         table.delete_item(Key={"Id": id})
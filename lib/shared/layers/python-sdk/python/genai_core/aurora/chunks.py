@@ -88,3 +88,17 @@ def clean_chunks_aurora(workspace_id: str, document_id: str):
             ).format(table=table_name),
             [workspace_id, document_id],
         )
+
+
+def delete_chunks_aurora(workspace_id: str, chunk_ids: List[str]):
+    table_name = sql.Identifier(workspace_id.replace("-", ""))
+    with AuroraConnection() as cursor:
+        cursor.execute(
+            sql.SQL(
+                """DELETE FROM {table} WHERE
+                    workspace_id = %s AND chunk_id = ANY(%s::uuid[]);"""
+            ).format(table=table_name),
+            [workspace_id, [str(chunk_id) for chunk_id in chunk_ids]],
+        )
+
+        return cursor.rowcount
@@ -1,16 +1,36 @@
 import os
+import json
 import uuid
 import boto3
+import botocore
+import hashlib
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 import genai_core.documents
 import genai_core.embeddings
+import genai_core.splitters
 import genai_core.aurora.chunks
 import genai_core.opensearch.chunks
 from genai_core.types import CommonError, Task
 from typing import List, Optional
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from aws_lambda_powertools import Logger
 
 PROCESSING_BUCKET_NAME = os.environ.get("PROCESSING_BUCKET_NAME", "")
-s3 = boto3.resource("s3")
+# "objects" stores one object per chunk, "jsonl" packs all the chunks of a
+# document in a single JSON Lines object with a byte offset index.
+CHUNKS_STORAGE_FORMAT = os.environ.get("CHUNKS_STORAGE_FORMAT", "objects")
+CHUNKS_UPLOAD_CONCURRENCY = int(os.environ.get("CHUNKS_UPLOAD_CONCURRENCY", "16"))
+CHUNKS_MANIFEST_FORMAT_VERSION = 1
+# Clients are thread safe (resources are not), chunks can be added
+# from several threads by the website crawler.
+s3_client = boto3.client(
+    "s3",
+    config=Config(
+        max_pool_connections=CHUNKS_UPLOAD_CONCURRENCY,
+        retries={"max_attempts": 5, "mode": "adaptive"},
+    ),
+)
+logger = Logger()
 
 
 def add_chunks(
@@ -21,6 +41,7 @@ def add_chunks(
     chunks: List[str],
     chunk_complements: List[str],
     path: Optional[str] = None,
+    incremental: bool = False,
 ):
     workspace_id = workspace["workspace_id"]
     engine = workspace["engine"]
@@ -39,14 +60,68 @@ def add_chunks(
     if embeddings_model is None:
         raise CommonError("Embeddings model not found")
 
-    chunk_embeddings = genai_core.embeddings.generate_embeddings(
-        embeddings_model, chunks, Task.STORE.value
+    if engine not in ["aurora", "opensearch"]:
+        raise CommonError("Engine not supported")
+
+    chunk_hashes = [
+        _get_chunk_hash(chunk, _get_complement(chunk_complements, idx))
+        for idx, chunk in enumerate(chunks)
+    ]
+
+    manifest = None
+    if incremental:
+        manifest = get_chunks_manifest(workspace_id, document_id, document_sub_id)
+
+    if manifest is None:
+        # Full ingestion: every chunk is new and, when replacing,
+        # all the previous vectors of the document are removed.
+        kept_entries = []
+        new_indexes = list(range(len(chunks)))
+        removed_chunk_ids = []
+        clean_document = replace
+    else:
+        kept_entries, new_indexes, removed_chunk_ids = _diff_chunks(
+            manifest, chunk_hashes
+        )
+        clean_document = False
+
+    new_chunks = [chunks[idx] for idx in new_indexes]
+    new_chunk_complements = [
+        _get_complement(chunk_complements, idx) for idx in new_indexes
+    ]
+    new_chunk_ids = [uuid.uuid4() for _ in new_indexes]
+    chunk_ids = _merge_chunk_ids(len(chunks), kept_entries, new_indexes, new_chunk_ids)
+
+    logger.info(
+        "Adding chunks",
+        incremental=manifest is not None,
+        total_chunks=len(chunks),
+        new_chunks=len(new_chunks),
+        removed_chunks=len(removed_chunk_ids),
     )
-    chunk_ids = [uuid.uuid4() for _ in chunks]
 
-    store_chunks_on_s3(workspace_id, document_id, document_sub_id, chunk_ids, chunks)
+    chunk_embeddings = []
+    if len(new_chunks) > 0:
+        chunk_embeddings = genai_core.embeddings.generate_embeddings(
+            embeddings_model, new_chunks, Task.STORE.value
+        )
+
+    if CHUNKS_STORAGE_FORMAT == "jsonl":
+        # The packed object is rewritten with every chunk of the document
+        store_packed_chunks_on_s3(
+            workspace_id, document_id, document_sub_id, chunk_ids, chunks
+        )
+    else:
+        store_chunks_on_s3(
+            workspace_id, document_id, document_sub_id, new_chunk_ids, new_chunks
+        )
 
     if engine == "aurora":
+        if len(removed_chunk_ids) > 0:
+            genai_core.aurora.chunks.delete_chunks_aurora(
+                workspace_id=workspace_id, chunk_ids=removed_chunk_ids
+            )
+
         result = genai_core.aurora.chunks.add_chunks_aurora(
             workspace_id=workspace_id,
             document_id=document_id,
@@ -55,13 +130,18 @@ def add_chunks(
             document_sub_type=document_sub_type,
             path=path,
             title=title,
-            chunk_ids=chunk_ids,
+            chunk_ids=new_chunk_ids,
             chunk_embeddings=chunk_embeddings,
-            chunks=chunks,
-            chunk_complements=chunk_complements,
-            replace=replace,
+            chunks=new_chunks,
+            chunk_complements=new_chunk_complements,
+            replace=clean_document,
         )
     elif engine == "opensearch":
+        if len(removed_chunk_ids) > 0:
+            genai_core.opensearch.chunks.delete_chunks_open_search(
+                workspace_id=workspace_id, chunk_ids=removed_chunk_ids
+            )
+
         result = genai_core.opensearch.chunks.add_chunks_open_search(
             workspace_id=workspace_id,
             document_id=document_id,
@@ -70,16 +150,30 @@ def add_chunks(
             document_sub_type=document_sub_type,
             path=path,
             title=title,
-            chunk_ids=chunk_ids,
+            chunk_ids=new_chunk_ids,
             chunk_embeddings=chunk_embeddings,
-            chunks=chunks,
-            chunk_complements=chunk_complements,
-            replace=replace,
+            chunks=new_chunks,
+            chunk_complements=new_chunk_complements,
+            replace=clean_document,
         )
-    else:
-        raise CommonError("Engine not supported")
 
-    added_vectors = result["added_vectors"]
+    if CHUNKS_STORAGE_FORMAT != "jsonl":
+        _delete_chunks_from_s3(
+            workspace_id, document_id, document_sub_id, removed_chunk_ids
+        )
+
+    # A full replace also describes the whole document, so the manifest
+    # is kept up to date for later incremental ingestions.
+    if incremental or replace:
+        entries = [
+            {"hash": chunk_hash, "chunk_id": str(chunk_id)}
+            for chunk_hash, chunk_id in zip(chunk_hashes, chunk_ids)
+        ]
+        store_chunks_manifest(workspace_id, document_id, document_sub_id, entries)
+
+    # The document vectors count covers the chunks that were kept
+    # as well as the ones that were just added.
+    added_vectors = len(kept_entries) + result["added_vectors"]
     genai_core.documents.set_document_vectors(
         workspace_id, document_id, added_vectors, replace=replace
     )
@@ -87,20 +181,20 @@ def add_chunks(
 
 def split_content(workspace: dict, content: str):
     chunking_strategy = workspace["chunking_strategy"]
-    chunk_size = workspace["chunk_size"]
-    chunk_overlap = workspace["chunk_overlap"]
+    strategy = genai_core.splitters.get_chunking_strategy(chunking_strategy)
+    if strategy is None:
+        raise CommonError("Chunking strategy not supported")
 
-    if chunking_strategy == "recursive":
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=len
-        )
+    return strategy(workspace, content)
 
-        text_data = text_splitter.split_text(content)
-        text_data = [text.replace("\x00", "\uFFFD") for text in text_data]
 
-        return text_data
+def _get_chunks_prefix(
+    workspace_id: str, document_id: str, document_sub_id: Optional[str]
+):
+    if document_sub_id:
+        return f"{workspace_id}/{document_id}/{document_sub_id}/chunks"
 
-    raise CommonError("Chunking strategy not supported")
+    return f"{workspace_id}/{document_id}/chunks"
 
 
 def store_chunks_on_s3(
@@ -110,11 +204,172 @@ def store_chunks_on_s3(
     chunk_ids: List[str],
     chunks: List[str],
 ):
+    prefix = _get_chunks_prefix(workspace_id, document_id, document_sub_id)
+    _put_objects(
+        [
+            (f"{prefix}/{chunk_id}.txt", chunk.encode("utf-8"))
+            for chunk_id, chunk in zip(chunk_ids, chunks)
+        ]
+    )
+
+
+def store_packed_chunks_on_s3(
+    workspace_id: str,
+    document_id: str,
+    document_sub_id: Optional[str],
+    chunk_ids: List[str],
+    chunks: List[str],
+):
+    """Stores the chunks as one JSON Lines object and an index with the
+    byte range of every chunk, so a chunk can be read with a range GET."""
+    prefix = _get_chunks_prefix(workspace_id, document_id, document_sub_id)
+    lines = []
+    index = {}
+    offset = 0
     for chunk_id, chunk in zip(chunk_ids, chunks):
-        path = f"{workspace_id}/{document_id}/chunks/{chunk_id}.txt"
-        if document_sub_id:
-            path = (
-                f"{workspace_id}/{document_id}/{document_sub_id}/chunks/{chunk_id}.txt"
-            )
+        line = (
+            json.dumps({"chunk_id": str(chunk_id), "content": chunk}) + "\n"
+        ).encode("utf-8")
+        index[str(chunk_id)] = [offset, len(line)]
+        offset += len(line)
+        lines.append(line)
+
+    _put_objects(
+        [
+            (f"{prefix}/chunks.jsonl", b"".join(lines)),
+            (f"{prefix}/chunks.index.json", json.dumps(index).encode("utf-8")),
+        ]
+    )
+
+
+def _put_objects(objects: List[tuple]):
+    """Uploads (key, body) pairs to the processing bucket using a bounded
+    thread pool. Throttling and transient errors are retried by botocore."""
+    if len(objects) == 0:
+        return
+
+    def put_object(item):
+        key, body = item
+        s3_client.put_object(Bucket=PROCESSING_BUCKET_NAME, Key=key, Body=body)
+
+    max_workers = max(1, min(CHUNKS_UPLOAD_CONCURRENCY, len(objects)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Consuming the results raises the first upload error, if any
+        list(executor.map(put_object, objects))
+
+
+def _merge_chunk_ids(
+    total_chunks: int,
+    kept_entries: List[dict],
+    new_indexes: List[int],
+    new_chunk_ids: List[str],
+):
+    """Returns the chunk ids in the same order as the chunks."""
+    new_chunk_ids_by_index = dict(zip(new_indexes, new_chunk_ids))
+    kept_chunk_ids = iter(entry["chunk_id"] for entry in kept_entries)
+
+    return [
+        (
+            new_chunk_ids_by_index[idx]
+            if idx in new_chunk_ids_by_index
+            else next(kept_chunk_ids)
+        )
+        for idx in range(total_chunks)
+    ]
+
+
+def get_chunks_manifest(
+    workspace_id: str, document_id: str, document_sub_id: Optional[str]
+):
+    """Returns the chunk hashes stored for a document or None if
+    the document was never ingested incrementally."""
+    prefix = _get_chunks_prefix(workspace_id, document_id, document_sub_id)
+    try:
+        response = s3_client.get_object(
+            Bucket=PROCESSING_BUCKET_NAME, Key=f"{prefix}/manifest.json"
+        )
+    except botocore.exceptions.ClientError as e:
+        if e.response["Error"]["Code"] in ["NoSuchKey", "404"]:
+            return None
+        raise e
+
+    manifest = json.loads(response["Body"].read().decode("utf-8"))
+    if manifest.get("format_version") != CHUNKS_MANIFEST_FORMAT_VERSION:
+        return None
+
+    return manifest["chunks"]
+
+
+def store_chunks_manifest(
+    workspace_id: str,
+    document_id: str,
+    document_sub_id: Optional[str],
+    entries: List[dict],
+):
+    prefix = _get_chunks_prefix(workspace_id, document_id, document_sub_id)
+    s3_client.put_object(
+        Bucket=PROCESSING_BUCKET_NAME,
+        Key=f"{prefix}/manifest.json",
+        Body=json.dumps(
+            {"format_version": CHUNKS_MANIFEST_FORMAT_VERSION, "chunks": entries}
+        ),
+        ContentType="application/json",
+    )
+
+
+def _delete_chunks_from_s3(
+    workspace_id: str,
+    document_id: str,
+    document_sub_id: Optional[str],
+    chunk_ids: List[str],
+):
+    prefix = _get_chunks_prefix(workspace_id, document_id, document_sub_id)
+    # delete_objects accepts at most 1000 keys per request
+    for idx in range(0, len(chunk_ids), 1000):
+        batch = chunk_ids[idx : idx + 1000]
+        s3_client.delete_objects(
+            Bucket=PROCESSING_BUCKET_NAME,
+            Delete={
+                "Objects": [{"Key": f"{prefix}/{chunk_id}.txt"} for chunk_id in batch],
+                "Quiet": True,
+            },
+        )
+
+
+def _diff_chunks(manifest: List[dict], chunk_hashes: List[str]):
+    """Matches the new chunk hashes against the stored ones.
+
+    Returns the manifest entries to keep, the indexes of the chunks
+    to embed and the ids of the chunks that are no longer present.
+    Identical chunks are matched one to one.
+    """
+    previous = {}
+    for entry in manifest:
+        previous.setdefault(entry["hash"], []).append(entry["chunk_id"])
+
+    kept_entries = []
+    new_indexes = []
+    for idx, chunk_hash in enumerate(chunk_hashes):
+        chunk_ids = previous.get(chunk_hash)
+        if chunk_ids:
+            kept_entries.append({"hash": chunk_hash, "chunk_id": chunk_ids.pop(0)})
+        else:
+            new_indexes.append(idx)
+
+    removed_chunk_ids = [
+        chunk_id for chunk_ids in previous.values() for chunk_id in chunk_ids
+    ]
+
+    return kept_entries, new_indexes, removed_chunk_ids
+
+
+def _get_chunk_hash(chunk: str, chunk_complement: Optional[str]):
+    value = chunk if chunk_complement is None else f"{chunk}\x00{chunk_complement}"
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _get_complement(chunk_complements: Optional[List[str]], idx: int):
+    if chunk_complements and idx < len(chunk_complements):
+        return chunk_complements[idx]
 
-        s3.Object(PROCESSING_BUCKET_NAME, path).put(Body=chunk)
+    return None
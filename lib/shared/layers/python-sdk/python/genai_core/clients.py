@@ -1,4 +1,6 @@
+import json
 import logging
+import threading
 from typing import Any, Optional
 
 import boto3
@@ -21,13 +23,8 @@ def get_openai_client() -> Optional[Any]:
     return openai
 
 
-def get_sagemaker_client() -> Any:
-    config = Config(retries={"max_attempts": 15, "mode": "adaptive"})
-
-    client = boto3.client("sagemaker-runtime", config=config)
-
-    return client
-
+# Cache for sagemaker-runtime client
+_sagemaker_client = None
 
 # Cache for bedrock-agentcore client (data plane)
 _agentcore_client = None
@@ -35,6 +32,25 @@ _agentcore_client = None
 # Cache for bedrock-agentcore-control client (control plane)
 _agentcore_control_client = None
 
+# Cache for the Bedrock clients by service and config version, the clients
+# of a previous config version are replaced
+_bedrock_clients: dict[tuple[str, str], Any] = {}
+_bedrock_clients_lock = threading.Lock()
+
+
+def get_sagemaker_client() -> Any:
+    """
+    Get sagemaker-runtime client with caching, created on first use
+
+    Returns:
+        boto3.client: Cached sagemaker-runtime client
+    """
+    global _sagemaker_client
+    if _sagemaker_client is None:
+        config = Config(retries={"max_attempts": 15, "mode": "adaptive"})
+        _sagemaker_client = boto3.client("sagemaker-runtime", config=config)
+    return _sagemaker_client
+
 
 def get_agentcore_client() -> Any:
     """
@@ -68,7 +84,7 @@ def get_agentcore_control_client() -> Any:
 
 def get_bedrock_client(service_name: str = "bedrock-runtime") -> Any:
     """
-    Get a boto3 client for Bedrock services
+    Get a boto3 client for Bedrock services, cached for the current config
 
     Args:
         service_name: AWS service name (default: "bedrock-runtime")
@@ -76,6 +92,39 @@ def get_bedrock_client(service_name: str = "bedrock-runtime") -> Any:
     Returns:
         boto3 client for the specified Bedrock service
     """
+    return _get_cached_bedrock_client(service_name)
+
+
+def _get_cached_bedrock_client(service_name: str) -> Any:
+    key = (service_name, _get_bedrock_config_version())
+    client = _bedrock_clients.get(key)
+    if client is not None:
+        return client
+
+    with _bedrock_clients_lock:
+        client = _bedrock_clients.get(key)
+        if client is None:
+            client = _create_bedrock_client(service_name)
+            for cached_key in list(_bedrock_clients):
+                if cached_key[1] != key[1]:
+                    del _bedrock_clients[cached_key]
+            _bedrock_clients[key] = client
+
+    return client
+
+
+def _get_bedrock_config_version() -> str:
+    """Returns the version of the config sections used by the Bedrock clients"""
+    config = genai_core.parameters.get_config()
+
+    return json.dumps(
+        {"bedrock": config.get("bedrock", {}), "genaieh": config.get("genaieh", {})},
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _create_bedrock_client(service_name: str) -> Any:
     # For bedrock-runtime, use the special client that might use GenAIEH
     if service_name == "bedrock-runtime":
         return _get_bedrock_runtime_client()
@@ -194,7 +243,8 @@ def _setup_token_handlers(client: Any, genaieh_config: dict[str, str]) -> Any:
     # Import here to avoid circular imports
     from genai_core.model_providers.genaieh.genaieh_client import GenAIEHGatewayClient
 
-    # Create GenAIEH client for token management
+    # Create GenAIEH client for token management, it caches the token until
+    # it expires and refreshes it once for concurrent requests
     genaieh_client = GenAIEHGatewayClient(genaieh_config)
 
     # Store token state for lazy loading and caching
@@ -202,16 +252,15 @@ def _setup_token_handlers(client: Any, genaieh_config: dict[str, str]) -> Any:
 
     # Handler for adding token to requests
     def add_token_to_request(request: Any) -> None:
-        # Only fetch token when actually making a request
-        if not token_state["token"]:
-            logger.info("Lazily fetching initial OAuth token for GenAIEH Gateway")
-            try:
-                token_state["token"] = genaieh_client.get_access_token()
-                if not token_state["token"]:
-                    logger.error("Failed to get OAuth token for GenAIEH Gateway")
-            except Exception as e:
-                logger.error(f"Exception while fetching OAuth token: {str(e)}")
-                # Continue with no token, likely causing 401 and trigger retry
+        # Only fetch token when actually making a request, the client is
+        # reused so the cached token may have expired since the last one
+        try:
+            token_state["token"] = genaieh_client.get_access_token()
+            if not token_state["token"]:
+                logger.error("Failed to get OAuth token for GenAIEH Gateway")
+        except Exception as e:
+            logger.error(f"Exception while fetching OAuth token: {str(e)}")
+            # Continue with no token, likely causing 401 and trigger retry
 
         # Add the token to the request headers if we have one
         if token_state["token"]:
@@ -11,6 +11,10 @@ import genai_core.websites
 import genai_core.utils.json
 import genai_core.workspaces
 import genai_core.utils.files
+from genai_core.utils.resources import get_thread_resource
+import time
+from boto3.dynamodb.types import TypeSerializer
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from datetime import datetime
 import hashlib
@@ -31,22 +35,55 @@ DELETE_DOCUMENT_WORKFLOW_ARN = os.environ.get("DELETE_DOCUMENT_WORKFLOW_ARN")
 RSS_FEED_INGESTOR_FUNCTION = os.environ.get("RSS_FEED_INGESTOR_FUNCTION", "")
 RSS_FEED_SCHEDULE_ROLE_ARN = os.environ.get("RSS_FEED_SCHEDULE_ROLE_ARN", "")
 DOCUMENTS_BY_STATUS_INDEX = os.environ.get("DOCUMENTS_BY_STATUS_INDEX", "")
+RSS_FEED_INGESTOR_CONCURRENCY = int(
+    os.environ.get("RSS_FEED_INGESTOR_CONCURRENCY", "10")
+)
+# The pending posts crawler runs every RSS_CRAWL_SCHEDULE_MINUTES
+RSS_CRAWL_SCHEDULE_MINUTES = int(os.environ.get("RSS_CRAWL_SCHEDULE_MINUTES", "5"))
+RSS_CRAWL_TARGET_RATE_PER_MINUTE = int(
+    os.environ.get("RSS_CRAWL_TARGET_RATE_PER_MINUTE", "4")
+)
+RSS_CRAWL_MAX_BATCH_SIZE = int(os.environ.get("RSS_CRAWL_MAX_BATCH_SIZE", "100"))
+RSS_CRAWL_MAX_RUNNING_CRAWLS = int(os.environ.get("RSS_CRAWL_MAX_RUNNING_CRAWLS", "40"))
+RSS_CRAWL_DISPATCH_CONCURRENCY = int(
+    os.environ.get("RSS_CRAWL_DISPATCH_CONCURRENCY", "8")
+)
+# A post whose crawl failed this many times is set to error and skipped
+RSS_CRAWL_MAX_ATTEMPTS = int(os.environ.get("RSS_CRAWL_MAX_ATTEMPTS", "3"))
+# The backlog reported by the RSS posts crawl is counted up to this number
+RSS_CRAWL_BACKLOG_COUNT_LIMIT = int(
+    os.environ.get("RSS_CRAWL_BACKLOG_COUNT_LIMIT", "1000")
+)
+
+DYNAMODB_BATCH_GET_SIZE = 100
+DYNAMODB_BATCH_MAX_ATTEMPTS = 8
 
 WORKSPACE_OBJECT_TYPE = "workspace"
 
-s3 = boto3.resource("s3")
 s3_client = boto3.client("s3")
-dynamodb = boto3.resource("dynamodb")
 dynamodb_client = boto3.client("dynamodb")
 sfn_client = boto3.client("stepfunctions")
 scheduler = boto3.client("scheduler")
 lambda_client = boto3.client("lambda")
+type_serializer = TypeSerializer()
 
-documents_table = dynamodb.Table(DOCUMENTS_TABLE_NAME)
-workspaces_table = dynamodb.Table(WORKSPACES_TABLE_NAME)
 logger = Logger()
 
 
+# The documents are also created and updated by the threads of the website
+# and RSS crawlers, the resources are the ones of the current thread
+def _get_documents_table():
+    return get_thread_resource("dynamodb").Table(DOCUMENTS_TABLE_NAME)
+
+
+def _get_workspaces_table():
+    return get_thread_resource("dynamodb").Table(WORKSPACES_TABLE_NAME)
+
+
+def _get_s3():
+    return get_thread_resource("s3")
+
+
 def list_documents(
     workspace_id: str,
     document_type: str,
@@ -72,7 +109,7 @@ def list_documents(
             raise genai_core.types.CommonError("Last document not found")
         last_document_compound_sort_key = last_document["compound_sort_key"]
 
-        response = documents_table.query(
+        response = _get_documents_table().query(
             IndexName=DOCUMENTS_BY_COMPOUND_KEY_INDEX_NAME,
             KeyConditionExpression="workspace_id = :workspace_id AND "
             + "begins_with(compound_sort_key, :sort_key_prefix)",
@@ -89,7 +126,7 @@ def list_documents(
             ScanIndexForward=scan_index_forward,
         )
     else:
-        response = documents_table.query(
+        response = _get_documents_table().query(
             IndexName=DOCUMENTS_BY_COMPOUND_KEY_INDEX_NAME,
             KeyConditionExpression="workspace_id = :workspace_id AND "
             + "begins_with(compound_sort_key, :sort_key_prefix)",
@@ -116,7 +153,7 @@ def set_document_vectors(
 ):
     timestamp = _get_timestamp()
 
-    response = workspaces_table.update_item(
+    response = _get_workspaces_table().update_item(
         Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
         UpdateExpression="ADD vectors :incrementValue SET updated_at=:timestampValue",
         ExpressionAttributeValues={
@@ -126,7 +163,7 @@ def set_document_vectors(
     )
 
     if replace:
-        response = documents_table.update_item(
+        response = _get_documents_table().update_item(
             Key={"workspace_id": workspace_id, "document_id": document_id},
             UpdateExpression="SET vectors=:vectorsValue, "
             + "updated_at=:timestampValue",
@@ -136,7 +173,7 @@ def set_document_vectors(
             },
         )
     else:
-        response = documents_table.update_item(
+        response = _get_documents_table().update_item(
             Key={"workspace_id": workspace_id, "document_id": document_id},
             UpdateExpression="ADD vectors :incrementValue SET "
             + "updated_at=:timestampValue",
@@ -154,7 +191,7 @@ def set_document_vectors(
 def set_sub_documents(workspace_id: str, document_id: str, sub_documents: int):
     timestamp = _get_timestamp()
 
-    response = documents_table.update_item(
+    response = _get_documents_table().update_item(
         Key={"workspace_id": workspace_id, "document_id": document_id},
         UpdateExpression="SET sub_documents=:subDocumentsValue, "
         + "updated_at=:timestampValue",
@@ -170,7 +207,7 @@ def set_sub_documents(workspace_id: str, document_id: str, sub_documents: int):
 
 
 def get_document(workspace_id: str, document_id: str):
-    response = documents_table.get_item(
+    response = _get_documents_table().get_item(
         Key={"workspace_id": workspace_id, "document_id": document_id}
     )
     document = response.get("Item")
@@ -179,7 +216,7 @@ def get_document(workspace_id: str, document_id: str):
 
 
 def delete_document(workspace_id: str, document_id: str):
-    response = documents_table.get_item(
+    response = _get_documents_table().get_item(
         Key={"workspace_id": workspace_id, "document_id": document_id}
     )
 
@@ -215,14 +252,16 @@ def get_document_content(workspace_id: str, document_id: str):
     if not genai_core.utils.files.file_exists(PROCESSING_BUCKET_NAME, content_key):
         return None
 
-    response = s3.Object(PROCESSING_BUCKET_NAME, content_key).get()
+    response = _get_s3().Object(PROCESSING_BUCKET_NAME, content_key).get()
     content = response["Body"].read().decode("utf-8")
 
     content_complement = None
     if genai_core.utils.files.file_exists(
         PROCESSING_BUCKET_NAME, content_complement_key
     ):
-        response = s3.Object(PROCESSING_BUCKET_NAME, content_complement_key).get()
+        response = (
+            _get_s3().Object(PROCESSING_BUCKET_NAME, content_complement_key).get()
+        )
         content_complement = response["Body"].read().decode("utf-8")
 
     return {"content": content, "content_complement": content_complement}
@@ -230,7 +269,7 @@ def get_document_content(workspace_id: str, document_id: str):
 
 def set_status(workspace_id: str, document_id: str, status: str):
     timestamp = _get_timestamp()
-    response = documents_table.update_item(
+    response = _get_documents_table().update_item(
         Key={"workspace_id": workspace_id, "document_id": document_id},
         UpdateExpression="SET #status=:status, updated_at=:timestampValue",
         ExpressionAttributeNames={
@@ -246,7 +285,7 @@ def set_status(workspace_id: str, document_id: str, status: str):
 
 def update_subscription_timestamp(workspace_id: str, document_id: str):
     timestamp = _get_timestamp()
-    response = documents_table.update_item(
+    response = _get_documents_table().update_item(
         Key={"workspace_id": workspace_id, "document_id": document_id},
         UpdateExpression="SET rss_last_checked=:timestampValue",
         ExpressionAttributeValues={
@@ -276,7 +315,7 @@ def create_document(
     document = None
     unique_path_document = document_type in ["file", "website", "rssfeed"]
     if unique_path_document:
-        response = documents_table.query(
+        response = _get_documents_table().query(
             IndexName=DOCUMENTS_BY_COMPOUND_KEY_INDEX_NAME,
             KeyConditionExpression="workspace_id=:workspaceValue AND "
             + "compound_sort_key=:compoundKeyValue",
@@ -298,7 +337,7 @@ def create_document(
         current_size_in_bytes = document["size_in_bytes"]
         current_vectors = document["vectors"]
 
-        response = documents_table.update_item(
+        response = _get_documents_table().update_item(
             Key={
                 "workspace_id": workspace_id,
                 "document_id": document_id,
@@ -346,10 +385,10 @@ def create_document(
         if document_type in ["rssfeed"] and "crawler_properties" in kwargs:
             document["crawler_properties"] = kwargs["crawler_properties"]
 
-        response = documents_table.put_item(Item=document)
+        response = _get_documents_table().put_item(Item=document)
 
     size_diff = size_in_bytes - current_size_in_bytes
-    response = workspaces_table.update_item(
+    response = _get_workspaces_table().update_item(
         Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
         UpdateExpression="ADD size_in_bytes :incrementValue, "
         + "documents :documentsIncrementValue, "
@@ -408,7 +447,7 @@ def update_document(workspace_id: str, document_id: str, document_type: str, **k
             follow_links = kwargs["follow_links"]
             limit = kwargs["limit"]
             content_types = kwargs["content_types"]
-            response = documents_table.update_item(
+            response = _get_documents_table().update_item(
                 Key={"workspace_id": workspace_id, "document_id": document_id},
                 UpdateExpression="SET #crawler_properties=:crawler_properties, "
                 + "updated_at=:timestampValue",
@@ -536,7 +575,9 @@ def _process_document(
             follow_links = False
 
             try:
-                urls_to_crawl = genai_core.websites.extract_urls_from_sitemap(path)
+                urls_to_crawl = genai_core.websites.extract_urls_from_sitemap(
+                    path, limit=limit
+                )
                 limit = min(limit, len(urls_to_crawl))
 
                 if len(urls_to_crawl) == 0:
@@ -603,42 +644,60 @@ def _upload_document_content(
     content_complement: Optional[str] = None,
 ):
     if document_type == "text":
-        s3.Object(
+        _get_s3().Object(
             PROCESSING_BUCKET_NAME, f"{workspace_id}/{document_id}/content.txt"
         ).put(Body=content)
     elif document_type == "qna":
-        s3.Object(
+        _get_s3().Object(
             PROCESSING_BUCKET_NAME, f"{workspace_id}/{document_id}/content.txt"
         ).put(Body=content)
-        s3.Object(
+        _get_s3().Object(
             PROCESSING_BUCKET_NAME,
             f"{workspace_id}/{document_id}/content_complement.txt",
         ).put(Body=content_complement)
 
 
 def ingest_rss_feeds():
-    feeds_to_crawl = dynamodb_client.query(
-        TableName=DOCUMENTS_TABLE_NAME,
-        IndexName=DOCUMENTS_BY_STATUS_INDEX,
-        KeyConditionExpression="#status = :status AND #document_type = :document_type",
-        ExpressionAttributeNames={
-            "#status": "status",
-            "#document_type": "document_type",
-        },
-        ExpressionAttributeValues={
-            ":status": {
-                "S": "enabled",
+    feeds = []
+    last_evaluated_key = None
+    while True:
+        query_kwargs = {}
+        if last_evaluated_key:
+            query_kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+        feeds_to_crawl = dynamodb_client.query(
+            TableName=DOCUMENTS_TABLE_NAME,
+            IndexName=DOCUMENTS_BY_STATUS_INDEX,
+            KeyConditionExpression="#status = :status AND "
+            + "#document_type = :document_type",
+            ExpressionAttributeNames={
+                "#status": "status",
+                "#document_type": "document_type",
             },
-            ":document_type": {
-                "S": "rssfeed",
+            ExpressionAttributeValues={
+                ":status": {
+                    "S": "enabled",
+                },
+                ":document_type": {
+                    "S": "rssfeed",
+                },
             },
-        },
-    )
-    if feeds_to_crawl["Count"] > 0:
+            **query_kwargs,
+        )
         for item in feeds_to_crawl["Items"]:
-            workspace_id = item["workspace_id"]["S"]
-            document_id = item["document_id"]["S"]
-            _trigger_rss_feed_ingestor(workspace_id, document_id)
+            feeds.append((item["workspace_id"]["S"], item["document_id"]["S"]))
+
+        last_evaluated_key = feeds_to_crawl.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            break
+
+    # The ingestor is invoked asynchronously, the concurrency only
+    # bounds the number of pending invoke calls.
+    if len(feeds) > 0:
+        with ThreadPoolExecutor(max_workers=RSS_FEED_INGESTOR_CONCURRENCY) as executor:
+            list(executor.map(lambda feed: _trigger_rss_feed_ingestor(*feed), feeds))
+
+    return len(feeds)
 
 
 def _trigger_rss_feed_ingestor(
@@ -698,44 +757,124 @@ def check_rss_feed_for_posts(workspace_id, document_id):
     try:
         feed_contents = feedparser.parse(feed_path)
         if feed_contents:
+            # Entries sharing the same link are the same post
+            entries = {}
             for feed_entry in feed_contents.entries:
-                timestamp = _get_timestamp()
                 post_id = str(_get_hash_id_from_path(feed_entry.get("link", "")))
-                document = {
-                    "format_version": 1,
-                    "workspace_id": workspace_id,
-                    "document_id": post_id,
-                    "rss_feed_id": document_id,
-                    "document_type": "rsspost",
-                    "document_sub_type": None,
-                    "sub_documents": None,
-                    "compound_sort_key": f"rsspost/{document_id}/{post_id}",
-                    "status": "pending",
-                    "title": feed_entry.get("title", ""),
-                    "path": feed_entry.get("link", ""),
-                    "size_in_bytes": 0,
-                    "vectors": 0,
-                    "errors": [],
-                    "created_at": timestamp,
-                    "updated_at": timestamp,
-                    "crawler_properties": rss_document.get("crawler_properties", None),
-                }
-                try:
-                    documents_table.put_item(
-                        Item=document,
-                        ConditionExpression="attribute_not_exists(document_id)",
-                    )
-                except botocore.exceptions.ClientError as e:
-                    if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
-                        logger.info(f"Post already exists: {feed_entry['link']}")
-                        continue
-                    else:
-                        raise e
+                entries.setdefault(post_id, feed_entry)
+
+            existing_post_ids = _get_existing_document_ids(
+                workspace_id, list(entries.keys())
+            )
+
+            new_posts = []
+            for post_id, feed_entry in entries.items():
+                if post_id in existing_post_ids:
+                    logger.info(f"Post already exists: {feed_entry.get('link')}")
+                    continue
+
+                timestamp = _get_timestamp()
+                new_posts.append(
+                    {
+                        "format_version": 1,
+                        "workspace_id": workspace_id,
+                        "document_id": post_id,
+                        "rss_feed_id": document_id,
+                        "document_type": "rsspost",
+                        "document_sub_type": None,
+                        "sub_documents": None,
+                        "compound_sort_key": f"rsspost/{document_id}/{post_id}",
+                        "status": "pending",
+                        "title": feed_entry.get("title", ""),
+                        "path": feed_entry.get("link", ""),
+                        "size_in_bytes": 0,
+                        "vectors": 0,
+                        "errors": [],
+                        "created_at": timestamp,
+                        "updated_at": timestamp,
+                        "crawler_properties": rss_document.get(
+                            "crawler_properties", None
+                        ),
+                    }
+                )
+
+            # Most posts were already found by a previous poll, only the
+            # new ones are written
+            logger.info(
+                "RSS Feed posts",
+                entries=len(entries),
+                new_posts=_put_new_documents(new_posts),
+            )
         update_subscription_timestamp(workspace_id, document_id)
     except Exception as e:
         raise genai_core.types.CommonError("Error parsing feed", e)
 
 
+def _get_existing_document_ids(workspace_id: str, document_ids: list):
+    """Returns the ids that already exist in the documents table using
+    BatchGetItem (100 keys per request)."""
+    existing_ids = set()
+    for idx in range(0, len(document_ids), DYNAMODB_BATCH_GET_SIZE):
+        request_items = {
+            DOCUMENTS_TABLE_NAME: {
+                "Keys": [
+                    {"workspace_id": {"S": workspace_id}, "document_id": {"S": doc_id}}
+                    for doc_id in document_ids[idx : idx + DYNAMODB_BATCH_GET_SIZE]
+                ],
+                "ProjectionExpression": "document_id",
+            }
+        }
+
+        attempt = 0
+        while request_items:
+            response = dynamodb_client.batch_get_item(RequestItems=request_items)
+            for item in response["Responses"].get(DOCUMENTS_TABLE_NAME, []):
+                existing_ids.add(item["document_id"]["S"])
+
+            request_items = response.get("UnprocessedKeys")
+            attempt = _wait_for_unprocessed_items(request_items, attempt)
+
+    return existing_ids
+
+
+def _put_new_documents(documents: list):
+    """Writes the documents that do not exist yet, returns the number written.
+
+    The puts are conditional so a document created or processed since it was
+    read (overlapping polls) is not reset."""
+    written = 0
+    for document in documents:
+        try:
+            dynamodb_client.put_item(
+                TableName=DOCUMENTS_TABLE_NAME,
+                Item={
+                    key: type_serializer.serialize(value)
+                    for key, value in document.items()
+                },
+                ConditionExpression="attribute_not_exists(document_id)",
+            )
+            written += 1
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise e
+            logger.info(f"Post already exists: {document['path']}")
+
+    return written
+
+
+def _wait_for_unprocessed_items(unprocessed_items: Optional[dict], attempt: int):
+    """Backs off before retrying the items a batch request did not process."""
+    if not unprocessed_items:
+        return attempt
+
+    if attempt >= DYNAMODB_BATCH_MAX_ATTEMPTS:
+        raise genai_core.types.CommonError("Too many unprocessed items")
+
+    time.sleep(min(0.05 * 2**attempt, 2))
+
+    return attempt + 1
+
+
 def _get_hash_id_from_path(path):
     """Returns a hash id from a path
     This is useful if the ID needs to be NON-unique.
@@ -744,74 +883,202 @@ def _get_hash_id_from_path(path):
 
 
 def batch_crawl_websites():
-    """Gets next 10 pending posts and sends them to be website crawled"""
-    posts = _get_batch_pending_posts()
-    if posts["Count"] > 0:
-        for post in posts["Items"]:
-            workspace_id = post["workspace_id"]["S"]
-            feed_id = post["rss_feed_id"]["S"]
-            document_id = post["document_id"]["S"]
-            path = post["path"]["S"]
-
-            properties = post["crawler_properties"]
-
-            follow_links = True
-            if (
-                properties
-                and properties["M"]
-                and properties["M"]["follow_links"]
-                and properties["M"]["follow_links"]["BOOL"] == False
-            ):
-                follow_links = False
-
-            limit = 250
-            if (
-                properties
-                and properties["M"]
-                and properties["M"]["limit"]
-                and properties["M"]["limit"]["N"]
-            ):
-                limit = int(post["crawler_properties"]["M"]["limit"]["N"])
-
-            content_types = []
-            if (
-                properties
-                and properties["M"]
-                and properties["M"]["content_types"]
-                and properties["M"]["content_types"]["L"]
-            ):
-                for type in post["crawler_properties"]["M"]["content_types"]["L"]:
-                    content_types.append(type["S"])
-            else:
-                content_types.append("text/html")
-
-            create_document(
-                workspace_id,
-                "website",
-                path=path,
-                crawler_properties={
-                    "follow_links": follow_links,
-                    "limit": limit,
-                    "content_types": content_types,
-                },
-            )
-            set_status(workspace_id, document_id, "processed")
-            update_subscription_timestamp(workspace_id, feed_id)
+    """Sends pending posts to be website crawled at the target rate.
+
+    The batch covers RSS_CRAWL_TARGET_RATE_PER_MINUTE for the schedule
+    interval, minus the crawls still running when the crawler workflow is
+    at RSS_CRAWL_MAX_RUNNING_CRAWLS. The crawls are started concurrently
+    and the remaining backlog is reported with the drain rate. Posts that
+    failed RSS_CRAWL_MAX_ATTEMPTS times leave the backlog and are reported
+    separately. Both counts stop at RSS_CRAWL_BACKLOG_COUNT_LIMIT so a
+    large backlog is not read on every run.
+    """
+    target_batch_size = min(
+        RSS_CRAWL_TARGET_RATE_PER_MINUTE * RSS_CRAWL_SCHEDULE_MINUTES,
+        RSS_CRAWL_MAX_BATCH_SIZE,
+    )
+    running_crawls = _count_running_crawls(RSS_CRAWL_MAX_RUNNING_CRAWLS)
+    batch_size = max(
+        min(target_batch_size, RSS_CRAWL_MAX_RUNNING_CRAWLS - running_crawls), 0
+    )
+
+    posts = _get_batch_pending_posts(batch_size) if batch_size > 0 else []
+    dispatched = 0
+    if len(posts) > 0:
+        with ThreadPoolExecutor(
+            max_workers=min(RSS_CRAWL_DISPATCH_CONCURRENCY, len(posts))
+        ) as executor:
+            dispatched = sum(executor.map(_crawl_pending_post, posts))
+
+    backlog = _count_posts("pending", RSS_CRAWL_BACKLOG_COUNT_LIMIT)
+    drain_rate = dispatched / RSS_CRAWL_SCHEDULE_MINUTES
+    report = {
+        "running_crawls": running_crawls,
+        "batch_size": batch_size,
+        "dispatched": dispatched,
+        "failed": len(posts) - dispatched,
+        "backlog": backlog,
+        "failed_posts": _count_posts("error", RSS_CRAWL_BACKLOG_COUNT_LIMIT),
+        "drain_rate_per_minute": drain_rate,
+        "estimated_minutes_to_drain": (
+            round(backlog / drain_rate) if drain_rate > 0 else None
+        ),
+    }
+    logger.info("RSS posts crawl report", **report)
+
+    return report
+
+
+def _crawl_pending_post(post: dict):
+    """Starts the website crawl of a post, returns False if it failed."""
+    workspace_id = post["workspace_id"]["S"]
+    feed_id = post["rss_feed_id"]["S"]
+    document_id = post["document_id"]["S"]
+    path = post["path"]["S"]
+
+    # Posts of feeds created without crawler properties store a NULL value
+    properties = post.get("crawler_properties", {}).get("M") or {}
+
+    follow_links = True
+    if properties.get("follow_links", {}).get("BOOL") == False:
+        follow_links = False
+
+    limit = 250
+    if properties.get("limit", {}).get("N"):
+        limit = int(properties["limit"]["N"])
+
+    content_types = []
+    if properties.get("content_types", {}).get("L"):
+        for type in properties["content_types"]["L"]:
+            content_types.append(type["S"])
+    else:
+        content_types.append("text/html")
+
+    try:
+        create_document(
+            workspace_id,
+            "website",
+            path=path,
+            crawler_properties={
+                "follow_links": follow_links,
+                "limit": limit,
+                "content_types": content_types,
+            },
+        )
+        set_status(workspace_id, document_id, "processed")
+        update_subscription_timestamp(workspace_id, feed_id)
+    except Exception as e:
+        logger.exception(e)
+        _record_crawl_failure(workspace_id, document_id)
+        return False
 
+    return True
 
-def _get_batch_pending_posts():
-    """Gets the first 10 Pending Posts from the RSS Feed to Crawl"""
-    return dynamodb_client.query(
+
+def _record_crawl_failure(workspace_id: str, document_id: str):
+    """Counts the failed crawls of a post, the post is set to error once it
+    reaches RSS_CRAWL_MAX_ATTEMPTS so it no longer holds the first places
+    of the pending posts."""
+    response = dynamodb_client.update_item(
         TableName=DOCUMENTS_TABLE_NAME,
-        IndexName=DOCUMENTS_BY_STATUS_INDEX,
-        Limit=10,
-        KeyConditionExpression="#status = :status and #document_type = :document_type",
+        Key={"workspace_id": {"S": workspace_id}, "document_id": {"S": document_id}},
+        UpdateExpression="SET updated_at = :updated_at ADD crawl_attempts :one",
         ExpressionAttributeValues={
-            ":status": {"S": "pending"},
-            ":document_type": {"S": "rsspost"},
-        },
-        ExpressionAttributeNames={
-            "#status": "status",
-            "#document_type": "document_type",
+            ":updated_at": {"S": _get_timestamp()},
+            ":one": {"N": "1"},
         },
+        ReturnValues="UPDATED_NEW",
     )
+
+    attempts = int(response["Attributes"]["crawl_attempts"]["N"])
+    if attempts >= RSS_CRAWL_MAX_ATTEMPTS:
+        logger.warning(
+            "RSS post crawl failed too many times",
+            workspace_id=workspace_id,
+            document_id=document_id,
+            attempts=attempts,
+        )
+        set_status(workspace_id, document_id, "error")
+
+
+def _get_batch_pending_posts(limit: int):
+    """Gets the first pending posts from the RSS Feeds to crawl"""
+    posts = []
+    last_evaluated_key = None
+    while len(posts) < limit:
+        query_kwargs = {}
+        if last_evaluated_key:
+            query_kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+        response = dynamodb_client.query(
+            TableName=DOCUMENTS_TABLE_NAME,
+            IndexName=DOCUMENTS_BY_STATUS_INDEX,
+            Limit=limit - len(posts),
+            KeyConditionExpression="#status = :status and "
+            + "#document_type = :document_type",
+            ExpressionAttributeValues={
+                ":status": {"S": "pending"},
+                ":document_type": {"S": "rsspost"},
+            },
+            ExpressionAttributeNames={
+                "#status": "status",
+                "#document_type": "document_type",
+            },
+            **query_kwargs,
+        )
+        posts.extend(response["Items"])
+
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            break
+
+    return posts
+
+
+def _count_posts(status: str, limit: int):
+    """Counts the RSS posts with the status, up to limit."""
+    count = 0
+    last_evaluated_key = None
+    while count < limit:
+        query_kwargs = {}
+        if last_evaluated_key:
+            query_kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+        response = dynamodb_client.query(
+            TableName=DOCUMENTS_TABLE_NAME,
+            IndexName=DOCUMENTS_BY_STATUS_INDEX,
+            Select="COUNT",
+            Limit=limit - count,
+            KeyConditionExpression="#status = :status and "
+            + "#document_type = :document_type",
+            ExpressionAttributeValues={
+                ":status": {"S": status},
+                ":document_type": {"S": "rsspost"},
+            },
+            ExpressionAttributeNames={
+                "#status": "status",
+                "#document_type": "document_type",
+            },
+            **query_kwargs,
+        )
+        count += response["Count"]
+
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            break
+
+    return count
+
+
+def _count_running_crawls(limit: int):
+    """Counts the running website crawls, up to limit."""
+    count = 0
+    paginator = sfn_client.get_paginator("list_executions")
+    for page in paginator.paginate(
+        stateMachineArn=WEBSITE_CRAWLING_WORKFLOW_ARN, statusFilter="RUNNING"
+    ):
+        count += len(page["executions"])
+        if count >= limit:
+            return limit
+
+    return count
@@ -1,3 +1,4 @@
 # flake8: noqa
 from .workspace_retriever import *
 from .chat_message_history import *
+from .chat_memory import *
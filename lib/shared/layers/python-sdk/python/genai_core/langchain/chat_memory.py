@@ -0,0 +1,161 @@
+import os
+from typing import List, Optional, Tuple
+from langchain.memory.prompt import SUMMARY_PROMPT
+from langchain.schema import BaseChatMessageHistory
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    get_buffer_string,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+from genai_core.types import ChatMemoryStrategy
+from .chat_message_history import DynamoDBChatMessageHistory
+
+# Defaults used when the application does not set them
+CHAT_MEMORY_WINDOW_SIZE = int(os.environ.get("CHAT_MEMORY_WINDOW_SIZE", "10"))
+CHAT_MEMORY_MAX_TOKENS = int(os.environ.get("CHAT_MEMORY_MAX_TOKENS", "4000"))
+
+
+class WindowedChatMessageHistory(BaseChatMessageHistory):
+    """View of a DynamoDBChatMessageHistory that only returns the part of
+    the conversation kept by the memory strategy:
+
+    - window: the last window_size turns
+    - token_window: the last turns that fit in max_tokens
+    - summary: the rolling summary stored with the session, followed by
+      the turns it does not cover (within max_tokens)
+
+    A turn starts with a human message, the view never starts in the
+    middle of one. The files of the current turn (temporary messages) are
+    always kept. Writes go to the underlying history.
+    """
+
+    def __init__(
+        self,
+        history: DynamoDBChatMessageHistory,
+        strategy: ChatMemoryStrategy,
+        window_size: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+    ):
+        self.history = history
+        self.strategy = strategy
+        self.window_size = window_size or CHAT_MEMORY_WINDOW_SIZE
+        self.max_tokens = max_tokens or CHAT_MEMORY_MAX_TOKENS
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        messages = self.history.messages
+        files_start = len(messages) - len(self.history.temporary_messages)
+        conversation = messages[:files_start]
+        files = messages[files_start:]
+
+        if self.strategy == ChatMemoryStrategy.WINDOW:
+            conversation = get_last_turns(conversation, self.window_size)
+        elif self.strategy == ChatMemoryStrategy.TOKEN_WINDOW:
+            conversation = trim_to_token_budget(conversation, self.max_tokens)
+        elif self.strategy == ChatMemoryStrategy.SUMMARY:
+            conversation = self._get_summarized_conversation(conversation)
+
+        return conversation + files
+
+    def _get_summarized_conversation(self, conversation: List[BaseMessage]):
+        stored_count = len(self.history.stored_messages or [])
+        summary_count = min(self.history.summary_message_count, stored_count)
+        if not self.history.summary or summary_count == 0:
+            return trim_to_token_budget(conversation, self.max_tokens)
+
+        summary_message = SystemMessage(
+            content="Summary of the earlier conversation:\n" + self.history.summary
+        )
+        budget = self.max_tokens - count_tokens_approximately([summary_message])
+        recent = trim_to_token_budget(conversation[summary_count:], budget)
+
+        return [summary_message] + recent
+
+    def get_summary_update(
+        self,
+    ) -> Optional[Tuple[Optional[str], List[BaseMessage], int]]:
+        """Returns the current summary, the stored messages that left the
+        window since it was computed and the number of messages the new
+        summary covers. None when the summary is up to date."""
+        if self.strategy != ChatMemoryStrategy.SUMMARY:
+            return None
+
+        # Reads the session when it is not read yet
+        self.history.messages
+        stored = self.history.stored_messages or []
+        summary_count = min(self.history.summary_message_count, len(stored))
+        if not self.history.summary:
+            summary_count = 0
+
+        message_count = len(stored) - len(get_last_turns(stored, self.window_size))
+        if message_count <= summary_count:
+            return None
+
+        return (
+            self.history.summary if summary_count > 0 else None,
+            stored[summary_count:message_count],
+            message_count,
+        )
+
+    def add_message(self, message: BaseMessage) -> None:
+        self.history.add_message(message)
+
+    def clear(self) -> None:
+        self.history.clear()
+
+
+def get_last_turns(messages: List[BaseMessage], turns: int) -> List[BaseMessage]:
+    if turns <= 0:
+        return []
+
+    turn_starts = [
+        idx for idx, message in enumerate(messages) if isinstance(message, HumanMessage)
+    ]
+    if len(turn_starts) <= turns:
+        return _start_with_turn(messages)
+
+    return messages[turn_starts[-turns] :]
+
+
+def trim_to_token_budget(
+    messages: List[BaseMessage], max_tokens: int
+) -> List[BaseMessage]:
+    """Returns the last turns of the messages within the approximate
+    token budget."""
+    start = len(messages)
+    tokens = 0
+    while start > 0:
+        tokens += count_tokens_approximately([messages[start - 1]])
+        if tokens > max_tokens:
+            break
+        start -= 1
+
+    return _start_with_turn(messages[start:])
+
+
+def _start_with_turn(messages: List[BaseMessage]) -> List[BaseMessage]:
+    for idx, message in enumerate(messages):
+        if isinstance(message, HumanMessage):
+            return messages[idx:]
+
+    return []
+
+
+def summarize_messages(llm, summary: Optional[str], messages: List[BaseMessage]):
+    """Adds the messages to the summary with the llm"""
+    prompt = SUMMARY_PROMPT.format(
+        summary=summary or "", new_lines=get_buffer_string(messages)
+    )
+    result = llm.invoke(prompt)
+
+    # Chat models return a message, the content can be a list of blocks
+    content = getattr(result, "content", result)
+    if isinstance(content, list):
+        content = "".join(
+            block.get("text", "") for block in content if isinstance(block, dict)
+        )
+
+    return content.strip()
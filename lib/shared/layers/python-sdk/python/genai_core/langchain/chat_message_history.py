@@ -1,7 +1,8 @@
 import json
 from aws_lambda_powertools import Logger
 import boto3
-from typing import List
+from contextlib import contextmanager
+from typing import List, Optional
 from decimal import Decimal
 from datetime import datetime
 from botocore.exceptions import ClientError
@@ -11,7 +12,6 @@ from langchain.schema.messages import (
     BaseMessage,
     _message_to_dict,
     messages_from_dict,
-    messages_to_dict,
 )
 from langchain_core.messages.ai import AIMessage, AIMessageChunk
 from langchain_core.messages.human import HumanMessage
@@ -19,30 +19,104 @@ from langchain_core.messages.human import HumanMessage
 client = boto3.resource("dynamodb")
 logger = Logger()
 
+TITLE_MAX_LENGTH = 256
+# Attempts of a write conditioned on the size of the history
+CONDITIONAL_WRITE_ATTEMPTS = 3
+
 
 class DynamoDBChatMessageHistory(BaseChatMessageHistory):
+    """Chat history stored in the History list of the session item.
+
+    Messages are appended with list_append and the last message is updated
+    in place, so a write does not read or rewrite the whole history.
+    Within write_batch() the writes of a turn are kept in memory and
+    stored with a single request.
+
+    The stored messages are read once and kept until this instance writes
+    to the session (or invalidate_messages() is called), so the chain,
+    the retriever and the prompt formatting of a turn share one read.
+
+    The rolling summary of the conversation (see ChatMemoryStrategy.SUMMARY)
+    is stored next to the history and read with it. The first message is
+    also stored as the Title of the session.
+    """
+
     def __init__(
         self,
         table_name: str,
         session_id: str,
         user_id: str,
+        consistent_read: bool = False,
+        dynamodb=None,
     ):
-        self.table = client.Table(table_name)
+        # A thread other than the request thread passes its own resource,
+        # the boto3 resources are not thread safe
+        self.table = (dynamodb or client).Table(table_name)
         self.session_id = session_id
         self.user_id = user_id
         self.temporary_messages = []
         self.start_time = None
+        # Number of stored messages, known after a read and kept up to date
+        # by the writes of this instance. None when it is unknown.
+        self.message_count = None
+        # Messages added in a write batch, None outside of a batch
+        self.pending_messages = None
+        self.consistent_read = consistent_read
+        # Snapshot of the stored messages, None when it must be read
+        self.stored_messages = None
+        # Summary of the first summary_message_count stored messages
+        self.summary = None
+        self.summary_message_count = 0
 
     @property
     def messages(self) -> List[BaseMessage]:
-        return self.get_messages_from_storage() + self.temporary_messages
+        stored_messages = self.stored_messages
+        if stored_messages is None:
+            stored_messages = self.get_messages_from_storage()
+
+        pending_messages = messages_from_dict(self.pending_messages or [])
+        return stored_messages + pending_messages + self.temporary_messages
+
+    def invalidate_messages(self) -> None:
+        """Read the stored messages again on the next access"""
+        self.stored_messages = None
 
-    def get_messages_from_storage(self) -> List[BaseMessage]:
+    @contextmanager
+    def write_batch(self):
+        """Collect the messages and metadata added in the block and store
+        them with one UpdateItem when it exits (also on errors, like
+        separate writes would have stored them).
+
+        The write is conditioned on the size of the history, the turn is
+        appended right after the messages it was generated from. When
+        another turn was stored meanwhile, the history is read again and
+        the turn is appended after it."""
+        if self.pending_messages is not None:
+            # Nested batches are part of the outer one
+            yield self
+            return
+
+        self.pending_messages = []
+        try:
+            yield self
+        finally:
+            pending_messages = self.pending_messages
+            self.pending_messages = None
+            if pending_messages:
+                self._append_messages(pending_messages, conditional=True)
+
+    def get_messages_from_storage(
+        self, consistent_read: Optional[bool] = None
+    ) -> List[BaseMessage]:
         """Retrieve the messages from DynamoDB"""
+        if consistent_read is None:
+            consistent_read = self.consistent_read
+
         response = None
         try:
             response = self.table.get_item(
-                Key={"SessionId": self.session_id, "UserId": self.user_id}
+                Key={"SessionId": self.session_id, "UserId": self.user_id},
+                ConsistentRead=consistent_read,
             )
         except ClientError as error:
             if error.response["Error"]["Code"] == "ResourceNotFoundException":
@@ -55,14 +129,22 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
             self.start_time = response["Item"].get(
                 "StartTime", datetime.now().isoformat()
             )
+            self.summary = response["Item"].get("Summary")
+            self.summary_message_count = int(
+                response["Item"].get("SummaryMessageCount", 0)
+            )
         else:
             items = []
 
-        return messages_from_dict(items)
+        messages = messages_from_dict(items)
+        if response is not None:
+            self.message_count = len(items)
+            self.stored_messages = messages
+
+        return list(messages)
 
     def add_message(self, message: BaseMessage) -> None:
         """Append the message to the record in DynamoDB"""
-        messages = messages_to_dict(self.get_messages_from_storage())
         if isinstance(message, AIMessageChunk):
             # When streaming with RunnableWithMessageHistory,
             # it would add a chunk to the history but it expects a text as content.
@@ -73,19 +155,97 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
             _message = _message_to_dict(AIMessage(ai_message))
         else:
             _message = _message_to_dict(message)
-        messages.append(_message)
 
-        try:
-            self.table.put_item(
-                Item={
-                    "SessionId": self.session_id,
-                    "UserId": self.user_id,
-                    "StartTime": datetime.now().isoformat(),
-                    "History": messages,
-                }
+        if self.pending_messages is not None:
+            self.pending_messages.append(_message)
+            return
+
+        self._append_messages([_message])
+
+    def _append_messages(self, messages: List[dict], conditional=False) -> None:
+        """Append the messages to the history. A conditional append only
+        succeeds if the size of the history is the one last read or written
+        by this instance."""
+        for attempt in range(CONDITIONAL_WRITE_ATTEMPTS):
+            if conditional and (self.message_count is None or attempt > 0):
+                # The size of the history must be up to date
+                self.get_messages_from_storage(consistent_read=True)
+                if self.message_count is None:
+                    # The history could not be read
+                    conditional = False
+
+            title = self._get_title(messages)
+            self.invalidate_messages()
+
+            update_expression = (
+                "SET History = list_append(if_not_exists(History, :empty), "
+                + ":messages), StartTime = :startTime"
             )
-        except ClientError as err:
-            logger.exception(err)
+            values = {
+                ":empty": [],
+                ":messages": messages,
+                ":startTime": datetime.now().isoformat(),
+            }
+            if title is not None:
+                # Stored next to the history so the sessions can be listed
+                # without reading it
+                update_expression += ", Title = if_not_exists(Title, :title)"
+                values[":title"] = title
+
+            condition = {}
+            if conditional:
+                condition["ConditionExpression"] = "size(History) = :messageCount"
+                if self.message_count == 0:
+                    condition["ConditionExpression"] = (
+                        "attribute_not_exists(History) OR "
+                        + condition["ConditionExpression"]
+                    )
+                values[":messageCount"] = self.message_count
+
+            try:
+                self.table.update_item(
+                    Key={"SessionId": self.session_id, "UserId": self.user_id},
+                    UpdateExpression=update_expression,
+                    ExpressionAttributeValues=values,
+                    **condition,
+                )
+            except ClientError as err:
+                code = err.response["Error"]["Code"]
+                if (
+                    code == "ConditionalCheckFailedException"
+                    and attempt < CONDITIONAL_WRITE_ATTEMPTS - 1
+                ):
+                    logger.info("History changed, reading it again")
+                    continue
+
+                logger.exception(err)
+                self.message_count = None
+                return
+
+            if self.message_count is not None:
+                self.message_count += len(messages)
+            return
+
+    def _get_title(self, messages: List[dict]) -> Optional[str]:
+        """The title is the first message of the session. None when the
+        first message is not known without reading the session."""
+        if self.message_count == 0 and len(messages) > 0:
+            content = messages[0].get("data", {}).get("content")
+        elif self.stored_messages:
+            content = self.stored_messages[0].content
+        else:
+            return None
+
+        if isinstance(content, list):
+            content = " ".join(
+                block.get("text", "")
+                for block in content
+                if isinstance(block, dict) and block.get("type") == "text"
+            )
+        if not isinstance(content, str):
+            return None
+
+        return content[:TITLE_MAX_LENGTH]
 
     def add_temporary_message(self, message: HumanMessage) -> None:
         """Add a message without storing it (For example images, documents)"""
@@ -93,67 +253,81 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
 
     def add_metadata(self, metadata: dict) -> None:
         """Add additional metadata to the last message"""
-        messages = messages_to_dict(self.get_messages_from_storage())
-        if not messages:
-            return
-
         metadata = json.loads(json.dumps(metadata), parse_float=Decimal)
-        messages[-1]["data"]["additional_kwargs"] = metadata
-
-        try:
-            self.table.put_item(
-                Item={
-                    "SessionId": self.session_id,
-                    "UserId": self.user_id,
-                    "StartTime": (
-                        datetime.now().isoformat()
-                        if self.start_time is None
-                        else self.start_time
-                    ),
-                    "History": messages,
-                }
-            )
-
-        except Exception as err:
-            logger.exception(err)
+        self._update_last_message("additional_kwargs", metadata)
 
     def replace_last_message(self, content: str) -> None:
         """Replace the last message. For example when it is blocked by guardrails"""
-        messages = messages_to_dict(self.get_messages_from_storage())
-        if not messages:
+        self._update_last_message("content", content)
+
+    def _update_last_message(self, field: str, value) -> None:
+        """Set a data field of the last stored message.
+
+        The index of the last message comes from the previous read or
+        write. The update is conditioned on the size of the history, if
+        another writer changed it the messages are read again."""
+        if self.pending_messages:
+            self.pending_messages[-1]["data"][field] = value
             return
 
-        logger.info(
-            "updaing",
-            content=content,
-            date=self.start_time,
-            item={
-                "SessionId": self.session_id,
-                "UserId": self.user_id,
-                "StartTime": (
-                    datetime.now().isoformat()
-                    if self.start_time is None
-                    else self.start_time
-                ),
-                "History": messages,
-            },
-        )
+        for attempt in range(2):
+            if self.message_count is None or attempt > 0:
+                # The size of the history must be up to date
+                self.get_messages_from_storage(consistent_read=True)
+
+            if not self.message_count:
+                return
+
+            try:
+                self.table.update_item(
+                    Key={"SessionId": self.session_id, "UserId": self.user_id},
+                    UpdateExpression=f"SET History[{self.message_count - 1}]"
+                    + ".#data.#field = :value",
+                    ConditionExpression="size(History) = :messageCount",
+                    ExpressionAttributeNames={"#data": "data", "#field": field},
+                    ExpressionAttributeValues={
+                        ":value": value,
+                        ":messageCount": self.message_count,
+                    },
+                )
+                self.invalidate_messages()
+                return
+            except ClientError as err:
+                code = err.response["Error"]["Code"]
+                if code == "ConditionalCheckFailedException" and attempt == 0:
+                    logger.info("History changed, reading it again")
+                    continue
+
+                logger.exception(err)
+                return
+            except Exception as err:
+                logger.exception(err)
+                return
+
+    def update_summary(self, summary: str, message_count: int) -> bool:
+        """Store the summary of the first message_count messages. A stored
+        summary that covers more messages is kept."""
         try:
-            self.table.put_item(
-                Item={
-                    "SessionId": self.session_id,
-                    "UserId": self.user_id,
-                    "StartTime": (
-                        datetime.now().isoformat()
-                        if self.start_time is None
-                        else self.start_time
-                    ),
-                    "History": messages,
-                }
+            self.table.update_item(
+                Key={"SessionId": self.session_id, "UserId": self.user_id},
+                UpdateExpression="SET Summary = :summary, "
+                + "SummaryMessageCount = :messageCount",
+                ConditionExpression="attribute_exists(SessionId) AND ("
+                + "attribute_not_exists(SummaryMessageCount) "
+                + "OR SummaryMessageCount < :messageCount)",
+                ExpressionAttributeValues={
+                    ":summary": summary,
+                    ":messageCount": message_count,
+                },
             )
+        except ClientError as err:
+            if err.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                logger.info("A more recent summary is already stored")
+            else:
+                logger.exception(err)
+            return False
 
-        except Exception as err:
-            logger.exception(err)
+        return True
 
     def clear(self) -> None:
         """Clear session memory from DynamoDB"""
@@ -163,3 +337,7 @@ class DynamoDBChatMessageHistory(BaseChatMessageHistory):
             )
         except ClientError as err:
             logger.exception(err)
+        self.message_count = 0
+        self.stored_messages = []
+        self.summary = None
+        self.summary_message_count = 0
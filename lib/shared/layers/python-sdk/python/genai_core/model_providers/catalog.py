@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from aws_lambda_powertools import Logger
+
+logger = Logger()
+
+
+class ModelCatalog:
+    """Cache of the models listed by a provider.
+
+    The models are listed again after ttl seconds. Within max_staleness
+    seconds after that, the previous list is returned while it is listed
+    again in the background. Only one listing runs at a time.
+
+    The returned models are shared by the callers of the catalog, they are
+    read-only.
+    """
+
+    def __init__(
+        self,
+        list_models: Callable[[], list[dict[str, Any]]],
+        ttl: float,
+        max_staleness: float = 0,
+    ):
+        self.list_models = list_models
+        self.ttl = ttl
+        self.max_staleness = max_staleness
+        # (models, models by name, models by provider and name, listing
+        # time), replaced as a whole
+        self.state = None
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+    def get_models(self) -> list[dict[str, Any]]:
+        return self._get_state()[0]
+
+    def get_model(
+        self, name: str, provider: Optional[str] = None
+    ) -> Optional[dict[str, Any]]:
+        """Returns the model of the provider with this name, or the first
+        listed model with this name when the provider is not set"""
+        state = self._get_state()
+        if provider is None:
+            return state[1].get(name)
+
+        return state[2].get((provider, name))
+
+    def invalidate(self) -> None:
+        self.state = None
+
+    def _get_state(self):
+        # The state is read once, it can be replaced or invalidated by
+        # another thread meanwhile
+        state = self.state
+        if state is not None:
+            age = time.monotonic() - state[3]
+            if age < self.ttl:
+                return state
+            if age < self.ttl + self.max_staleness:
+                self._refresh_in_background()
+                return state
+
+        with self.lock:
+            # The models may have been listed while waiting for the lock
+            state = self.state
+            if state is None or time.monotonic() - state[3] >= self.ttl:
+                state = self._refresh()
+
+        return state
+
+    def _refresh(self):
+        started = time.monotonic()
+        models = self.list_models()
+
+        by_name = {}
+        by_provider_name = {}
+        for model in models:
+            by_name.setdefault(model.get("name"), model)
+            by_provider_name.setdefault(
+                (model.get("provider"), model.get("name")), model
+            )
+
+        self.state = (models, by_name, by_provider_name, started)
+        logger.info(
+            "Models listed",
+            models=len(models),
+            duration_ms=round((time.monotonic() - started) * 1000),
+        )
+
+        return self.state
+
+    def _refresh_in_background(self) -> None:
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        def refresh():
+            try:
+                with self.lock:
+                    self._refresh()
+            except Exception as error:
+                # The previous models are used until a listing succeeds
+                logger.exception(error)
+            finally:
+                self.refreshing = False
+
+        threading.Thread(target=refresh, daemon=True).start()
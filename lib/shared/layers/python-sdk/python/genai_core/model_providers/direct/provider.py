@@ -1,6 +1,8 @@
+import copy
 import os
 import re
 from abc import ABC
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
 from aws_lambda_powertools import Logger
@@ -9,9 +11,14 @@ import genai_core.clients
 import genai_core.parameters
 from genai_core.types import EmbeddingsModel, Modality, ModelInterface, Provider
 
+from ..catalog import ModelCatalog
 from ..types import ModelProvider
 
 SAGEMAKER_RAG_MODELS_ENDPOINT = os.environ.get("SAGEMAKER_RAG_MODELS_ENDPOINT")
+# The models are listed again after this duration (seconds), during the
+# staleness duration after it the previous list is used meanwhile
+MODEL_CATALOG_TTL = int(os.environ.get("MODEL_CATALOG_TTL", "300"))
+MODEL_CATALOG_MAX_STALENESS = int(os.environ.get("MODEL_CATALOG_MAX_STALENESS", "3600"))
 logger = Logger()
 
 
@@ -20,47 +27,17 @@ class DirectModelProvider(ModelProvider, ABC):
 
     def list_models(self) -> list[dict[str, Any]]:
         """
-        List available models by querying each provider directly
+        List available models (cached, see MODEL_CATALOG_TTL)
 
         Returns:
             List of model information dictionaries
         """
-        models = []
-
-        # Get Bedrock models
-        bedrock_models = _list_bedrock_models()
-        if bedrock_models:
-            models.extend(bedrock_models)
-
-        bedrock_cris_models = _list_bedrock_cris_models()
-        if bedrock_cris_models:
-            models.extend(bedrock_cris_models)
-
-        fine_tuned_models = _list_bedrock_finetuned_models()
-        if fine_tuned_models:
-            models.extend(fine_tuned_models)
-
-        # Get Bedrock agent models
-        bedrock_agent_models = _list_bedrock_agent_models()
-        if bedrock_agent_models:
-            models.extend(bedrock_agent_models)
-
-        # Get SageMaker models
-        sagemaker_models = _list_sagemaker_models()
-        if sagemaker_models:
-            models.extend(sagemaker_models)
-
-        # Get OpenAI models
-        openai_models = _list_openai_models()
-        if openai_models:
-            models.extend(openai_models)
+        # The models of the catalog are shared, the callers get copies
+        return copy.deepcopy(model_catalog.get_models())
 
-        # Get Azure OpenAI models
-        azure_openai_models = _list_azure_openai_models()
-        if azure_openai_models:
-            models.extend(azure_openai_models)
-
-        return models
+    def get_model(self, provider: str, name: str) -> Optional[dict[str, Any]]:
+        model = model_catalog.get_model(name, provider)
+        return copy.deepcopy(model) if model is not None else None
 
     def get_embedding_models(self) -> list[dict[str, Any]]:
         config = genai_core.parameters.get_config()
@@ -86,19 +63,82 @@ class DirectModelProvider(ModelProvider, ABC):
     def get_model_modalities(self, model_id: str) -> list[str]:
         try:
             model_name = model_id.split("::")[1]
-            models = self.list_models()
-            model = next((m for m in models if m.get("name") == model_name), None)
+            model = model_catalog.get_model(model_name)
 
             if model is None:
                 raise genai_core.types.CommonError(f"Model {model_id} not found")
 
-            return model.get("outputModalities", [])
+            return list(model.get("outputModalities", []))
         except IndexError:
             raise genai_core.types.CommonError(
                 f"Invalid model ID format: {model_id}"
             ) from None
 
 
+def _list_all_models() -> list[dict[str, Any]]:
+    """
+    List the models of each provider, the providers are queried concurrently
+
+    Returns:
+        List of model information dictionaries
+    """
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # The foundation models are used by the on demand and the cross
+        # region inference models, they are listed once
+        foundation_models = executor.submit(_list_foundation_models)
+        inference_profiles = executor.submit(_list_cross_region_inference_profiles)
+        sources = [
+            executor.submit(_list_bedrock_finetuned_models),
+            executor.submit(_list_bedrock_agent_models),
+            executor.submit(_list_sagemaker_models),
+            executor.submit(_list_openai_models),
+            executor.submit(_list_azure_openai_models),
+        ]
+
+        models = []
+        try:
+            all_models = foundation_models.result()
+        except Exception as e:
+            logger.error(f"Error listing Bedrock foundation models: {e}")
+            all_models = None
+
+        # Get Bedrock models
+        bedrock_models = _list_bedrock_models(all_models)
+        if bedrock_models:
+            models.extend(bedrock_models)
+
+        try:
+            bedrock_cris_models = _list_bedrock_cris_models(
+                all_models or [], inference_profiles.result()
+            )
+        except Exception as e:
+            logger.error(f"Error listing cross region inference profiles models: {e}")
+            bedrock_cris_models = None
+        if bedrock_cris_models:
+            models.extend(bedrock_cris_models)
+
+        # Fine-tuned, agents, SageMaker, OpenAI and Azure OpenAI models
+        for source in sources:
+            source_models = source.result()
+            if source_models:
+                models.extend(source_models)
+
+    return models
+
+
+model_catalog = ModelCatalog(
+    _list_all_models, ttl=MODEL_CATALOG_TTL, max_staleness=MODEL_CATALOG_MAX_STALENESS
+)
+
+
+def _list_foundation_models():
+    bedrock = genai_core.clients.get_bedrock_client(service_name="bedrock")
+    if not bedrock:
+        return None
+
+    return bedrock.list_foundation_models().get("modelSummaries", [])
+
+
 def _list_openai_models():
     openai = genai_core.clients.get_openai_client()
     if not openai:
@@ -167,7 +207,8 @@ def _create_bedrock_model_profile(bedrock_model: dict, model_name: str) -> dict:
         "provider": Provider.BEDROCK.value,
         "name": model_name,
         "streaming": bedrock_model.get("responseStreamingSupported", False),
-        "inputModalities": bedrock_model["inputModalities"],
+        # Copied, the foundation model is shared by several profiles
+        "inputModalities": list(bedrock_model["inputModalities"]),
         "outputModalities": bedrock_model["outputModalities"],
         "interface": ModelInterface.LANGCHAIN.value,
         "ragSupported": True,
@@ -196,11 +237,12 @@ def _list_cross_region_inference_profiles():
     ]
 
 
-def _list_bedrock_cris_models():
+def _list_bedrock_cris_models(all_models=None, inference_profiles=None):
     try:
-        inference_profiles = _list_cross_region_inference_profiles()
-        bedrock_client = genai_core.clients.get_bedrock_client(service_name="bedrock")
-        all_models = bedrock_client.list_foundation_models()["modelSummaries"]
+        if inference_profiles is None:
+            inference_profiles = _list_cross_region_inference_profiles()
+        if all_models is None:
+            all_models = _list_foundation_models() or []
 
         # Create dict of base models for lookup
         models_by_id = {
@@ -229,19 +271,19 @@ def _list_bedrock_cris_models():
         return None
 
 
-def _list_bedrock_models():
+def _list_bedrock_models(all_models=None):
     try:
-        bedrock = genai_core.clients.get_bedrock_client(service_name="bedrock")
-        if not bedrock:
-            return None
+        if all_models is None:
+            all_models = _list_foundation_models()
+            if all_models is None:
+                return None
 
-        response = bedrock.list_foundation_models(
-            byInferenceType=genai_core.types.InferenceType.ON_DEMAND.value,
-        )
         bedrock_models = [
             m
-            for m in response.get("modelSummaries", [])
-            if m.get("modelLifecycle", {}).get("status")
+            for m in all_models
+            if genai_core.types.InferenceType.ON_DEMAND.value
+            in m.get("inferenceTypesSupported", [])
+            and m.get("modelLifecycle", {}).get("status")
             == genai_core.types.ModelStatus.ACTIVE.value
         ]
 
@@ -2,13 +2,18 @@
 Simplified GenAIEH Gateway client that handles authentication transparently.
 """
 
+import asyncio
+import json
 import logging
+import os
+import threading
 import time
 from functools import lru_cache
-from typing import Any, Optional, Union
+from typing import Any, AsyncIterator, Iterator, Optional, Union
 
 import requests
 import aiohttp
+from requests.adapters import HTTPAdapter
 
 from ... import parameters
 from .types import (
@@ -20,6 +25,98 @@ from .types import (
 
 logger = logging.getLogger(__name__)
 
+# Connections kept open to the gateway and the token URL
+GENAIEH_POOL_SIZE = int(os.environ.get("GENAIEH_POOL_SIZE", "32"))
+# Seconds an idle async connection is kept open
+GENAIEH_KEEPALIVE_TIMEOUT = int(os.environ.get("GENAIEH_KEEPALIVE_TIMEOUT", "60"))
+
+
+class OpenAIStreamParser:
+    """
+    Incremental parser of the server-sent events of an OpenAI chat stream.
+
+    The data is fed as it is received, a line split across reads is kept
+    until it is complete.
+    """
+
+    def __init__(self):
+        self._buffer = b""
+        self.done = False
+        self.usage = None
+
+    def feed(self, data: bytes) -> list[str]:
+        """Returns the content deltas of the lines completed by the data"""
+        if self.done:
+            return []
+
+        self._buffer += data
+        *lines, self._buffer = self._buffer.split(b"\n")
+
+        return self._parse_lines(lines)
+
+    def close(self) -> list[str]:
+        """Returns the content deltas of the last line without a newline"""
+        lines, self._buffer = [self._buffer], b""
+        if self.done:
+            return []
+
+        return self._parse_lines(lines)
+
+    def _parse_lines(self, lines: list[bytes]) -> list[str]:
+        deltas = []
+        for line in lines:
+            line = line.decode("utf-8").strip()
+            if not line.startswith("data:"):
+                continue
+
+            data_str = line[5:].strip()
+            if data_str == "[DONE]":
+                self.done = True
+                break
+
+            try:
+                chunk_data = json.loads(data_str)
+            except json.JSONDecodeError:
+                continue
+
+            if chunk_data.get("usage"):
+                self.usage = chunk_data["usage"]
+            if chunk_data.get("choices"):
+                content = chunk_data["choices"][0].get("delta", {}).get("content")
+                if content:
+                    deltas.append(content)
+
+        return deltas
+
+
+def iter_openai_stream(
+    response: requests.Response, parser: Optional[OpenAIStreamParser] = None
+) -> Iterator[str]:
+    """Yields the content deltas of a streamed response as they arrive"""
+    parser = parser or OpenAIStreamParser()
+    try:
+        for data in response.iter_content(chunk_size=None):
+            yield from parser.feed(data)
+            if parser.done:
+                break
+        yield from parser.close()
+    finally:
+        response.close()
+
+
+async def aiter_openai_stream(
+    response: aiohttp.ClientResponse, parser: Optional[OpenAIStreamParser] = None
+) -> AsyncIterator[str]:
+    """Yields the content deltas of a streamed aiohttp response as they arrive"""
+    parser = parser or OpenAIStreamParser()
+    async for data in response.content.iter_any():
+        for delta in parser.feed(data):
+            yield delta
+        if parser.done:
+            break
+    for delta in parser.close():
+        yield delta
+
 
 class GenAIEHGatewayClient:
     """Client for interacting with the GenAIEH Gateway API with simplified auth"""
@@ -37,9 +134,18 @@ class GenAIEHGatewayClient:
         else:
             self.config = config
 
-        # Token cache
+        # Token cache, a single caller refreshes the token at a time
         self._access_token = None
         self._token_expiry = 0
+        self._token_lock = threading.Lock()
+
+        # Connections are reused across requests
+        self._session = self._create_session()
+        # The async requests run on a loop owned by the client, the aiohttp
+        # session is bound to it
+        self._loop = None
+        self._async_session = None
+        self._loop_lock = threading.Lock()
 
         # Validate configuration
         if not self.config.gateway_url:
@@ -143,19 +249,84 @@ class GenAIEHGatewayClient:
 
         Args:
             body: The request body
-            streaming: Whether to stream the response
 
         Returns:
-            The model response or an ApiError
+            The model response (all the chunks) or an ApiError
         """
-        import asyncio
-
-        return asyncio.run(
+        return self._run_async(
             self._make_async_request(
                 "POST", "openai-proxy/v1/chat/completions", json_data=body
             )
         )
 
+    def stream_openai_chat(
+        self, body: dict[str, Any], parser: Optional[OpenAIStreamParser] = None
+    ) -> Union[Iterator[str], ApiError]:
+        """
+        Invoke the openai chat with the given body. The stream is read on the
+        thread iterating over it, not on the loop shared by the requests.
+
+        Args:
+            body: The request body
+            parser: Parser of the stream, it has the usage once the stream
+                is consumed
+
+        Returns:
+            An iterator over the content deltas as they are received or an
+            ApiError
+        """
+        response = self._make_request(
+            "POST", "openai-proxy/v1/chat/completions", json_data=body, stream=True
+        )
+        if isinstance(response, ApiError):
+            return response
+
+        return iter_openai_stream(response["stream"], parser)
+
+    def close(self) -> None:
+        """Close the pooled connections"""
+        self._session.close()
+        with self._loop_lock:
+            if self._loop:
+                if self._async_session:
+                    asyncio.run_coroutine_threadsafe(
+                        self._async_session.close(), self._loop
+                    ).result()
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+            self._async_session = None
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=GENAIEH_POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        return session
+
+    def _run_async(self, coroutine):
+        """Run the coroutine on the loop of the client and wait for its result"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+            loop = self._loop
+
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    def _get_async_session(self) -> aiohttp.ClientSession:
+        # Only called on the loop of the client
+        if self._async_session is None or self._async_session.closed:
+            self._async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=GENAIEH_POOL_SIZE,
+                    keepalive_timeout=GENAIEH_KEEPALIVE_TIMEOUT,
+                )
+            )
+
+        return self._async_session
+
     def _make_request(
         self,
         method: str,
@@ -170,7 +341,7 @@ class GenAIEHGatewayClient:
             url, request_headers = self._prepare_request(path, headers)
             logger.debug(f"Making {method} request to {url}")
 
-            response = requests.request(
+            response = self._session.request(
                 method=method,
                 url=url,
                 params=params,
@@ -214,24 +385,27 @@ class GenAIEHGatewayClient:
             url, request_headers = self._prepare_request(path, headers)
             logger.debug(f"Making async {method} request to {url}")
 
-            async with aiohttp.ClientSession() as session:
-                async with session.request(
-                    method=method,
-                    url=url,
-                    params=params,
-                    json=json_data,
-                    headers=request_headers,
-                    timeout=aiohttp.ClientTimeout(total=30),
-                ) as response:
-
-                    if response.status >= 400:
-                        response_text = await response.text()
-                        return self._handle_error_response(
-                            response.status, response_text
-                        )
-
-                    content = await response.read()
-                    return self._process_openai_stream(content)
+            session = self._get_async_session()
+            async with session.request(
+                method=method,
+                url=url,
+                params=params,
+                json=json_data,
+                headers=request_headers,
+                # The stream can last longer, the reads time out
+                timeout=aiohttp.ClientTimeout(total=None, connect=30, sock_read=30),
+            ) as response:
+
+                if response.status >= 400:
+                    response_text = await response.text()
+                    return self._handle_error_response(response.status, response_text)
+
+                chunks = []
+                parser = OpenAIStreamParser()
+                async for delta in aiter_openai_stream(response, parser):
+                    chunks.append(delta)
+
+                return {"chunks": chunks, "stream": True, "usage": parser.usage}
 
         except aiohttp.ClientError as e:
             logger.exception(f"Async request error: {e!s}")
@@ -265,27 +439,6 @@ class GenAIEHGatewayClient:
 
         return url, request_headers
 
-    def _process_openai_stream(self, content: bytes) -> dict[str, Any]:
-        """Process OpenAI streaming response"""
-        chunks = []
-        for line in content.decode("utf-8").split("\n"):
-            line = line.strip()
-            if line.startswith("data: "):
-                data_str = line[6:]
-                if data_str == "[DONE]":
-                    break
-                try:
-                    import json
-
-                    chunk_data = json.loads(data_str)
-                    if "choices" in chunk_data and len(chunk_data["choices"]) > 0:
-                        delta = chunk_data["choices"][0].get("delta", {})
-                        if "content" in delta:
-                            chunks.append(delta["content"])
-                except json.JSONDecodeError:
-                    continue
-        return {"chunks": chunks, "stream": True}
-
     def _handle_error_response(self, status_code: int, response_text: str) -> ApiError:
         """Handle error response and return ApiError"""
         error_message = self._get_user_friendly_error_message(
@@ -305,16 +458,27 @@ class GenAIEHGatewayClient:
         Returns:
             Valid access token or None if unable to obtain one
         """
-        current_time = time.time()
+        token = self._get_cached_token()
+        if token:
+            return token
+
+        with self._token_lock:
+            # Another caller may have refreshed it while waiting for the lock
+            token = self._get_cached_token()
+            if token:
+                return token
 
-        # If token is expired or not set, get a new one
-        if not self._access_token or current_time >= self._token_expiry:
             logger.info(
                 "GenAIEH access token is expired or not set, obtaining a new one"
             )
             return self._get_client_credentials_token()
 
-        return self._access_token
+    def _get_cached_token(self) -> Optional[str]:
+        token, expiry = self._access_token, self._token_expiry
+        if token and time.time() < expiry:
+            return token
+
+        return None
 
     def _get_client_credentials_token(self) -> Optional[str]:
         """
@@ -342,7 +506,7 @@ class GenAIEHGatewayClient:
         )
 
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.config.token_url, data=form_data, headers=headers, timeout=30
             )
 
@@ -425,7 +589,8 @@ class GenAIEHGatewayClient:
             Access token string or None if not available
         """
         if force_refresh:
-            return self._get_client_credentials_token()
+            with self._token_lock:
+                return self._get_client_credentials_token()
         return self._ensure_valid_token()
 
 
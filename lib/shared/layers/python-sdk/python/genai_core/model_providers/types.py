@@ -17,6 +17,19 @@ class ModelProvider(ABC):
         """
         raise NotImplementedError
 
+    def get_model(self, provider: str, name: str) -> Optional[dict[str, Any]]:
+        """
+        Get a model by provider and name
+
+        Returns:
+            Model information dictionary or None if not found
+        """
+        for model in self.list_models():
+            if model.get("provider") == provider and model.get("name") == name:
+                return model
+
+        return None
+
     @abstractmethod
     def get_embedding_models(self) -> list[dict[str, Any]]:
         """
@@ -36,21 +36,19 @@ def get_model_modalities(model_id: str) -> list[str]:
 
 def get_model_by_name(name: str) -> Optional[dict[str, Any]]:
     """
-    Get a list of all available models from model provider
+    Get a model of the model provider
 
     Args:
-        name: The name of the model
+        name: The provider and the name of the model (provider.name)
 
     Returns:
         dict[str, Any]: Model information dictionary
     """
     logger.info(f"Getting model by name: {name}")
+    # Import here to avoid circular imports
+    from .model_providers import get_model_provider
+
     parts = name.split(".")
     provider, name = parts[0], parts[1]
-    models = list_models()
 
-    for model in filter(
-        lambda m: m.get("provider") == provider and m.get("name") == name, models
-    ):
-        return model
-    return None
+    return get_model_provider().get_model(provider, name)
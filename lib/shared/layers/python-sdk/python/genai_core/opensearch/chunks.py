@@ -72,3 +72,35 @@ def clean_chunks_open_search(workspace_id: str, document_id: str):
         client.delete(index=index_name, id=doc["_id"], ignore=[400, 404])
 
     return removed_vectors
+
+
+def delete_chunks_open_search(workspace_id: str, chunk_ids: List[str]):
+    index_name = workspace_id.replace("-", "")
+    client = get_open_search_client()
+    removed_vectors = 0
+
+    # OpenSearch Serverless does not support delete by query, the documents
+    # are looked up by chunk id and deleted one by one.
+    for idx in range(0, len(chunk_ids), 100):
+        batch = [str(chunk_id) for chunk_id in chunk_ids[idx : idx + 100]]
+        query = {
+            "size": len(batch),
+            "_source": False,
+            "query": {
+                "bool": {
+                    "must": [
+                        {"term": {"workspace_id": workspace_id}},
+                        {"terms": {"chunk_id": batch}},
+                    ]
+                }
+            },
+        }
+
+        response = client.search(index=index_name, body=query)
+        docs = response["hits"]["hits"]
+        removed_vectors += len(docs)
+
+        for doc in docs:
+            client.delete(index=index_name, id=doc["_id"], ignore=[400, 404])
+
+    return removed_vectors
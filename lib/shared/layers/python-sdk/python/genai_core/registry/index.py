@@ -1,13 +1,25 @@
 import json
+import os
 import re
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
 
 import genai_core.clients
+import genai_core.parameters
 from aws_lambda_powertools import Logger
 from genai_core.models import get_model_by_name
 
 logger = Logger()
 
+# Resolved models kept by the registry
+ADAPTER_CACHE_SIZE = 256
+# Duration (seconds) of the models resolved with the GenAIEH catalog, the
+# models can be mapped to other provider models on the gateway
+ADAPTER_CACHE_TTL = int(os.environ.get("ADAPTER_CACHE_TTL", "300"))
+REGEX_SPECIAL_CHARACTERS = set(".^$*+?{}[]()|\\")
+
 
 class AdapterRegistry:
     def __init__(self):
@@ -15,20 +27,89 @@ class AdapterRegistry:
         # Keys are compiled regular expressions
         # Values are model IDs
         self.registry = {}
+        # Literal prefix of the regular expressions to the entries
+        # (registration order, regex, adapter) that can match a model
+        # starting with it. Case insensitive prefixes are lower case.
+        self.prefix_index = {}
+        self.ignore_case_prefix_index = {}
+        self.max_prefix_length = 0
+        # (config version, model) to (adapter, expiry time or None),
+        # least recently used first
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        # The provider config (GenAIEH) of each config version
+        self.genaieh_versions = {}
 
     def register(self, regex, model_id):
         # Compiles the regex and stores it in the registry
-        self.registry[re.compile(regex)] = model_id
+        compiled = re.compile(regex)
+        self.registry[compiled] = model_id
+
+        entry = (len(self.registry), compiled, model_id)
+        prefix = _get_literal_prefix(compiled.pattern)
+        if compiled.flags & re.IGNORECASE:
+            index = self.ignore_case_prefix_index
+            prefix = prefix.lower()
+        else:
+            index = self.prefix_index
+        index.setdefault(prefix, []).append(entry)
+        self.max_prefix_length = max(self.max_prefix_length, len(prefix))
+
+        with self.lock:
+            self.cache.clear()
 
     def get_adapter(self, model: str):
+        version, is_genaieh_enabled = self._get_config_version()
+        key = (version, model)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                adapter, expires_at = entry
+                if expires_at is None or now < expires_at:
+                    self.cache.move_to_end(key)
+                    return adapter
+                del self.cache[key]
+
         logger.info(f"Getting adapter for model {model}")
-        provider_model_name = _get_provider_name(model)
-        is_genaieh_enabled, _ = genai_core.clients.is_genaieh_configured()
-        return self._get_adapter(provider_model_name)
+        provider_model_name, resolved = _get_provider_name(model, is_genaieh_enabled)
+        adapter = self._get_adapter(provider_model_name)
+        if not resolved:
+            # The model was not found in the GenAIEH catalog (or it could not
+            # be listed), it is looked up again by the next request
+            return adapter
+
+        expires_at = now + ADAPTER_CACHE_TTL if is_genaieh_enabled else None
+        with self.lock:
+            self.cache[key] = (adapter, expires_at)
+            if len(self.cache) > ADAPTER_CACHE_SIZE:
+                self.cache.popitem(last=False)
+
+        return adapter
+
+    def _get_config_version(self):
+        """Returns the version of the provider config and whether GenAIEH is
+        enabled in it, is_genaieh_configured() runs once per version."""
+        config = genai_core.parameters.get_config()
+        version = json.dumps(config.get("genaieh", {}), sort_keys=True)
+        is_genaieh_enabled = self.genaieh_versions.get(version)
+        if is_genaieh_enabled is None:
+            is_genaieh_enabled, _ = genai_core.clients.is_genaieh_configured()
+            self.genaieh_versions = {version: is_genaieh_enabled}
+
+        return version, is_genaieh_enabled
 
     def _get_adapter(self, model):
-        for regex, adapter in self.registry.items():
-            # If a match is found, returns the associated model ID
+        candidates = []
+        lower_model = model.lower()
+        for length in range(min(len(model), self.max_prefix_length) + 1):
+            candidates.extend(self.prefix_index.get(model[:length], []))
+            candidates.extend(
+                self.ignore_case_prefix_index.get(lower_model[:length], [])
+            )
+
+        # The first registered regex matching the model is used
+        for _, regex, adapter in sorted(candidates, key=lambda entry: entry[0]):
             if regex.match(model):
                 return adapter
         # If no match is found, returns None
@@ -38,16 +119,56 @@ class AdapterRegistry:
         )
 
 
-def _get_provider_name(model_provider_and_name: str) -> Optional[str]:
+def _get_literal_prefix(pattern: str) -> str:
+    """Returns the text every string matching the pattern starts with
+    (re.match is anchored at the start)."""
+    if "|" in pattern:
+        # Alternatives can start with different text
+        return ""
+
+    # Inline flags, for example (?i)
+    pattern = re.sub(r"^\(\?[a-zA-Z]+\)", "", pattern)
+    if pattern.startswith("^"):
+        pattern = pattern[1:]
+
+    prefix = []
+    idx = 0
+    while idx < len(pattern):
+        character = pattern[idx]
+        length = 1
+        if character == "\\":
+            escaped = pattern[idx + 1 : idx + 2]
+            if not escaped or escaped.isalnum():
+                # Character classes like \d
+                break
+            character = escaped
+            length = 2
+        elif character in REGEX_SPECIAL_CHARACTERS:
+            break
+
+        # A character followed by a quantifier may not be in the text
+        if pattern[idx + length : idx + length + 1] in ("*", "?", "{"):
+            break
+        prefix.append(character)
+        idx += length
+
+    return "".join(prefix)
+
+
+def _get_provider_name(
+    model_provider_and_name: str, is_genaieh_enabled: bool
+) -> Tuple[str, bool]:
+    """Returns the name of the model used to find its adapter and whether
+    it was resolved (False when GenAIEH is enabled but the model was not
+    found in its catalog)."""
     # Check if GenAIEH is configured and enabled
     logger.info(f"Getting provider name for model {model_provider_and_name}")
-    is_genaieh_enabled, _ = genai_core.clients.is_genaieh_configured()
     if not is_genaieh_enabled:
-        return model_provider_and_name
+        return model_provider_and_name, True
     model_provider = model_provider_and_name.split(".")[0]
     logger.info(f"Model provider {model_provider}")
     genaieh_model = get_model_by_name(model_provider_and_name)
     logger.info(f"Found model {model_provider_and_name} {json.dumps(genaieh_model)}")
     if not genaieh_model:
-        return model_provider_and_name
-    return f"{model_provider}.{genaieh_model.get('providerModelName')}"
+        return model_provider_and_name, False
+    return f"{model_provider}.{genaieh_model.get('providerModelName')}", True
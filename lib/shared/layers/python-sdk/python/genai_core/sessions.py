@@ -1,11 +1,28 @@
 import os
+import json
+import base64
+import binascii
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from aws_lambda_powertools import Logger
 import boto3
 from botocore.exceptions import ClientError
+from genai_core.types import CommonError
 
 AWS_REGION = os.environ["AWS_REGION"]
 SESSIONS_TABLE_NAME = os.environ["SESSIONS_TABLE_NAME"]
 SESSIONS_BY_USER_ID_INDEX_NAME = os.environ["SESSIONS_BY_USER_ID_INDEX_NAME"]
+SESSIONS_BY_USER_ID_START_TIME_INDEX_NAME = os.environ.get(
+    "SESSIONS_BY_USER_ID_START_TIME_INDEX_NAME"
+)
+DYNAMODB_BATCH_GET_SIZE = 100
+DYNAMODB_BATCH_WRITE_SIZE = 25
+DYNAMODB_BATCH_WRITE_RETRIES = 5
+S3_DELETE_BATCH_SIZE = 1000
+DELETE_MAX_WORKERS = 8
+# Same length as the titles stored with the first message
+TITLE_MAX_LENGTH = 256
 
 
 dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
@@ -61,30 +78,118 @@ def list_sessions_by_user_id(user_id):
     return items
 
 
+def list_user_sessions(user_id, limit: int = 50, next_token: Optional[str] = None):
+    """Returns a page of the sessions of the user, most recent activity
+    first, and the token of the next page (None on the last page).
+
+    The index only projects the title and the start time of the sessions,
+    the history is not read."""
+    query = {
+        "IndexName": SESSIONS_BY_USER_ID_START_TIME_INDEX_NAME,
+        "KeyConditionExpression": "UserId = :user_id",
+        "ExpressionAttributeValues": {":user_id": user_id},
+        "ScanIndexForward": False,
+        "Limit": limit,
+    }
+    if next_token:
+        query["ExclusiveStartKey"] = _decode_next_token(user_id, next_token)
+
+    response = table.query(**query)
+    items = response.get("Items", [])
+    _add_missing_titles(user_id, items)
+
+    return {
+        "items": items,
+        "next_token": _encode_next_token(response.get("LastEvaluatedKey")),
+    }
+
+
+def _encode_next_token(last_evaluated_key: Optional[dict]):
+    if not last_evaluated_key:
+        return None
+
+    key = {
+        "SessionId": last_evaluated_key["SessionId"],
+        "StartTime": last_evaluated_key["StartTime"],
+    }
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("utf-8")
+
+
+def _decode_next_token(user_id, next_token: str):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(next_token.encode("utf-8")))
+        session_id = key["SessionId"]
+        start_time = key["StartTime"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise CommonError("Invalid next token")
+
+    if not isinstance(session_id, str) or not isinstance(start_time, str):
+        raise CommonError("Invalid next token")
+
+    # The user is not part of the token, a page always belongs to the caller
+    return {"SessionId": session_id, "UserId": user_id, "StartTime": start_time}
+
+
+def _add_missing_titles(user_id, items):
+    """Sessions without a title attribute (stored before it existed or by
+    a writer that did not know the first message) use their first message,
+    only this message is read. The title is then stored so the next
+    listings do not read it again."""
+    missing = {item["SessionId"]: item for item in items if "Title" not in item}
+    keys = [
+        {"SessionId": session_id, "UserId": user_id} for session_id in missing.keys()
+    ]
+
+    for i in range(0, len(keys), DYNAMODB_BATCH_GET_SIZE):
+        request = {
+            SESSIONS_TABLE_NAME: {
+                "Keys": keys[i : i + DYNAMODB_BATCH_GET_SIZE],
+                "ProjectionExpression": "SessionId, #history[0]",
+                "ExpressionAttributeNames": {"#history": "History"},
+            }
+        }
+        # Keys left unprocessed are retried once, these sessions keep the
+        # default title
+        for _ in range(2):
+            try:
+                response = dynamodb.batch_get_item(RequestItems=request)
+            except ClientError as error:
+                logger.exception(error)
+                break
+
+            for session in response.get("Responses", {}).get(SESSIONS_TABLE_NAME, []):
+                history = session.get("History", [])
+                if len(history) > 0:
+                    content = history[0].get("data", {}).get("content")
+                    if isinstance(content, str):
+                        title = content[:TITLE_MAX_LENGTH]
+                        missing[session["SessionId"]]["Title"] = title
+                        _store_title(session["SessionId"], user_id, title)
+
+            request = response.get("UnprocessedKeys")
+            if not request:
+                break
+
+
+def _store_title(session_id, user_id, title):
+    try:
+        table.update_item(
+            Key={"SessionId": session_id, "UserId": user_id},
+            UpdateExpression="SET Title = if_not_exists(Title, :title)",
+            ConditionExpression="attribute_exists(SessionId)",
+            ExpressionAttributeValues={":title": title},
+        )
+    except ClientError as error:
+        # The session was deleted since it was listed
+        if error.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            logger.exception(error)
+
+
 def delete_session(session_id, user_id):
     try:
         session = table.get_item(Key={"SessionId": session_id, "UserId": user_id}).get(
-            "Item", {}
+            "Item", {"SessionId": session_id}
         )
-        for item in session.get("History"):
-            metadata = item.get("data", {}).get("additional_kwargs", {})
-            for file in (
-                metadata.get("images", [])
-                + metadata.get("documents", [])
-                + metadata.get("videos", [])
-            ):
-                if not isinstance(file, dict) or "key" not in file:
-                    continue
-                key = "private/" + user_id + "/" + file["key"]
-                logger.info(
-                    "Deleting session file",
-                    bucket=os.environ["CHATBOT_FILES_BUCKET_NAME"],
-                    key=key,
-                )
-                s3.Object(os.environ["CHATBOT_FILES_BUCKET_NAME"], key).delete()
-
-        table.delete_item(Key={"SessionId": session_id, "UserId": user_id})
-        logger.info("Sessions deleted", sessionId=session_id)
     except ClientError as error:
         if error.response["Error"]["Code"] == "ResourceNotFoundException":
             logger.warning("No record found with session id: %s", session_id)
@@ -93,15 +198,123 @@ def delete_session(session_id, user_id):
 
         return {"id": session_id, "deleted": False}
 
-    return {"id": session_id, "deleted": True}
+    return _delete_sessions(user_id, [session])[0]
 
 
 def delete_user_sessions(user_id):
     sessions = list_sessions_by_user_id(user_id)
-    ret_value = []
 
-    for session in sessions:
-        result = delete_session(session["SessionId"], user_id)
-        ret_value.append({"id": session["SessionId"], "deleted": result["deleted"]})
+    return _delete_sessions(user_id, sessions)
+
+
+def _delete_sessions(user_id, sessions):
+    """Deletes the files of all the sessions with batched S3 requests, then
+    the sessions whose files are deleted with batched writes. The batches
+    run in a bounded pool. Returns the result of each session."""
+    session_ids = [session["SessionId"] for session in sessions]
+    files = {
+        session["SessionId"]: _get_session_file_keys(session, user_id)
+        for session in sessions
+    }
+    keys = [key for session_keys in files.values() for key in session_keys]
+
+    with ThreadPoolExecutor(max_workers=DELETE_MAX_WORKERS) as executor:
+        failed_keys = set()
+        for failed in executor.map(_delete_files, _batches(keys, S3_DELETE_BATCH_SIZE)):
+            failed_keys.update(failed)
+
+        # A session is kept when some of its files are not deleted so the
+        # deletion can be retried
+        deletable = [
+            session_id
+            for session_id in session_ids
+            if failed_keys.isdisjoint(files[session_id])
+        ]
+        failed_sessions = set(session_ids) - set(deletable)
+        for failed in executor.map(
+            lambda batch: _delete_items(user_id, batch),
+            _batches(deletable, DYNAMODB_BATCH_WRITE_SIZE),
+        ):
+            failed_sessions.update(failed)
+
+    logger.info(
+        "Sessions deleted",
+        sessions=len(session_ids) - len(failed_sessions),
+        files=len(keys) - len(failed_keys),
+        failed=len(failed_sessions),
+    )
+
+    return [
+        {"id": session_id, "deleted": session_id not in failed_sessions}
+        for session_id in session_ids
+    ]
+
+
+def _get_session_file_keys(session, user_id):
+    keys = []
+    for item in session.get("History", []):
+        metadata = item.get("data", {}).get("additional_kwargs", {}) or {}
+        for file in (
+            metadata.get("images", [])
+            + metadata.get("documents", [])
+            + metadata.get("videos", [])
+        ):
+            if not isinstance(file, dict) or "key" not in file:
+                continue
+            keys.append("private/" + user_id + "/" + file["key"])
+
+    return keys
+
+
+def _batches(values, size):
+    return [values[i : i + size] for i in range(0, len(values), size)]
+
+
+def _delete_files(keys):
+    """Deletes up to 1000 files with one request, returns the keys that are
+    not deleted"""
+    bucket_name = os.environ["CHATBOT_FILES_BUCKET_NAME"]
+    try:
+        response = s3.meta.client.delete_objects(
+            Bucket=bucket_name,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+    except ClientError as error:
+        logger.exception(error)
+        return set(keys)
+
+    errors = response.get("Errors", [])
+    for error in errors:
+        logger.warning(
+            "Session file not deleted",
+            bucket=bucket_name,
+            key=error.get("Key"),
+            code=error.get("Code"),
+        )
+
+    return {error.get("Key") for error in errors}
+
+
+def _delete_items(user_id, session_ids):
+    """Deletes up to 25 sessions with one batched write, the unprocessed
+    items are retried with a backoff. Returns the sessions not deleted."""
+    requests = [
+        {"DeleteRequest": {"Key": {"SessionId": session_id, "UserId": user_id}}}
+        for session_id in session_ids
+    ]
+    for attempt in range(DYNAMODB_BATCH_WRITE_RETRIES):
+        if attempt > 0:
+            time.sleep(0.1 * 2**attempt)
+        try:
+            response = table.meta.client.batch_write_item(
+                RequestItems={SESSIONS_TABLE_NAME: requests}
+            )
+        except ClientError as error:
+            logger.exception(error)
+            break
+
+        requests = response.get("UnprocessedItems", {}).get(SESSIONS_TABLE_NAME, [])
+        if not requests:
+            return set()
 
-    return ret_value
+    return {request["DeleteRequest"]["Key"]["SessionId"] for request in requests}
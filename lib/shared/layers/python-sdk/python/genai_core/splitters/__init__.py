@@ -0,0 +1,6 @@
+# flake8: noqa
+from .registry import *
+from .recursive import *
+from .headings import *
+from .sentences import *
+from .semantic import *
@@ -0,0 +1,73 @@
+import re
+from typing import List, Tuple
+from .recursive import get_recursive_splitter, make_chunk
+from .registry import register_chunking_strategy
+
+MARKDOWN_HEADING = re.compile(r"^ {0,3}#{1,6}[ \t]+\S", re.MULTILINE)
+MARKDOWN_FENCE = re.compile(r"^ {0,3}(```|~~~).*?^ {0,3}\1", re.MULTILINE | re.DOTALL)
+
+
+def split_sections(
+    content: str, boundaries: List[int], chunk_size: int, chunk_overlap: int
+) -> List[Tuple[str, int, int]]:
+    """Splits the content at the section boundaries (offsets where a heading
+    starts). Adjacent sections are merged while they fit in a chunk and
+    sections larger than a chunk are split recursively, so chunks never
+    span a heading unless the sections are small."""
+    offsets = sorted(set([0, *boundaries, len(content)]))
+    sections = list(zip(offsets, offsets[1:]))
+    splitter = get_recursive_splitter(chunk_size, chunk_overlap)
+
+    spans = []
+    current_start = None
+    current_end = None
+    for start, end in sections:
+        if current_start is not None and end - current_start <= chunk_size:
+            current_end = end
+            continue
+
+        if current_start is not None:
+            _append(content, current_start, current_end, spans)
+            current_start = None
+
+        if end - start > chunk_size:
+            spans.extend(splitter.split_spans(content, start, end))
+        else:
+            current_start, current_end = start, end
+
+    if current_start is not None:
+        _append(content, current_start, current_end, spans)
+
+    return spans
+
+
+def _append(content: str, start: int, end: int, spans: list):
+    chunk = make_chunk(content, start, end)
+    if chunk is not None:
+        spans.append(chunk)
+
+
+def get_markdown_heading_offsets(content: str) -> List[int]:
+    fences = [
+        (match.start(), match.end()) for match in MARKDOWN_FENCE.finditer(content)
+    ]
+
+    return [
+        match.start()
+        for match in MARKDOWN_HEADING.finditer(content)
+        if not any(start <= match.start() < end for start, end in fences)
+    ]
+
+
+@register_chunking_strategy("markdown")
+def split_markdown(workspace: dict, content: str):
+    """Only the markdown and text uploads keep their headings, other
+    documents are converted to plain text and are split recursively."""
+    spans = split_sections(
+        content,
+        get_markdown_heading_offsets(content),
+        int(workspace["chunk_size"]),
+        int(workspace["chunk_overlap"]),
+    )
+
+    return [chunk for chunk, _, _ in spans]
@@ -0,0 +1,165 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from aws_lambda_powertools import Logger
+from .registry import register_chunking_strategy
+
+DEFAULT_SEPARATORS = ("\n\n", "\n", " ", "")
+logger = Logger()
+
+
+class RecursiveTextSplitter:
+    """Recursive character splitter producing the same chunks as LangChain's
+    RecursiveCharacterTextSplitter (keep_separator=True, strip_whitespace=True).
+
+    The text is never copied while splitting: every split is a (start, end)
+    span into the original string and chunks are only sliced once merged.
+    This keeps the character offsets of every chunk and the NUL characters
+    are replaced while slicing, without a second pass over the chunks.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        separators: Optional[Tuple[str, ...]] = None,
+    ):
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size "
+                f"({chunk_size}), should be smaller."
+            )
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = tuple(separators or DEFAULT_SEPARATORS)
+        self._patterns = [
+            re.compile(re.escape(separator)) if separator else None
+            for separator in self.separators
+        ]
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk for chunk, _, _ in self.split_spans(text)]
+
+    def split_spans(
+        self, text: str, start: int = 0, end: Optional[int] = None
+    ) -> List[Tuple[str, int, int]]:
+        """Returns (chunk, start, end) tuples where text[start:end] is the
+        chunk before sanitization. Only text[start:end] is split when a
+        range is given."""
+        spans = []
+        self._split(text, start, len(text) if end is None else end, 0, spans)
+
+        return spans
+
+    def _split(self, text: str, start: int, end: int, level: int, spans: list):
+        # Pick the first separator found in the span, "" always matches
+        pattern = self._patterns[-1]
+        next_level = None
+        for idx in range(level, len(self._patterns)):
+            current = self._patterns[idx]
+            if current is None:
+                pattern = None
+                break
+            if current.search(text, start, end):
+                pattern = current
+                next_level = idx + 1 if idx + 1 < len(self._patterns) else None
+                break
+
+        good_splits = []
+        for split_start, split_end in self._split_with_separator(
+            text, start, end, pattern
+        ):
+            if split_end - split_start < self.chunk_size:
+                good_splits.append((split_start, split_end))
+                continue
+
+            if good_splits:
+                self._merge(text, good_splits, spans)
+                good_splits = []
+
+            if next_level is None:
+                spans.append(make_chunk(text, split_start, split_end, strip=False))
+            else:
+                self._split(text, split_start, split_end, next_level, spans)
+
+        if good_splits:
+            self._merge(text, good_splits, spans)
+
+    @staticmethod
+    def _split_with_separator(text: str, start: int, end: int, pattern):
+        if pattern is None:
+            return [(idx, idx + 1) for idx in range(start, end)]
+
+        # The separator is kept at the start of the split that follows it
+        splits = []
+        current = start
+        for match in pattern.finditer(text, start, end):
+            if match.start() > current:
+                splits.append((current, match.start()))
+            current = match.start()
+        if end > current:
+            splits.append((current, end))
+
+        return splits
+
+    def _merge(self, text: str, splits: List[Tuple[int, int]], spans: list):
+        # Splits are contiguous, so a chunk is the span between its first
+        # and last split and its length is the sum of the split lengths.
+        current_doc = []
+        first = 0
+        total = 0
+        for split_start, split_end in splits:
+            length = split_end - split_start
+            if total + length > self.chunk_size:
+                if total > self.chunk_size:
+                    logger.warning(
+                        f"Created a chunk of size {total}, "
+                        f"which is longer than the specified {self.chunk_size}"
+                    )
+                if len(current_doc) > first:
+                    self._append(text, current_doc[first][0], current_doc[-1][1], spans)
+                    while total > self.chunk_overlap or (
+                        total + length > self.chunk_size and total > 0
+                    ):
+                        total -= current_doc[first][1] - current_doc[first][0]
+                        first += 1
+
+            current_doc.append((split_start, split_end))
+            total += length
+
+        if len(current_doc) > first:
+            self._append(text, current_doc[first][0], current_doc[-1][1], spans)
+
+    def _append(self, text: str, start: int, end: int, spans: list):
+        chunk = make_chunk(text, start, end)
+        if chunk is not None:
+            spans.append(chunk)
+
+
+def make_chunk(text: str, start: int, end: int, strip: bool = True):
+    """Slices and sanitizes a chunk, returning None for blank chunks."""
+    chunk = text[start:end]
+    if strip:
+        stripped = chunk.lstrip()
+        start += len(chunk) - len(stripped)
+        chunk = stripped.rstrip()
+        end = start + len(chunk)
+        if chunk == "":
+            return None
+
+    return chunk.replace("\x00", "\uFFFD"), start, end
+
+
+@lru_cache(maxsize=32)
+def get_recursive_splitter(chunk_size: int, chunk_overlap: int):
+    return RecursiveTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+@register_chunking_strategy("recursive")
+def split_recursive(workspace: dict, content: str):
+    splitter = get_recursive_splitter(
+        int(workspace["chunk_size"]), int(workspace["chunk_overlap"])
+    )
+
+    return splitter.split_text(content)
@@ -0,0 +1,23 @@
+from typing import Callable, Dict, List
+
+# A chunking strategy takes the workspace and the content to split and
+# returns the chunks.
+ChunkingStrategy = Callable[[dict, str], List[str]]
+
+_strategies: Dict[str, ChunkingStrategy] = {}
+
+
+def register_chunking_strategy(name: str):
+    def decorator(fn: ChunkingStrategy):
+        _strategies[name] = fn
+        return fn
+
+    return decorator
+
+
+def get_chunking_strategy(name: str):
+    return _strategies.get(name)
+
+
+def list_chunking_strategies():
+    return list(_strategies.keys())
@@ -0,0 +1,74 @@
+import os
+import numpy as np
+import genai_core.embeddings
+from genai_core.types import CommonError, Task
+from .registry import register_chunking_strategy
+from .sentences import pack_sentences, split_sentence_spans
+
+SEMANTIC_BREAKPOINT_PERCENTILE = float(
+    os.environ.get("SEMANTIC_BREAKPOINT_PERCENTILE", "90")
+)
+# Number of sentences before and after a sentence embedded with it, which
+# smooths the distances between short sentences.
+SEMANTIC_BUFFER_SIZE = 1
+
+
+def get_semantic_breakpoints(vectors: np.ndarray, percentile: float):
+    """Returns the indexes of the sentences starting a new group: the ones
+    whose cosine distance to the previous sentence is above the percentile."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    normalized = vectors / np.where(norms == 0, 1, norms)
+    distances = 1 - np.einsum("ij,ij->i", normalized[:-1], normalized[1:])
+    threshold = np.percentile(distances, percentile)
+
+    return np.flatnonzero(distances > threshold) + 1
+
+
+@register_chunking_strategy("semantic")
+def split_semantic(workspace: dict, content: str):
+    """Groups sentences at embedding similarity breakpoints. This embeds
+    every sentence once more at ingestion time, in exchange for chunks that
+    follow topic changes."""
+    chunk_size = int(workspace["chunk_size"])
+    chunk_overlap = int(workspace["chunk_overlap"])
+    sentences = split_sentence_spans(content)
+    if len(sentences) < 3:
+        spans = pack_sentences(content, sentences, chunk_size, 0)
+        return [chunk for chunk, _, _ in spans]
+
+    embeddings_model = genai_core.embeddings.get_embeddings_model(
+        workspace["embeddings_model_provider"], workspace["embeddings_model_name"]
+    )
+    if embeddings_model is None:
+        raise CommonError("Embeddings model not found")
+
+    last = len(sentences) - 1
+    buffered = [
+        content[
+            sentences[max(0, idx - SEMANTIC_BUFFER_SIZE)][0] : sentences[
+                min(last, idx + SEMANTIC_BUFFER_SIZE)
+            ][1]
+        ]
+        for idx in range(len(sentences))
+    ]
+    vectors = np.asarray(
+        genai_core.embeddings.generate_embeddings(
+            embeddings_model, buffered, Task.STORE.value
+        ),
+        dtype=np.float32,
+    )
+
+    breakpoints = get_semantic_breakpoints(vectors, SEMANTIC_BREAKPOINT_PERCENTILE)
+    spans = []
+    for group in np.split(np.arange(len(sentences)), breakpoints):
+        # Groups larger than a chunk are packed as sentence windows
+        spans.extend(
+            pack_sentences(
+                content,
+                sentences[group[0] : group[-1] + 1],
+                chunk_size,
+                chunk_overlap,
+            )
+        )
+
+    return [chunk for chunk, _, _ in spans]
@@ -0,0 +1,87 @@
+import re
+from typing import List, Optional, Tuple
+from .recursive import get_recursive_splitter, make_chunk
+from .registry import register_chunking_strategy
+
+# A sentence ends with punctuation (and optional closing quotes or brackets)
+# followed by whitespace, or at a paragraph break.
+SENTENCE_BOUNDARY = re.compile(r"([.!?]+[\"')\]]*)\s+|\n[ \t]*\n\s*")
+
+
+def split_sentence_spans(
+    text: str, start: int = 0, end: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """Returns the (start, end) offsets of the sentences of the text,
+    without the surrounding whitespace."""
+    end = len(text) if end is None else end
+    spans = []
+    current = start
+    for match in SENTENCE_BOUNDARY.finditer(text, start, end):
+        sentence_end = match.end(1) if match.group(1) else match.start()
+        _append_sentence(text, current, sentence_end, spans)
+        current = match.end()
+    _append_sentence(text, current, end, spans)
+
+    return spans
+
+
+def _append_sentence(text: str, start: int, end: int, spans: list):
+    chunk = make_chunk(text, start, end)
+    if chunk is not None:
+        spans.append((chunk[1], chunk[2]))
+
+
+def pack_sentences(
+    text: str,
+    sentences: List[Tuple[int, int]],
+    chunk_size: int,
+    chunk_overlap: int,
+) -> List[Tuple[str, int, int]]:
+    """Groups consecutive sentences in windows of at most chunk_size
+    characters. A window starts with the trailing sentences of the previous
+    one that fit in chunk_overlap characters. Sentences longer than a chunk
+    are split recursively."""
+    spans = []
+    window = []
+    fresh = 0
+    for start, end in sentences:
+        if end - start > chunk_size:
+            if fresh > 0:
+                spans.append(make_chunk(text, window[0][0], window[-1][1]))
+            window, fresh = [], 0
+            splitter = get_recursive_splitter(chunk_size, chunk_overlap)
+            spans.extend(splitter.split_spans(text, start, end))
+            continue
+
+        if window and end - window[0][0] > chunk_size:
+            spans.append(make_chunk(text, window[0][0], window[-1][1]))
+            overlap_start = len(window)
+            while (
+                overlap_start > 0
+                and window[-1][1] - window[overlap_start - 1][0] <= chunk_overlap
+            ):
+                overlap_start -= 1
+            window = window[overlap_start:]
+            while window and end - window[0][0] > chunk_size:
+                window.pop(0)
+            fresh = 0
+
+        window.append((start, end))
+        fresh += 1
+
+    if fresh > 0:
+        spans.append(make_chunk(text, window[0][0], window[-1][1]))
+
+    return spans
+
+
+@register_chunking_strategy("sentence_window")
+def split_sentence_window(workspace: dict, content: str):
+    spans = pack_sentences(
+        content,
+        split_sentence_spans(content),
+        int(workspace["chunk_size"]),
+        int(workspace["chunk_overlap"]),
+    )
+
+    return [chunk for chunk, _, _ in spans]
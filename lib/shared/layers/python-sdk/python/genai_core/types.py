@@ -85,6 +85,13 @@ class ChatbotMode(Enum):
     VIDEO_GENERATION = "video_generation"
 
 
+class ChatMemoryStrategy(Enum):
+    BUFFER = "buffer"  # Full history
+    WINDOW = "window"  # Last N turns
+    TOKEN_WINDOW = "token_window"  # Last turns within a token budget
+    SUMMARY = "summary"  # Rolling summary and the recent turns
+
+
 class ChatbotAction(Enum):
     HEARTBEAT = "heartbeat"
     RUN = "run"
@@ -0,0 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from aws_lambda_powertools.utilities.batch import BatchProcessor, EventType
+
+
+class ConcurrentBatchProcessor(BatchProcessor):
+    """BatchProcessor handling up to max_concurrency records of the batch
+    at the same time in a thread pool.
+
+    The results keep the order of the records and the failed records are
+    reported in the partial batch response like with BatchProcessor. The
+    record handler must not share per-record state between records.
+    """
+
+    def __init__(self, event_type: EventType, max_concurrency: int, model=None):
+        super().__init__(event_type=event_type, model=model)
+        self.max_concurrency = max_concurrency
+
+    def process(self) -> List[Tuple]:
+        records = list(self.records)
+        if self.max_concurrency <= 1 or len(records) <= 1:
+            return [self._process_record(record) for record in records]
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(records))
+        ) as executor:
+            return list(executor.map(self._process_record, records))
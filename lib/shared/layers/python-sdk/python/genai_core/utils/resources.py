@@ -0,0 +1,25 @@
+import threading
+import boto3
+
+# The boto3 resources of each thread by service name
+thread_resources = threading.local()
+
+
+def get_thread_resource(service_name: str):
+    """Returns the boto3 resource of the service for the current thread.
+
+    The boto3 resources are not thread safe (the clients are), the code
+    that runs on several threads, like the website and RSS crawlers, uses
+    one resource per thread created from its own session.
+    """
+    resources = getattr(thread_resources, "resources", None)
+    if resources is None:
+        resources = {}
+        thread_resources.resources = resources
+
+    resource = resources.get(service_name)
+    if resource is None:
+        resource = boto3.session.Session().resource(service_name)
+        resources[service_name] = resource
+
+    return resource
@@ -1,12 +1,30 @@
 import json
 import os
 import base64
+import functools
+import queue
+import threading
+import time
+from datetime import datetime
 from decimal import Decimal
+from typing import Callable, List, Optional
 
 import boto3
-from ..types import Direction
+from aws_lambda_powertools import Logger
+from ..types import ChatbotAction, Direction
 
 sns = boto3.client("sns")
+logger = Logger()
+
+# Messages waiting to be published, send_to_client blocks when it is full
+PUBLISHER_MAX_PENDING = int(os.environ.get("PUBLISHER_MAX_PENDING", "1000"))
+SNS_BATCH_SIZE = 10
+SNS_BATCH_MAX_BYTES = 256 * 1024
+
+# Streamed tokens are sent at most once per interval (seconds) or when the
+# buffered text reaches the size (characters)
+TOKEN_FLUSH_INTERVAL = float(os.environ.get("TOKEN_FLUSH_INTERVAL", "0.05"))
+TOKEN_FLUSH_SIZE = int(os.environ.get("TOKEN_FLUSH_SIZE", "512"))
 
 
 # Custom JSON encoder to handle bytes, EventStream, and other non-serializable types
@@ -22,14 +40,220 @@ class CustomJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+class MessagePublisher:
+    """Publishes the messages to SNS from a worker thread so the caller
+    does not wait for the network.
+
+    The messages are published in the order they are sent (so in order
+    within a session), consecutive messages to the same topic are grouped
+    with publish_batch. At most max_pending messages wait in the queue,
+    publish() blocks when it is full. flush() waits until every message
+    sent before is published, it must be called before the Lambda handler
+    returns (see flush_on_exit).
+    """
+
+    def __init__(self, max_pending: int = PUBLISHER_MAX_PENDING):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def publish(self, topic_arn: str, message: str) -> None:
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+
+        self.queue.put((topic_arn, message))
+
+    def flush(self) -> None:
+        self.queue.join()
+
+    def _run(self) -> None:
+        next_item = None
+        while True:
+            topic_arn, message = next_item or self.queue.get()
+            messages = [message]
+            size = len(message.encode("utf-8"))
+            next_item = None
+
+            while len(messages) < SNS_BATCH_SIZE:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                item_size = len(item[1].encode("utf-8"))
+                if item[0] != topic_arn or size + item_size > SNS_BATCH_MAX_BYTES:
+                    # Starts the next batch
+                    next_item = item
+                    break
+                messages.append(item[1])
+                size += item_size
+
+            try:
+                self._publish(topic_arn, messages)
+            except Exception as error:
+                logger.exception(error)
+            finally:
+                for _ in messages:
+                    self.queue.task_done()
+
+    @staticmethod
+    def _publish(topic_arn: str, messages: List[str]) -> None:
+        if len(messages) == 1:
+            sns.publish(TopicArn=topic_arn, Message=messages[0])
+            return
+
+        response = sns.publish_batch(
+            TopicArn=topic_arn,
+            PublishBatchRequestEntries=[
+                {"Id": str(idx), "Message": message}
+                for idx, message in enumerate(messages)
+            ],
+        )
+        for failed in response.get("Failed", []):
+            # Throttled or internal errors are retried once on their own
+            logger.warning(
+                "Message not published",
+                code=failed.get("Code"),
+                sender_fault=failed.get("SenderFault"),
+            )
+            if not failed.get("SenderFault"):
+                sns.publish(TopicArn=topic_arn, Message=messages[int(failed["Id"])])
+
+
+publisher = MessagePublisher()
+
+
 def send_to_client(detail, topic_arn=None):
+    """Queues the message for the client, it is published in the
+    background (see MessagePublisher)"""
     if "direction" not in detail:
         detail["direction"] = Direction.OUT.value
 
     if not topic_arn:
         topic_arn = os.environ["MESSAGES_TOPIC_ARN"]
 
-    sns.publish(
-        TopicArn=topic_arn,
-        Message=json.dumps(detail, cls=CustomJSONEncoder),
-    )
+    publisher.publish(topic_arn, json.dumps(detail, cls=CustomJSONEncoder))
+
+
+def flush_messages():
+    """Waits until the messages sent to the clients are published"""
+    publisher.flush()
+
+
+def flush_on_exit(handler):
+    """Lambda handler decorator publishing the queued messages before the
+    handler returns, the execution environment is frozen after"""
+
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            flush_messages()
+
+    return wrapper
+
+
+class TokenCoalescer:
+    """Buffers the tokens streamed for a session and sends them to the
+    client as one LLM_NEW_TOKEN message per flush interval, or sooner when
+    the buffered text reaches the flush size.
+
+    The first token is sent immediately. The buffered tokens are also sent
+    by a timer at the end of the interval, so a pause in the stream does
+    not hold them back until the next token. The sequence numbers of the
+    messages are consecutive (the UI only displays a contiguous sequence).
+    flush() must be called when the stream completes to send the tokens
+    that are still buffered.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        session_id: str,
+        flush_interval: Optional[float] = None,
+        flush_size: Optional[int] = None,
+        send: Callable[[dict], None] = send_to_client,
+    ):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.flush_interval = (
+            TOKEN_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
+        self.flush_size = TOKEN_FLUSH_SIZE if flush_size is None else flush_size
+        self.send = send
+        self.sequence_number = 0
+        self.run_id = None
+        self.tokens = []
+        self.size = 0
+        self.last_flush = None
+        self.flush_count = 0
+        self.timer = None
+        self.lock = threading.Lock()
+
+    def add_token(self, text: str, run_id: Optional[str] = None) -> None:
+        if not text:
+            return
+
+        with self.lock:
+            if self.tokens and run_id != self.run_id:
+                self._flush()
+
+            self.run_id = run_id
+            self.tokens.append(text)
+            self.size += len(text)
+
+            if (
+                self.last_flush is None
+                or self.size >= self.flush_size
+                or time.monotonic() - self.last_flush >= self.flush_interval
+            ):
+                self._flush()
+            elif self.timer is None:
+                self._start_timer()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._flush()
+
+    def _start_timer(self) -> None:
+        delay = self.flush_interval - (time.monotonic() - self.last_flush)
+        self.timer = threading.Timer(
+            max(delay, 0), self._flush_on_timer, args=(self.flush_count,)
+        )
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _flush_on_timer(self, flush_count: int) -> None:
+        with self.lock:
+            # The tokens were already sent by a flush since the timer started
+            if flush_count == self.flush_count:
+                self._flush()
+
+    def _flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.flush_count += 1
+        self.last_flush = time.monotonic()
+        if not self.tokens:
+            return
+
+        self.sequence_number += 1
+        token = {"sequenceNumber": self.sequence_number, "value": "".join(self.tokens)}
+        if self.run_id is not None:
+            token["runId"] = self.run_id
+        self.tokens = []
+        self.size = 0
+
+        self.send(
+            {
+                "type": "text",
+                "action": ChatbotAction.LLM_NEW_TOKEN.value,
+                "userId": self.user_id,
+                "timestamp": str(int(round(datetime.now().timestamp()))),
+                "data": {"sessionId": self.session_id, "token": token},
+            }
+        )
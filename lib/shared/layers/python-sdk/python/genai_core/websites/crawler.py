@@ -1,19 +1,35 @@
-import re
 import os
 import uuid
+import json
+import heapq
+import hashlib
+import asyncio
+import itertools
+import aiohttp
 import boto3
+import botocore
 import requests
 import genai_core.chunks
 import genai_core.documents
+import genai_core.websites.extractors
 import pdfplumber
 import io
-from typing import List
-from bs4 import BeautifulSoup
+from typing import List, Optional
 from urllib.parse import urlparse
 
 
 PROCESSING_BUCKET_NAME = os.environ["PROCESSING_BUCKET_NAME"]
-s3 = boto3.resource("s3")
+CRAWL_STATE_FORMAT_VERSION = 1
+CRAWLER_MAX_CONCURRENCY = int(os.environ.get("CRAWLER_MAX_CONCURRENCY", "16"))
+CRAWLER_MAX_CONCURRENCY_PER_HOST = int(
+    os.environ.get("CRAWLER_MAX_CONCURRENCY_PER_HOST", "4")
+)
+CRAWLER_INGEST_CONCURRENCY = int(os.environ.get("CRAWLER_INGEST_CONCURRENCY", "4"))
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    + "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+}
+s3_client = boto3.client("s3")
 
 
 def crawl_urls(
@@ -27,108 +43,341 @@ def crawl_urls(
 ):
     workspace_id = workspace["workspace_id"]
     document_id = document["document_id"]
-    batch_size = 20
-
-    idx = 0
-    while True:
-        # break the loop when priority loop is empty or processed urls is equal to limit
-        if len(priority_queue) == 0 or len(processed_urls) == limit:
-            break
-
-        priority_queue = sorted(priority_queue, key=lambda val: val["priority"])
-        current = priority_queue.pop(0)
-        current_url = current["url"]
-        current_priority = current["priority"]
-        if current_url in processed_urls:
-            continue
 
-        idx += 1
+    frontier = CrawlFrontier(priority_queue, processed_urls)
+    engine = CrawlerEngine(
+        workspace=workspace,
+        document=document,
+        follow_links=follow_links,
+        limit=limit,
+        content_types=content_types,
+    )
+    asyncio.run(engine.run(frontier))
+
+    return {
+        "workspace_id": workspace_id,
+        "document_id": document_id,
+        "workspace": workspace,
+        "document": document,
+        "priority_queue": frontier.to_priority_queue(),
+        "processed_urls": frontier.processed_urls,
+        "follow_links": follow_links,
+        "limit": limit,
+    }
+
+
+class CrawlFrontier:
+    """URLs to crawl ordered by priority (lowest first, then insertion
+    order). A URL is only ever queued once: the seen set covers both the
+    queued and the processed URLs.
+
+    It is created from and converted back to the priority_queue and
+    processed_urls lists of the crawler iteration file stored on S3.
+    """
+
+    def __init__(self, priority_queue: List[dict], processed_urls: List[str]):
+        self._heap = []
+        self._counter = itertools.count()
+        self._seen = set(processed_urls)
+        self.processed_urls = list(processed_urls)
+
+        for item in priority_queue:
+            self.push(item["url"], item["priority"])
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, url: str, priority: int):
+        if url in self._seen:
+            return False
+
+        self._seen.add(url)
+        heapq.heappush(self._heap, (priority, next(self._counter), url))
+
+        return True
+
+    def pop(self):
+        """Returns the next (url, priority) and marks the url as processed."""
+        priority, _, url = heapq.heappop(self._heap)
+        self.processed_urls.append(url)
+
+        return url, priority
+
+    def to_priority_queue(self):
+        return [
+            {"url": url, "priority": priority}
+            for priority, _, url in sorted(self._heap)
+        ]
 
-        document_sub_id = str(uuid.uuid4())
-        processed_urls.append(current_url)
-        print(f"Processing url {document_sub_id}: {current_url}")
+
+class CrawlerEngine:
+    """Crawls URLs concurrently with a shared aiohttp session.
+
+    Fetching is bounded globally and per host, connections are reused by
+    the session connector. Parsing (CPU bound) and chunking/embedding
+    (blocking I/O) run in worker threads, so pages are fetched while the
+    previous ones are still being processed.
+    """
+
+    def __init__(
+        self,
+        workspace: dict,
+        document: dict,
+        follow_links: bool,
+        limit: int,
+        content_types: List[str],
+        max_concurrency: int = CRAWLER_MAX_CONCURRENCY,
+        max_concurrency_per_host: int = CRAWLER_MAX_CONCURRENCY_PER_HOST,
+        ingest_concurrency: int = CRAWLER_INGEST_CONCURRENCY,
+        batch_size: int = 20,
+    ):
+        self.workspace = workspace
+        self.document = document
+        self.follow_links = follow_links
+        self.limit = limit
+        self.content_types = content_types
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self.ingest_concurrency = ingest_concurrency
+        self.batch_size = batch_size
+
+    async def run(self, frontier: CrawlFrontier):
+        workspace_id = self.workspace["workspace_id"]
+        document_id = self.document["document_id"]
+        ingest_semaphore = asyncio.Semaphore(self.ingest_concurrency)
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.max_concurrency_per_host,
+            ttl_dns_cache=300,
+        )
+
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=20),
+        ) as session:
+            in_flight = set()
+            completed = 0
+            while True:
+                while (
+                    len(frontier) > 0
+                    and len(in_flight) < self.max_concurrency
+                    and len(frontier.processed_urls) < self.limit
+                ):
+                    url, priority = frontier.pop()
+                    in_flight.add(
+                        asyncio.create_task(
+                            self._process_url(
+                                session, ingest_semaphore, frontier, url, priority
+                            )
+                        )
+                    )
+
+                if len(in_flight) == 0:
+                    break
+
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                completed += len(done)
+                for task in done:
+                    # Errors of a single url are handled in _process_url
+                    task.result()
+
+                # update the status for every 20 (default batch size) links
+                if completed >= self.batch_size or len(in_flight) == 0:
+                    genai_core.documents.set_sub_documents(
+                        workspace_id, document_id, len(frontier.processed_urls)
+                    )
+                    completed = 0
+
+    async def _process_url(
+        self,
+        session: aiohttp.ClientSession,
+        ingest_semaphore: asyncio.Semaphore,
+        frontier: CrawlFrontier,
+        url: str,
+        priority: int,
+    ):
+        # The sub document id is derived from the url so a recrawl of the
+        # same page only re-embeds the chunks that changed.
+        document_sub_id = str(uuid.uuid5(uuid.NAMESPACE_URL, url))
+        print(f"Processing url {document_sub_id}: {url}")
 
         try:
-            content, local_links, _ = parse_url(current_url, content_types)
+            state = await asyncio.to_thread(self._get_crawl_state, document_sub_id)
+            status, content_type, body, etag, last_modified = await self._fetch(
+                session, url, _get_conditional_headers(state)
+            )
+
+            if status == 304 and state:
+                print(f"Not modified: {url}")
+                self._push_links(frontier, state["links"], priority)
+                await asyncio.to_thread(self._skip, state)
+                return
+
+            content, local_links, _ = await asyncio.to_thread(
+                parse_content, url, content_type, body, self.content_types
+            )
         except Exception as e:
             print(e)
-            print(f"Failed to parse url: {current_url}")
-            continue
+            print(f"Failed to parse url: {url}")
+            return
 
-        _store_content_on_s3(
-            workspace_id,
-            document_id,
-            document_sub_id,
-            current_url,
-            content,
-        )
+        new_state = {
+            "format_version": CRAWL_STATE_FORMAT_VERSION,
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": _get_content_hash(content),
+            "links": local_links,
+        }
+
+        # The links of the page are followed even when it can't be ingested
+        self._push_links(frontier, local_links, priority)
+
+        try:
+            if state and state["content_hash"] == new_state["content_hash"]:
+                print(f"Content unchanged: {url}")
+                new_state["chunks"] = state["chunks"]
+                await asyncio.to_thread(self._skip, new_state)
+            else:
+                async with ingest_semaphore:
+                    new_state["chunks"] = await asyncio.to_thread(
+                        self._ingest, document_sub_id, url, content
+                    )
+
+            await asyncio.to_thread(self._store_crawl_state, document_sub_id, new_state)
+        except Exception as e:
+            # The state is not stored, the page is ingested by the next crawl
+            print(e)
+            print(f"Failed to ingest url: {url}")
+
+    def _push_links(self, frontier: CrawlFrontier, links: List[str], priority: int):
+        if self.follow_links:
+            for link in links:
+                frontier.push(link, priority + 1)
+
+    @staticmethod
+    async def _fetch(session: aiohttp.ClientSession, url: str, headers: dict):
+        async with session.get(url, headers=headers) as response:
+            if response.status >= 400:
+                raise Exception(f"Unexpected status {response.status} for {url}")
+
+            content_type = response.headers.get("Content-Type", "")
+            body = await response.read()
+
+            return (
+                response.status,
+                content_type,
+                body,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
 
-        chunks = genai_core.chunks.split_content(workspace, content)
+    def _ingest(self, document_sub_id: str, url: str, content: str):
+        workspace_id = self.workspace["workspace_id"]
+        document_id = self.document["document_id"]
+        _store_content_on_s3(workspace_id, document_id, document_sub_id, url, content)
+
+        chunks = genai_core.chunks.split_content(self.workspace, content)
 
         genai_core.chunks.add_chunks(
             replace=False,
-            workspace=workspace,
-            document=document,
+            workspace=self.workspace,
+            document=self.document,
             document_sub_id=document_sub_id,
             chunks=chunks,
             chunk_complements=None,
-            path=current_url,
+            path=url,
+            incremental=True,
+        )
+
+        return len(chunks)
+
+    def _skip(self, state: dict):
+        # The vectors of the document are reset when it is crawled again,
+        # the chunks of an unchanged page are still in the index.
+        genai_core.documents.set_document_vectors(
+            self.workspace["workspace_id"],
+            self.document["document_id"],
+            state["chunks"],
+            replace=False,
         )
-        if follow_links:
-            for link in local_links:
-                if link not in processed_urls:
-                    priority_queue.append(
-                        {"url": link, "priority": current_priority + 1}
-                    )
 
-        # update the status for every 20 (default batch size) links
-        if (
-            idx == batch_size
-            or len(priority_queue) == 0
-            or len(processed_urls) == limit
-        ):
-            sub_documents = len(processed_urls)
-            genai_core.documents.set_sub_documents(
-                workspace_id, document_id, sub_documents
+    def _get_crawl_state(self, document_sub_id: str):
+        """Returns the state of the previous crawl of a page or None."""
+        try:
+            response = s3_client.get_object(
+                Bucket=PROCESSING_BUCKET_NAME,
+                Key=self._get_crawl_state_key(document_sub_id),
             )
-            idx = 0
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] in ["NoSuchKey", "404"]:
+                return None
+            raise e
 
-    return {
-        "workspace_id": workspace_id,
-        "document_id": document_id,
-        "workspace": workspace,
-        "document": document,
-        "priority_queue": priority_queue,
-        "processed_urls": processed_urls,
-        "follow_links": follow_links,
-        "limit": limit,
-    }
+        state = json.loads(response["Body"].read().decode("utf-8"))
+        if state.get("format_version") != CRAWL_STATE_FORMAT_VERSION:
+            return None
+
+        return state
+
+    def _store_crawl_state(self, document_sub_id: str, state: dict):
+        s3_client.put_object(
+            Bucket=PROCESSING_BUCKET_NAME,
+            Key=self._get_crawl_state_key(document_sub_id),
+            Body=json.dumps(state),
+            ContentType="application/json",
+        )
+
+    def _get_crawl_state_key(self, document_sub_id: str):
+        workspace_id = self.workspace["workspace_id"]
+        document_id = self.document["document_id"]
+
+        return f"{workspace_id}/{document_id}/{document_sub_id}/crawl_state.json"
+
+
+def _get_conditional_headers(state: Optional[dict]):
+    headers = {}
+    if state:
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+    return headers
+
+
+def _get_content_hash(content: str):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
 
 def parse_url(url: str, content_types_supported: list):
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        + "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-    }
+    response = requests.get(url, headers=HEADERS, timeout=20)
+    content_type = response.headers["Content-Type"]
+
+    return parse_content(url, content_type, response.content, content_types_supported)
 
+
+def parse_content(
+    url: str,
+    content_type: Optional[str],
+    body: bytes,
+    content_types_supported: list,
+):
     root_url_parse = urlparse(url)
     base_url = f"{root_url_parse.scheme}://{root_url_parse.netloc}"
-
-    response = requests.get(url, headers=headers, timeout=20)
-    content_type = response.headers["Content-Type"]
     links = []
 
     if ("text/html" in content_type) and ("text/html" in content_types_supported):
-        soup = BeautifulSoup(response.content, "html.parser")
-        content = soup.get_text(separator=" ")
-        content = re.sub(r"[ \n]+", " ", content)
-        links = [a["href"] for a in soup.find_all("a", href=True)]
+        extract = genai_core.websites.extractors.get_html_extractor()
+        content, links = extract(body)
 
     elif ("application/pdf" in content_type) and (
         "application/pdf" in content_types_supported
     ):
-        pdf_bytes = response.content  # Get the bytes content of the response
-        pdf_stream = io.BytesIO(pdf_bytes)  # Create a BytesIO stream from the bytes
+        pdf_stream = io.BytesIO(body)  # Create a BytesIO stream from the bytes
         with pdfplumber.open(pdf_stream) as pdf:
             content = []
             for page in pdf.pages:
@@ -172,12 +421,14 @@ def parse_url(url: str, content_types_supported: list):
 def _store_content_on_s3(
     workspace_id: str, document_id: str, document_sub_id: str, path: str, content: str
 ):
-    s3.Object(
-        PROCESSING_BUCKET_NAME,
-        f"{workspace_id}/{document_id}/{document_sub_id}/path.txt",
-    ).put(Body=path)
-
-    s3.Object(
-        PROCESSING_BUCKET_NAME,
-        f"{workspace_id}/{document_id}/{document_sub_id}/content.txt",
-    ).put(Body=content)
+    s3_client.put_object(
+        Bucket=PROCESSING_BUCKET_NAME,
+        Key=f"{workspace_id}/{document_id}/{document_sub_id}/path.txt",
+        Body=path,
+    )
+
+    s3_client.put_object(
+        Bucket=PROCESSING_BUCKET_NAME,
+        Key=f"{workspace_id}/{document_id}/{document_sub_id}/content.txt",
+        Body=content,
+    )
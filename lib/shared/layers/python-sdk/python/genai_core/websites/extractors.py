@@ -0,0 +1,119 @@
+import os
+import re
+from typing import Callable, Dict, List, Tuple
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# An HTML extractor takes the raw page body and returns the text content
+# and the href of every link of the page.
+HtmlExtractor = Callable[[bytes], Tuple[str, List[str]]]
+
+CRAWLER_HTML_EXTRACTOR = os.environ.get("CRAWLER_HTML_EXTRACTOR", "lxml")
+# Elements that are not part of the page content. Links found inside are
+# still returned, navigation menus are how most pages are discovered.
+BOILERPLATE_TAGS = {
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "iframe",
+    "nav",
+    "footer",
+}
+# The header of the site is boilerplate, the header of an article or of the
+# main content usually has its title
+PAGE_HEADER_TAG = "header"
+CONTENT_TAGS = {"article", "main"}
+
+_extractors: Dict[str, HtmlExtractor] = {}
+
+
+def register_html_extractor(name: str):
+    def decorator(fn: HtmlExtractor):
+        _extractors[name] = fn
+        return fn
+
+    return decorator
+
+
+def get_html_extractor(name: str = CRAWLER_HTML_EXTRACTOR):
+    """Returns the extractor registered with this name. The BeautifulSoup
+    extractor is used when lxml is not installed."""
+    extractor = _extractors.get(name)
+    if extractor is None:
+        extractor = _extractors["beautifulsoup"]
+
+    return extractor
+
+
+def list_html_extractors():
+    return list(_extractors.keys())
+
+
+@register_html_extractor("beautifulsoup")
+def extract_beautifulsoup(body: bytes):
+    soup = BeautifulSoup(body, "html.parser")
+    content = soup.get_text(separator=" ")
+    content = re.sub(r"[ \n]+", " ", content)
+    links = [a["href"] for a in soup.find_all("a", href=True)]
+
+    return content, links
+
+
+def extract_lxml(body: bytes):
+    """Extracts the text outside of boilerplate elements and the links in a
+    single walk over the lxml tree."""
+    try:
+        root = lxml.html.document_fromstring(body)
+    except (lxml.etree.ParserError, ValueError):
+        return "", []
+
+    parts = []
+    links = []
+    skip_depth = 0
+    content_depth = 0
+    for event, element in lxml.etree.iterwalk(root, events=("start", "end")):
+        tag = element.tag
+        if not isinstance(tag, str):
+            # Comments and processing instructions, only the tail is text
+            if event == "end" and skip_depth == 0 and element.tail:
+                parts.append(element.tail)
+            continue
+
+        # The content depth is the same at the start and the end of a header
+        is_boilerplate = tag in BOILERPLATE_TAGS or (
+            tag == PAGE_HEADER_TAG and content_depth == 0
+        )
+        if event == "start":
+            if tag == "a":
+                href = element.get("href")
+                if href:
+                    links.append(href)
+            if tag in CONTENT_TAGS:
+                content_depth += 1
+
+            if is_boilerplate:
+                skip_depth += 1
+            elif skip_depth == 0 and element.text:
+                parts.append(element.text)
+        else:
+            if tag in CONTENT_TAGS:
+                content_depth -= 1
+            if is_boilerplate:
+                skip_depth -= 1
+            if skip_depth == 0 and element.tail:
+                parts.append(element.tail)
+
+    content = " ".join(" ".join(parts).split())
+
+    return content, links
+
+
+if lxml is not None:
+    register_html_extractor("lxml")(extract_lxml)
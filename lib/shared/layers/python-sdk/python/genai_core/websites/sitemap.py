@@ -1,54 +1,139 @@
-import tempfile
+import os
+import gzip
 import requests
 import defusedxml.ElementTree as ET
-import gzip
-import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+SITEMAP_MAX_CONCURRENCY = int(os.environ.get("SITEMAP_MAX_CONCURRENCY", "8"))
+SITEMAP_NAMESPACE = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def extract_urls_from_sitemap(
+    sitemap_url: str,
+    limit: Optional[int] = None,
+    modified_since: Optional[datetime] = None,
+    max_concurrency: int = SITEMAP_MAX_CONCURRENCY,
+):
+    """Returns the unique page urls of a sitemap.
 
+    Sitemap indexes are followed level by level, the sitemaps of a level
+    are fetched concurrently. Each sitemap is streamed and parsed
+    incrementally so only the urls are kept in memory. When a limit is
+    set, no more sitemaps are fetched once it is reached. Page urls with a
+    lastmod older than modified_since are skipped, the sitemaps of an
+    index are always read (their lastmod is not the one of their pages).
+    """
+    urls = []
+    seen_urls = set()
+    seen_sitemaps = {sitemap_url}
+    pending = [sitemap_url]
+
+    def read(url: str):
+        return read_sitemap(url, limit=limit, modified_since=modified_since)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        while len(pending) > 0:
+            sub_sitemaps = []
+            for child_sitemaps, child_urls in executor.map(read, pending):
+                for url in child_urls:
+                    if url not in seen_urls:
+                        seen_urls.add(url)
+                        urls.append(url)
+
+                for child_sitemap in child_sitemaps:
+                    if child_sitemap not in seen_sitemaps:
+                        seen_sitemaps.add(child_sitemap)
+                        sub_sitemaps.append(child_sitemap)
 
-def decompress_gzip_data(response):
-    tmpdir = tempfile.gettempdir()
-    filename = f"{tmpdir}/{hash(response.url)}.gzip"
-    with open(filename, "wb") as file:
-        file.write(response.content)
-    with gzip.open(filename, "rb") as f:
-        sitemap_xml = f.read()
-    os.remove(filename)
-    return sitemap_xml
+            if limit is not None and len(urls) >= limit:
+                return urls[:limit]
 
+            pending = sub_sitemaps
 
-def extract_urls_from_sitemap(sitemap_url: str):
+    return urls
+
+
+def read_sitemap(
+    sitemap_url: str,
+    limit: Optional[int] = None,
+    modified_since: Optional[datetime] = None,
+):
+    """Returns the (sitemaps, urls) listed in a sitemap or a sitemap index."""
+    sitemaps = []
     urls = []
     try:
-        response = requests.get(sitemap_url, timeout=15)  # seconds
+        response = requests.get(sitemap_url, timeout=15, stream=True)  # seconds
         if response.status_code != 200:
             print(f"Error while fetching sitemap data: {sitemap_url}")
-            return []
-
-        # Handle sitemap with gzip compression
-        if sitemap_url.lower().endswith("gz"):
-            sitemap = decompress_gzip_data(response)
-        else:
-            sitemap = response.content
-        root = ET.fromstring(sitemap)
-        root_tag = root.tag.lower()
-
-        # if root element is sitemapindex, fetch individual sitemaps recursively
-        if "sitemapindex" in root_tag:
-            for elem in root.findall(
-                "{http://www.sitemaps.org/schemas/sitemap/0.9}"
-                + "sitemap/{http://www.sitemaps.org/schemas/sitemap/0.9}loc"
-            ):
-                links = extract_urls_from_sitemap(elem.text)
-                urls.extend(links)
-        elif "urlset" in root_tag:
-            for elem in root.findall(
-                "{http://www.sitemaps.org/schemas/sitemap/0.9}"
-                + "url/{http://www.sitemaps.org/schemas/sitemap/0.9}loc"
-            ):
-                urls.append(elem.text)
-        else:
-            print(f"No valid root tag found for sitemap: {sitemap_url}")
+            return sitemaps, urls
+
+        with response:
+            # Content-Encoding is handled by urllib3, a gzip file is
+            # decompressed while it is parsed.
+            response.raw.decode_content = True
+            stream = response.raw
+            if sitemap_url.lower().endswith("gz"):
+                stream = gzip.GzipFile(fileobj=response.raw)
+
+            for tag, loc, lastmod in iter_sitemap_entries(stream):
+                if not loc:
+                    continue
+
+                if tag == "sitemap":
+                    sitemaps.append(loc)
+                elif _is_modified_since(lastmod, modified_since):
+                    urls.append(loc)
+                    if limit is not None and len(urls) >= limit:
+                        break
     except Exception as e:
         print(f"Error while processing sitemaps for {sitemap_url}", e)
-    else:
-        return urls
+
+    return sitemaps, urls
+
+
+def iter_sitemap_entries(stream):
+    """Yields the ("sitemap" | "url", loc, lastmod) entries of a sitemap.
+
+    Elements are cleared once read so memory does not grow with the size
+    of the document.
+    """
+    root = None
+    root_tag = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if root is None:
+            root = elem
+            root_tag = elem.tag.lower()
+            if "sitemapindex" not in root_tag and "urlset" not in root_tag:
+                print("No valid root tag found for sitemap")
+                return
+            continue
+
+        if event != "end":
+            continue
+
+        if elem.tag in [f"{SITEMAP_NAMESPACE}sitemap", f"{SITEMAP_NAMESPACE}url"]:
+            tag = "sitemap" if "sitemapindex" in root_tag else "url"
+            loc = elem.findtext(f"{SITEMAP_NAMESPACE}loc")
+            lastmod = elem.findtext(f"{SITEMAP_NAMESPACE}lastmod")
+            yield tag, loc.strip() if loc else None, lastmod
+            root.clear()
+
+
+def _is_modified_since(lastmod: Optional[str], modified_since: Optional[datetime]):
+    """Entries without a valid lastmod are kept"""
+    if modified_since is None or not lastmod:
+        return True
+
+    try:
+        modified = datetime.fromisoformat(lastmod.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return True
+
+    if modified.tzinfo is None:
+        modified = modified.replace(tzinfo=timezone.utc)
+    if modified_since.tzinfo is None:
+        modified_since = modified_since.replace(tzinfo=timezone.utc)
+
+    return modified >= modified_since
@@ -4,11 +4,11 @@ import uuid
 from aws_lambda_powertools import Logger
 import boto3
 import genai_core.embeddings
+from genai_core.utils.resources import get_thread_resource
 from datetime import datetime
 from .types import WorkspaceStatus
 from genai_core.types import Task
 
-dynamodb = boto3.resource("dynamodb")
 sfn_client = boto3.client("stepfunctions")
 logger = Logger()
 
@@ -29,8 +29,11 @@ DELETE_WORKSPACE_WORKFLOW_ARN = os.environ.get("DELETE_WORKSPACE_WORKFLOW_ARN")
 
 WORKSPACE_OBJECT_TYPE = "workspace"
 
-if WORKSPACES_TABLE_NAME:
-    table = dynamodb.Table(WORKSPACES_TABLE_NAME)
+
+def _get_table():
+    # The workspaces are also read by the threads of the RSS posts crawl,
+    # the resource is the one of the current thread
+    return get_thread_resource("dynamodb").Table(WORKSPACES_TABLE_NAME)
 
 
 def list_workspaces():
@@ -39,7 +42,7 @@ def list_workspaces():
 
     while True:
         if last_evaluated_key:
-            response = table.query(
+            response = _get_table().query(
                 IndexName=WORKSPACES_BY_OBJECT_TYPE_INDEX_NAME,
                 KeyConditionExpression=boto3.dynamodb.conditions.Key("object_type").eq(
                     WORKSPACE_OBJECT_TYPE
@@ -48,7 +51,7 @@ def list_workspaces():
                 ScanIndexForward=False,
             )
         else:
-            response = table.query(
+            response = _get_table().query(
                 IndexName=WORKSPACES_BY_OBJECT_TYPE_INDEX_NAME,
                 KeyConditionExpression=boto3.dynamodb.conditions.Key("object_type").eq(
                     WORKSPACE_OBJECT_TYPE
@@ -66,7 +69,7 @@ def list_workspaces():
 
 
 def get_workspace(workspace_id: str):
-    response = table.get_item(
+    response = _get_table().get_item(
         Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE}
     )
     item = response.get("Item")
@@ -77,7 +80,7 @@ def get_workspace(workspace_id: str):
 def set_status(workspace_id: str, status: str):
     timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
-    response = table.update_item(
+    response = _get_table().update_item(
         Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE},
         UpdateExpression="SET #status=:status, updated_at=:timestampValue",
         ExpressionAttributeNames={
@@ -144,7 +147,7 @@ def create_workspace_aurora(
         "updated_at": timestamp,
     }
 
-    ddb_response = table.put_item(Item=item)
+    ddb_response = _get_table().put_item(Item=item)
 
     response = sfn_client.start_execution(
         stateMachineArn=CREATE_AURORA_WORKSPACE_WORKFLOW_ARN,
@@ -214,7 +217,7 @@ def create_workspace_open_search(
         "updated_at": timestamp,
     }
 
-    ddb_response = table.put_item(Item=item)
+    ddb_response = _get_table().put_item(Item=item)
 
     response = sfn_client.start_execution(
         stateMachineArn=CREATE_OPEN_SEARCH_WORKSPACE_WORKFLOW_ARN,
@@ -260,7 +263,7 @@ def create_workspace_kendra(
         "updated_at": timestamp,
     }
 
-    ddb_response = table.put_item(Item=item)
+    ddb_response = _get_table().put_item(Item=item)
 
     response = sfn_client.start_execution(
         stateMachineArn=CREATE_KENDRA_WORKSPACE_WORKFLOW_ARN,
@@ -305,14 +308,14 @@ def create_workspace_bedrock_kb(
         "updated_at": timestamp,
     }
 
-    response = table.put_item(Item=item)
+    response = _get_table().put_item(Item=item)
     logger.info("Response for create_workspace_bedrock_kb", response=response)
 
     return item
 
 
 def delete_workspace(workspace_id: str):
-    response = table.get_item(
+    response = _get_table().get_item(
         Key={"workspace_id": workspace_id, "object_type": WORKSPACE_OBJECT_TYPE}
     )
 
@@ -65,6 +65,9 @@ export class ApplicationsClient {
     temperature: number;
     topP: number;
     seed: number;
+    memoryStrategy: string;
+    memoryWindowSize: number;
+    memoryMaxTokens: number;
   }): Promise<GraphQLResult<GraphQLQuery<CreateApplicationMutation>>> {
     const result = API.graphql<GraphQLQuery<CreateApplicationMutation>>({
       query: createApplication,
@@ -93,6 +96,9 @@ export class ApplicationsClient {
     temperature: number;
     topP: number;
     seed: number;
+    memoryStrategy: string;
+    memoryWindowSize: number;
+    memoryMaxTokens: number;
   }): Promise<GraphQLResult<GraphQLQuery<UpdateApplicationMutation>>> {
     const result = API.graphql<GraphQLQuery<UpdateApplicationMutation>>({
       query: updateApplication,
@@ -43,9 +43,18 @@ export class SessionsClient {
     return result;
   }
 
-  async getSessions(): Promise<GraphQLResult<GraphQLQuery<ListSessionsQuery>>> {
+  async getSessions(
+    limit?: number,
+    nextToken?: string
+  ): Promise<GraphQLResult<GraphQLQuery<ListSessionsQuery>>> {
     const result = await API.graphql<GraphQLQuery<ListSessionsQuery>>({
       query: listSessions,
+      variables: {
+        input: {
+          limit,
+          nextToken,
+        },
+      },
     });
     return result;
   }
@@ -14,11 +14,10 @@ import { DateTime } from "luxon";
 import { useState, useEffect, useContext, useCallback } from "react";
 import { Link } from "react-router-dom";
 import { v4 as uuidv4 } from "uuid";
-import { useCollection } from "@cloudscape-design/collection-hooks";
 import { ApiClient } from "../../common/api-client/api-client";
 import { AppContext } from "../../common/app-context";
 import RouterButton from "../wrappers/router-button";
-import { Session } from "../../API";
+import { Session, SessionsResult } from "../../API";
 import { Utils } from "../../common/utils";
 
 export interface SessionsProps {
@@ -27,7 +26,8 @@ export interface SessionsProps {
 
 export default function Sessions(props: SessionsProps) {
   const appContext = useContext(AppContext);
-  const [sessions, setSessions] = useState<Session[]>([]);
+  const [pages, setPages] = useState<SessionsResult[]>([]);
+  const [currentPageIndex, setCurrentPageIndex] = useState(1);
   const [isLoading, setIsLoading] = useState(true);
   const [selectedItems, setSelectedItems] = useState<Session[]>([]);
   const [preferences, setPreferences] = useState({ pageSize: 20 });
@@ -35,42 +35,26 @@ export default function Sessions(props: SessionsProps) {
   const [deleteAllSessions, setDeleteAllSessions] = useState(false);
   const [globalError, setGlobalError] = useState<string | undefined>(undefined);
 
-  const { items, collectionProps, paginationProps } = useCollection(sessions, {
-    filtering: {
-      empty: (
-        <Box margin={{ vertical: "xs" }} textAlign="center" color="inherit">
-          <SpaceBetween size="m">
-            <b>No sessions</b>
-          </SpaceBetween>
-        </Box>
-      ),
-    },
-    pagination: { pageSize: preferences.pageSize },
-    sorting: {
-      defaultState: {
-        sortingColumn: {
-          sortingField: "startTime",
-        },
-        isDescending: true,
-      },
-    },
-    selection: {},
-  });
-
+  // The sessions are sorted by last activity, the pages are loaded again
+  // from the first one when the list is refreshed
   const getSessions = useCallback(async () => {
     if (!appContext) return;
 
     const apiClient = new ApiClient(appContext);
     try {
       setGlobalError(undefined);
-      const result = await apiClient.sessions.getSessions();
-      setSessions(result.data!.listSessions);
+      const result = await apiClient.sessions.getSessions(
+        preferences.pageSize
+      );
+      setPages([result.data!.listSessions]);
     } catch (error) {
       console.log(Utils.getErrorMessage(error));
       setGlobalError(Utils.getErrorMessage(error));
-      setSessions([]);
+      setPages([]);
     }
-  }, [appContext]);
+    setCurrentPageIndex(1);
+    setSelectedItems([]);
+  }, [appContext, preferences.pageSize]);
 
   useEffect(() => {
     if (!appContext) return;
@@ -82,6 +66,37 @@ export default function Sessions(props: SessionsProps) {
     })();
   }, [appContext, getSessions, props.toolsOpen]);
 
+  const onNextPageClick = async () => {
+    if (!appContext) return;
+
+    const nextToken = pages[currentPageIndex - 1]?.nextToken;
+    if (!nextToken) return;
+
+    if (pages.length <= currentPageIndex) {
+      setIsLoading(true);
+      const apiClient = new ApiClient(appContext);
+      try {
+        const result = await apiClient.sessions.getSessions(
+          preferences.pageSize,
+          nextToken
+        );
+        setPages((current) => [...current, result.data!.listSessions]);
+      } catch (error) {
+        console.log(Utils.getErrorMessage(error));
+        setGlobalError(Utils.getErrorMessage(error));
+        setIsLoading(false);
+        return;
+      }
+      setIsLoading(false);
+    }
+
+    setCurrentPageIndex((current) => current + 1);
+  };
+
+  const onPreviousPageClick = () => {
+    setCurrentPageIndex((current) => Math.max(1, current - 1));
+  };
+
   const deleteSelectedSessions = async () => {
     if (!appContext) return;
 
@@ -156,7 +171,7 @@ export default function Sessions(props: SessionsProps) {
         }
         header={"Delete all sessions"}
       >
-        {`Do you want to delete ${sessions.length} sessions?`}
+        Do you want to delete all your sessions?
       </Modal>
       {globalError && (
         <Alert
@@ -168,9 +183,8 @@ export default function Sessions(props: SessionsProps) {
         </Alert>
       )}
       <Table
-        {...collectionProps}
         variant="full-page"
-        items={items}
+        items={pages[currentPageIndex - 1]?.items ?? []}
         onSelectionChange={({ detail }) => {
           console.log(detail);
           setSelectedItems(detail.selectedItems);
@@ -194,7 +208,17 @@ export default function Sessions(props: SessionsProps) {
           // @ts-expect-error no-unused-var
           itemSelectionLabel: (e, item) => item.title!,
         }}
-        pagination={<Pagination {...paginationProps} />}
+        pagination={
+          pages.length === 0 ? null : (
+            <Pagination
+              openEnd={!!pages[pages.length - 1]?.nextToken}
+              pagesCount={pages.length}
+              currentPageIndex={currentPageIndex}
+              onNextPageClick={onNextPageClick}
+              onPreviousPageClick={onPreviousPageClick}
+            />
+          )
+        }
         loadingText="Loading history"
         loading={isLoading}
         resizableColumns
@@ -270,7 +294,6 @@ export default function Sessions(props: SessionsProps) {
             {
               id: "title",
               header: "Title",
-              sortingField: "title",
               width: 800,
               minWidth: 200,
               cell: (e) => (
@@ -281,17 +304,10 @@ export default function Sessions(props: SessionsProps) {
             {
               id: "startTime",
               header: "Time",
-              sortingField: "startTime",
               cell: (e: Session) =>
                 DateTime.fromISO(
                   new Date(e.startTime).toISOString()
                 ).toLocaleString(DateTime.DATETIME_SHORT),
-              sortingComparator: (a, b) => {
-                return (
-                  new Date(b.startTime).getTime() -
-                  new Date(a.startTime).getTime()
-                );
-              },
             },
           ] as TableProps.ColumnDefinition<Session>[]
         }
@@ -38,6 +38,30 @@ const workspaceDefaultOptions: SelectProps.Option[] = [
   },
 ];
 
+const memoryStrategyOptions: SelectProps.Option[] = [
+  {
+    label: "Full history",
+    value: "buffer",
+    description: "Every previous message is sent to the model",
+  },
+  {
+    label: "Last turns",
+    value: "window",
+    description: "Only the most recent questions and answers are sent",
+  },
+  {
+    label: "Token budget",
+    value: "token_window",
+    description: "The most recent turns that fit in the token budget",
+  },
+  {
+    label: "Rolling summary",
+    value: "summary",
+    description:
+      "A summary of the older turns, updated in the background, and the recent turns",
+  },
+];
+
 export interface ApplicationFormProps {
   data: ApplicationManageInput;
   onChange: (data: Partial<ApplicationManageInput>) => void;
@@ -443,6 +467,69 @@ export default function ApplicationForm(props: ApplicationFormProps) {
                         }}
                       />
                     </FormField>
+
+                    <FormField
+                      label="Conversation memory"
+                      errorText={props.errors.memoryStrategy}
+                      description="The part of the conversation history sent with each question. Limiting it keeps the latency and the cost of long sessions stable."
+                    >
+                      <Select
+                        disabled={props.submitting}
+                        selectedOption={
+                          memoryStrategyOptions.find(
+                            (o) => o.value === props.data.memoryStrategy
+                          ) ?? memoryStrategyOptions[0]
+                        }
+                        options={memoryStrategyOptions}
+                        onChange={({ detail: { selectedOption } }) =>
+                          props.onChange({
+                            memoryStrategy: selectedOption.value ?? "buffer",
+                          })
+                        }
+                      />
+                    </FormField>
+
+                    {["window", "summary"].includes(
+                      props.data.memoryStrategy
+                    ) && (
+                      <FormField
+                        label="Memory window"
+                        errorText={props.errors.memoryWindowSize}
+                        description="Number of recent turns (a question and its answer) kept as they are."
+                      >
+                        <Input
+                          type="number"
+                          step={1}
+                          value={props.data.memoryWindowSize.toString()}
+                          onChange={({ detail: { value } }) => {
+                            props.onChange({
+                              memoryWindowSize: parseInt(value),
+                            });
+                          }}
+                        />
+                      </FormField>
+                    )}
+
+                    {["token_window", "summary"].includes(
+                      props.data.memoryStrategy
+                    ) && (
+                      <FormField
+                        label="Memory token budget"
+                        errorText={props.errors.memoryMaxTokens}
+                        description="Approximate maximum number of tokens of conversation history (including the summary) sent with each question."
+                      >
+                        <Input
+                          type="number"
+                          step={100}
+                          value={props.data.memoryMaxTokens.toString()}
+                          onChange={({ detail: { value } }) => {
+                            props.onChange({
+                              memoryMaxTokens: parseInt(value),
+                            });
+                          }}
+                        />
+                      </FormField>
+                    )}
                   </>
                 )}
                 {outputModality &&
@@ -41,6 +41,9 @@ const defaults: ApplicationManageInput = {
   temperature: 0.6,
   topP: 0.9,
   seed: 0,
+  memoryStrategy: "buffer",
+  memoryWindowSize: 10,
+  memoryMaxTokens: 4000,
   createTime: undefined,
 };
 
@@ -102,6 +105,9 @@ export default function ManageApplication() {
             temperature: application.temperature ?? 0.6,
             topP: application.topP ?? 0.9,
             seed: application.seed ?? 0,
+            memoryStrategy: application.memoryStrategy ?? "buffer",
+            memoryWindowSize: application.memoryWindowSize ?? 10,
+            memoryMaxTokens: application.memoryMaxTokens ?? 4000,
             createTime: application.createTime ?? "",
           }
         : defaults;
@@ -149,6 +155,21 @@ export default function ManageApplication() {
         errors.condenseSystemPrompt =
           "Condense system prompt cannot have special characters";
       }
+      if (
+        isNaN(form.memoryWindowSize) ||
+        form.memoryWindowSize < 1 ||
+        form.memoryWindowSize > 100
+      ) {
+        errors.memoryWindowSize = "Memory window must be between 1 and 100";
+      }
+      if (
+        isNaN(form.memoryMaxTokens) ||
+        form.memoryMaxTokens < 100 ||
+        form.memoryMaxTokens > 100000
+      ) {
+        errors.memoryMaxTokens =
+          "Memory token budget must be between 100 and 100000";
+      }
       return errors;
     },
   });
@@ -189,6 +210,9 @@ export default function ManageApplication() {
         topP: application.topP ?? 0.6,
         streaming: application.streaming ?? false,
         enableGuardrails: true,
+        memoryStrategy: application.memoryStrategy ?? "buffer",
+        memoryWindowSize: application.memoryWindowSize ?? 10,
+        memoryMaxTokens: application.memoryMaxTokens ?? 4000,
       };
       onChange(initialValues);
     }
@@ -221,6 +245,9 @@ export default function ManageApplication() {
       temperature: data.temperature ?? 0.6,
       topP: data.topP ?? 0.9,
       seed: data.seed ?? 0,
+      memoryStrategy: data.memoryStrategy ?? "buffer",
+      memoryWindowSize: data.memoryWindowSize ?? 10,
+      memoryMaxTokens: data.memoryMaxTokens ?? 4000,
     };
 
     const apiClient = new ApiClient(appContext);
@@ -269,6 +296,9 @@ export default function ManageApplication() {
       temperature: data.temperature ?? 0.6,
       topP: data.topP ?? 0.9,
       seed: data.seed ?? 0,
+      memoryStrategy: data.memoryStrategy ?? "buffer",
+      memoryWindowSize: data.memoryWindowSize ?? 10,
+      memoryMaxTokens: data.memoryMaxTokens ?? 4000,
     };
 
     const apiClient = new ApiClient(appContext);
@@ -1,11 +1,45 @@
-import { ColumnLayout, FormField, Input } from "@cloudscape-design/components";
+import {
+  ColumnLayout,
+  FormField,
+  Input,
+  Select,
+  SpaceBetween,
+} from "@cloudscape-design/components";
+
+const chunkingStrategies = [
+  {
+    value: "recursive",
+    label: "Recursive",
+    description: "Splits on paragraphs, lines and words",
+  },
+  {
+    value: "markdown",
+    label: "Markdown headings",
+    description: "Keeps chunks within the sections of .md and .txt files",
+  },
+  {
+    value: "sentence_window",
+    label: "Sentence window",
+    description: "Groups whole sentences, overlapping by sentence",
+  },
+  {
+    value: "semantic",
+    label: "Semantic",
+    description:
+      "Breaks where the topic changes (embeds every sentence at ingestion)",
+  },
+];
 
 interface ChunkSelectorProps {
   errors: Record<string, string | string[]>;
-  data: { chunkSize: number; chunkOverlap: number };
+  data: { chunkingStrategy: string; chunkSize: number; chunkOverlap: number };
   submitting: boolean;
   onChange: (
-    data: Partial<{ chunkSize: number; chunkOverlap: number }>
+    data: Partial<{
+      chunkingStrategy: string;
+      chunkSize: number;
+      chunkOverlap: number;
+    }>
   ) => void;
 }
 
@@ -16,28 +50,50 @@ export function ChunkSelectorField(props: ChunkSelectorProps) {
       stretch={true}
       description="Chunk size is the character limit of each chunk, which is then vectorized."
     >
-      <ColumnLayout columns={2}>
-        <FormField label="Chunk Size" errorText={props.errors.chunkSize}>
-          <Input
-            type="number"
+      <SpaceBetween size="s">
+        <FormField
+          label="Chunking Strategy"
+          errorText={props.errors.chunkingStrategy}
+        >
+          <Select
             disabled={props.submitting}
-            value={props.data.chunkSize.toString()}
-            onChange={({ detail: { value } }) =>
-              props.onChange({ chunkSize: parseInt(value) })
+            selectedOption={
+              chunkingStrategies.find(
+                (item) => item.value === props.data.chunkingStrategy
+              ) ?? chunkingStrategies[0]
             }
-          />
-        </FormField>
-        <FormField label="Chunk Overlap" errorText={props.errors.chunkOverlap}>
-          <Input
-            type="number"
-            disabled={props.submitting}
-            value={props.data.chunkOverlap.toString()}
-            onChange={({ detail: { value } }) =>
-              props.onChange({ chunkOverlap: parseInt(value) })
+            options={chunkingStrategies}
+            onChange={({ detail: { selectedOption } }) =>
+              props.onChange({ chunkingStrategy: selectedOption.value })
             }
           />
         </FormField>
-      </ColumnLayout>
+        <ColumnLayout columns={2}>
+          <FormField label="Chunk Size" errorText={props.errors.chunkSize}>
+            <Input
+              type="number"
+              disabled={props.submitting}
+              value={props.data.chunkSize.toString()}
+              onChange={({ detail: { value } }) =>
+                props.onChange({ chunkSize: parseInt(value) })
+              }
+            />
+          </FormField>
+          <FormField
+            label="Chunk Overlap"
+            errorText={props.errors.chunkOverlap}
+          >
+            <Input
+              type="number"
+              disabled={props.submitting}
+              value={props.data.chunkOverlap.toString()}
+              onChange={({ detail: { value } }) =>
+                props.onChange({ chunkOverlap: parseInt(value) })
+              }
+            />
+          </FormField>
+        </ColumnLayout>
+      </SpaceBetween>
     </FormField>
   );
 }
@@ -35,6 +35,7 @@ const defaults: AuroraWorkspaceCreateInput = {
   metric: metrics[0].value,
   index: true,
   hybridSearch: false,
+  chunkingStrategy: "recursive",
   chunkSize: 1000,
   chunkOverlap: 200,
 };
@@ -153,7 +154,7 @@ export default function CreateWorkspaceAurora() {
         metric: data.metric,
         index: data.index,
         hybridSearch: data.hybridSearch && crossEncoderSelected,
-        chunkingStrategy: "recursive",
+        chunkingStrategy: data.chunkingStrategy,
         chunkSize: data.chunkSize,
         chunkOverlap: data.chunkOverlap,
       });
@@ -18,6 +18,7 @@ const defaults: OpenSearchWorkspaceCreateInput = {
   crossEncoderModel: null,
   languages: [{ value: "english", label: "English" }],
   hybridSearch: false,
+  chunkingStrategy: "recursive",
   chunkSize: 1000,
   chunkOverlap: 200,
 };
@@ -123,7 +124,7 @@ export default function CreateWorkspaceOpenSearch() {
         crossEncoderModelName: crossEncoderModel?.name,
         languages: data.languages.map((x) => x.value ?? ""),
         hybridSearch: data.hybridSearch && crossEncoderSelected,
-        chunkingStrategy: "recursive",
+        chunkingStrategy: data.chunkingStrategy,
         chunkSize: data.chunkSize,
         chunkOverlap: data.chunkOverlap,
       });
@@ -0,0 +1,104 @@
+"""Compares the crawler HTML extractors on a synthetic corpus of
+documentation-like pages (navigation, header, footer, scripts and a long
+article body).
+
+Usage (from the repository root):
+    PROCESSING_BUCKET_NAME=bucket PYTHONPATH=lib/shared/layers/python-sdk/python \\
+        python scripts/benchmarks/html_extractor_benchmark.py
+"""
+
+import argparse
+import random
+import timeit
+
+from bs4 import BeautifulSoup
+
+from genai_core.websites.extractors import get_html_extractor, list_html_extractors
+
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing"]
+
+
+def _sentence(rng: random.Random):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))) + "."
+
+
+def build_page(rng: random.Random, sections: int):
+    nav = "".join(
+        f'<li><a href="/docs/page-{rng.randint(0, 500)}">Page {i}</a></li>'
+        for i in range(rng.randint(20, 80))
+    )
+    body = []
+    for idx in range(sections):
+        paragraphs = "".join(
+            f"<p>{_sentence(rng)} <a href='/docs/ref-{idx}'>{_sentence(rng)}</a> "
+            f"<code>{rng.choice(WORDS)}()</code> {_sentence(rng)}</p>"
+            for _ in range(rng.randint(2, 6))
+        )
+        items = "".join(f"<li>{_sentence(rng)}</li>" for _ in range(rng.randint(0, 5)))
+        body.append(f"<h2>Section {idx}</h2>{paragraphs}<ul>{items}</ul>")
+
+    return (
+        "<!DOCTYPE html><html><head><title>Docs</title>"
+        "<style>body { margin: 0 } .nav { display: flex }</style>"
+        "<script>window.analytics = { track: function () {} };</script></head>"
+        f"<body><header><a href='/'>Home</a> Search the docs</header>"
+        f"<nav><ul>{nav}</ul></nav>"
+        f"<main><article><h1>Title</h1>{''.join(body)}</article></main>"
+        "<aside>On this page <a href='#top'>Top</a></aside>"
+        "<footer>Copyright <a href='https://example.org/legal'>Legal</a></footer>"
+        "<script>console.log('loaded')</script></body></html>"
+    ).encode("utf-8")
+
+
+def _get_article_text(page: bytes):
+    article = BeautifulSoup(page, "html.parser").find("main")
+    return " ".join(article.get_text(separator=" ").split())
+
+
+def build_corpus(pages: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [build_page(rng, rng.randint(2, 40)) for _ in range(pages)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.pages)
+    size = sum(len(page) for page in corpus)
+    print(f"corpus: {len(corpus)} pages, {size / 1e6:.1f} MB")
+
+    reference = get_html_extractor("beautifulsoup")
+    expected = [reference(page) for page in corpus]
+    articles = [_get_article_text(page) for page in corpus]
+
+    for name in list_html_extractors():
+        extract = get_html_extractor(name)
+        actual = [extract(page) for page in corpus]
+        characters = sum(len(content) for content, _ in actual)
+        same_links = all(
+            set(links) == set(expected_links)
+            for (_, links), (_, expected_links) in zip(actual, expected)
+        )
+        article_kept = all(
+            article in " ".join(content.split())
+            for (content, _), article in zip(actual, articles)
+        )
+
+        timings = timeit.repeat(
+            lambda: [extract(page) for page in corpus],
+            number=1,
+            repeat=args.repeat,
+        )
+        best = min(timings)
+        print(
+            f"{name:>13}: {best * 1000:8.1f} ms ({size / best / 1e6:.1f} MB/s), "
+            f"{characters} characters, same links: {same_links}, "
+            f"article text kept: {article_kept}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compares the genai_core recursive splitter with LangChain's
+RecursiveCharacterTextSplitter on a synthetic corpus.
+
+Usage (from the repository root):
+    PYTHONPATH=lib/shared/layers/python-sdk/python \\
+        python scripts/benchmarks/splitter_benchmark.py
+"""
+
+import argparse
+import random
+import timeit
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from genai_core.splitters import get_recursive_splitter
+
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing"]
+
+
+def build_corpus(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    paragraphs = []
+    length = 0
+    while length < size:
+        sentences = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))) + "."
+            for _ in range(rng.randint(1, 8))
+        ]
+        paragraph = "\n".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+
+    return "\n\n".join(paragraphs)
+
+
+def split_langchain(text: str, chunk_size: int, chunk_overlap: int):
+    # Mirrors the previous genai_core.chunks.split_content implementation
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=len
+    )
+    text_data = text_splitter.split_text(text)
+
+    return [text.replace("\x00", "\uFFFD") for text in text_data]
+
+
+def split_genai_core(text: str, chunk_size: int, chunk_overlap: int):
+    return get_recursive_splitter(chunk_size, chunk_overlap).split_text(text)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=2_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = build_corpus(args.size)
+    expected = split_langchain(text, args.chunk_size, args.chunk_overlap)
+    actual = split_genai_core(text, args.chunk_size, args.chunk_overlap)
+    print(f"corpus: {len(text)} characters, {len(expected)} chunks")
+    print(f"identical output: {expected == actual}")
+
+    for name, fn in [("langchain", split_langchain), ("genai_core", split_genai_core)]:
+        timings = timeit.repeat(
+            lambda: fn(text, args.chunk_size, args.chunk_overlap),
+            number=1,
+            repeat=args.repeat,
+        )
+        best = min(timings)
+        print(f"{name:>10}: {best * 1000:8.1f} ms ({len(text) / best / 1e6:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
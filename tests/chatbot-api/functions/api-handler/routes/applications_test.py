@@ -209,3 +209,25 @@ def test_create_application_invalid_input(mocker):
         invalid_input_4["systemPromptRag"] = ">"
         invalid_input_4["condenseSystemPrompt"] = ">"
         create_application(invalid_input_4)
+
+
+def test_create_application_memory_strategy(mocker):
+    mock = mocker.patch(
+        "genai_core.applications.create_application", return_value=application
+    )
+    mocker.patch("genai_core.auth.get_user_roles", return_value=["user", "admin"])
+
+    response = create_application(
+        {
+            **create_application_input,
+            "memoryStrategy": "summary",
+            "memoryWindowSize": 4,
+            "memoryMaxTokens": 2000,
+        }
+    )
+
+    assert mock.call_args.args[-3:] == ("summary", 4, 2000)
+    assert response.get("memoryStrategy") == "buffer"
+
+    with pytest.raises(ValidationError):
+        create_application({**create_application_input, "memoryStrategy": "all"})
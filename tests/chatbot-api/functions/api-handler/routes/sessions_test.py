@@ -27,15 +27,35 @@ def test_get_file_url(mocker):
 
 def test_get_sessions(mocker):
     mocker.patch("genai_core.auth.get_user_id", return_value="userId")
-    mocker.patch("genai_core.sessions.list_sessions_by_user_id", return_value=[session])
-    expected = [
-        {
-            "id": session.get("SessionId"),
-            "title": "content",
-            "startTime": session.get("StartTime") + "Z",
-        }
-    ]
-    assert get_sessions() == expected
+    mock = mocker.patch(
+        "genai_core.sessions.list_user_sessions",
+        return_value={
+            "items": [
+                {"SessionId": "SessionId", "StartTime": "123", "Title": "content"},
+                {"SessionId": "SessionId2", "StartTime": "122"},
+            ],
+            "next_token": "token",
+        },
+    )
+    expected = {
+        "items": [
+            {"id": "SessionId", "title": "content", "startTime": "123Z"},
+            {"id": "SessionId2", "title": "<no title>", "startTime": "122Z"},
+        ],
+        "nextToken": "token",
+    }
+    assert get_sessions({"limit": 10, "nextToken": "previous"}) == expected
+    mock.assert_called_once_with("userId", limit=10, next_token="previous")
+
+    get_sessions()
+    mock.assert_called_with("userId", limit=50, next_token=None)
+
+
+def test_get_sessions_invalid_input():
+    with pytest.raises(ValidationError, match="1 validation error"):
+        get_sessions({"limit": 0})
+    with pytest.raises(ValidationError, match="1 validation error"):
+        get_sessions({"nextToken": "a" * 1025})
 
 
 def test_get_sessions_user_not_found(mocker):
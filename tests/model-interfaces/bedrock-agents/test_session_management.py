@@ -1,4 +1,4 @@
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 import os
 
 # Import using conftest.py path setup
@@ -59,7 +59,8 @@ def test_save_session_history_success(mock_history_class, mock_client):
     """Test successful session history save"""
     mock_client.return_value = Mock()
 
-    mock_history = Mock()
+    # The messages are written in a write_batch() context
+    mock_history = MagicMock()
     mock_history.add_user_message.return_value = None
     mock_history.add_ai_message.return_value = None
     mock_history_class.return_value = mock_history
@@ -69,6 +70,7 @@ def test_save_session_history_success(mock_history_class, mock_client):
     assert result == True
     mock_history.add_user_message.assert_called_once_with("test prompt")
     mock_history.add_ai_message.assert_called_once_with("test response")
+    mock_history.write_batch.assert_called_once()
 
 
 @patch("genai_core.clients.get_agentcore_client")
@@ -77,7 +79,8 @@ def test_save_session_history_error_recovery(mock_history_class, mock_client):
     """Test error recovery when AI message fails to save"""
     mock_client.return_value = Mock()
 
-    mock_history = Mock()
+    # The messages are written in a write_batch() context
+    mock_history = MagicMock()
     mock_history.add_user_message.return_value = None
     mock_history.add_ai_message.side_effect = [Exception("DB Error"), None]
     mock_history_class.return_value = mock_history
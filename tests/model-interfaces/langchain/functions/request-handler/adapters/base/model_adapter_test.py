@@ -1,7 +1,8 @@
 import pytest
 from unittest.mock import MagicMock, patch, call
 from adapters.base import ModelAdapter
-from genai_core.types import ChatbotMode
+from genai_core.langchain import WindowedChatMessageHistory
+from genai_core.types import ChatbotMode, ChatMemoryStrategy
 from langchain_aws import ChatBedrockConverse
 
 
@@ -122,3 +123,66 @@ def test_run_with_output_guardrails_blocking(model_adapter):
     model_adapter.chat_history.replace_last_message.assert_called_once_with(
         "Blocked by guardrails"
     )
+
+
+def test_get_memory_history_uses_the_application_strategy(model_adapter):
+    model_adapter.chat_history = MagicMock()
+    assert model_adapter.get_memory_history() == model_adapter.chat_history
+
+    model_adapter.memory = {"strategy": "window", "windowSize": 3}
+    memory_history = model_adapter.get_memory_history()
+    assert isinstance(memory_history, WindowedChatMessageHistory)
+    assert memory_history.strategy == ChatMemoryStrategy.WINDOW
+    assert memory_history.window_size == 3
+
+    model_adapter.memory = {"strategy": "unknown"}
+    assert model_adapter.get_memory_history() == model_adapter.chat_history
+
+
+def test_run_updates_the_summary_in_the_background(model_adapter):
+    model_adapter.memory = {"strategy": "summary"}
+    model_adapter.chat_history = MagicMock()
+    model_adapter.run_with_chain_v2 = MagicMock(
+        return_value={"content": "Test response"}
+    )
+    model_adapter.apply_bedrock_guardrails = MagicMock(return_value=None)
+    model_adapter.get_summary_llm = MagicMock()
+    model_adapter.get_summary_llm.return_value.invoke.return_value = MagicMock(
+        content="New summary"
+    )
+    model_adapter.get_summary_history = MagicMock()
+    with patch.object(
+        WindowedChatMessageHistory,
+        "get_summary_update",
+        return_value=("Summary", [], 4),
+    ):
+        model_adapter.run("Test prompt")
+        model_adapter.wait_for_memory_update()
+
+    # The summary is not written with the history of the request thread
+    model_adapter.chat_history.update_summary.assert_not_called()
+    summary_history = model_adapter.get_summary_history.return_value
+    summary_history.update_summary.assert_called_once_with("New summary", 4)
+
+
+def test_get_cached_llm_reuses_the_llm_with_the_request_callbacks():
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    class CachedModelAdapter(ModelAdapter):
+        llm_count = 0
+
+        def get_llm(self, model_kwargs={}):
+            CachedModelAdapter.llm_count += 1
+            return FakeListChatModel(
+                responses=["response"], callbacks=[self.callback_handler]
+            )
+
+    with patch("genai_core.langchain.DynamoDBChatMessageHistory"):
+        first = CachedModelAdapter(session_id="session1", user_id="user")
+        second = CachedModelAdapter(session_id="session2", user_id="user")
+        second.get_cached_llm({"streaming": False})
+
+    assert CachedModelAdapter.llm_count == 2
+    assert first.llm is not second.llm
+    assert first.llm.callbacks == [first.callback_handler]
+    assert second.llm.callbacks == [second.callback_handler]
@@ -21,9 +21,9 @@ def mock_genaieh_client():
             },
         }
     )
-    client.invoke_openai_stream_chat.return_value = {
-        "chunks": ["Test ", "OpenAI ", "streaming ", "response"]
-    }
+    client.stream_openai_chat.return_value = iter(
+        ["Test ", "OpenAI ", "streaming ", "response"]
+    )
     return client
 
 
@@ -82,7 +82,7 @@ def test_successful_openai_streaming_request(openai_adapter, mock_genaieh_client
     assert response["type"] == "text"
     assert response["content"] == "Test OpenAI streaming response"
     assert response["sessionId"] == "test-session"
-    mock_genaieh_client.invoke_openai_stream_chat.assert_called_once()
+    mock_genaieh_client.stream_openai_chat.assert_called_once()
 
 
 def test_openai_api_error_handling(openai_adapter, mock_genaieh_client):
@@ -102,7 +102,7 @@ def test_openai_api_error_handling(openai_adapter, mock_genaieh_client):
 
 def test_openai_streaming_api_error_handling(openai_adapter, mock_genaieh_client):
     """Test OpenAI streaming API error handling."""
-    mock_genaieh_client.invoke_openai_stream_chat.return_value = ApiError(
+    mock_genaieh_client.stream_openai_chat.return_value = ApiError(
         error_type="HTTP 500", message="Internal server error"
     )
 
@@ -163,16 +163,44 @@ def test_openai_extract_chat_response(openai_adapter):
     assert result == ""
 
 
-def test_openai_process_streaming_response(openai_adapter):
-    """Test OpenAI streaming response processing."""
-    # Mock the on_llm_new_token method
+def test_openai_streaming_sends_the_tokens_as_received(
+    openai_adapter, mock_genaieh_client
+):
+    """Test that the streamed tokens are sent as the client receives them."""
     openai_adapter.on_llm_new_token = Mock()
+    openai_adapter.callback_handler = Mock()
+    openai_adapter.callback_handler.prompts = []
+    openai_adapter.callback_handler.usage = {}
 
-    response = {"chunks": ["Hello", " ", "world"]}
-    result = openai_adapter._process_openai_streaming_response(response)
+    def stream(body, parser):
+        for chunk in ["Hello", " ", "world"]:
+            yield chunk
+            # Sent before the next chunk is read
+            assert openai_adapter.on_llm_new_token.call_args.args[0] == chunk
+        parser.usage = {"total_tokens": 3, "prompt_tokens": 1}
 
-    assert result == "Hello world"
-    assert openai_adapter.on_llm_new_token.call_count == 3
+    mock_genaieh_client.stream_openai_chat.side_effect = stream
+
+    response = openai_adapter.run(prompt="Hello")
+
+    assert response["content"] == "Hello world"
+    assert [
+        call.args[0] for call in openai_adapter.on_llm_new_token.call_args_list
+    ] == ["Hello", " ", "world"]
+    assert openai_adapter.callback_handler.usage["total_tokens"] == 3
+
+
+def test_openai_streaming_continues_when_a_token_is_not_sent(openai_adapter):
+    """Test that an error sending a token does not stop the stream."""
+    openai_adapter.on_llm_new_token = Mock(side_effect=[None, RuntimeError, None, None])
+    openai_adapter.callback_handler = Mock()
+    openai_adapter.callback_handler.prompts = []
+
+    response = openai_adapter.run(prompt="Hello")
+
+    assert response["type"] == "text"
+    assert response["content"] == "Test OpenAI streaming response"
+    assert openai_adapter.on_llm_new_token.call_count == 4
 
 
 def test_openai_conversation_history_handling(openai_adapter, mock_genaieh_client):
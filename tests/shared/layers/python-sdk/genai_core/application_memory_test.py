@@ -0,0 +1,61 @@
+from genai_core.applications import update_application
+
+stored_application = {
+    "Id": "id",
+    "MemoryStrategy": "summary",
+    "MemoryWindowSize": 4,
+    "MemoryMaxTokens": 2000,
+    "CreateTime": "2024-01-01T00:00:00.000000Z",
+}
+
+application_input = {
+    "id": "id",
+    "name": "name",
+    "model": "bedrock::model",
+    "workspace": "",
+    "systemPrompt": "",
+    "systemPromptRag": "",
+    "condenseSystemPrompt": "",
+    "roles": [],
+    "allowImageInput": False,
+    "allowVideoInput": False,
+    "allowDocumentInput": False,
+    "enableGuardrails": False,
+    "streaming": False,
+    "maxTokens": 512,
+    "temperature": 0.6,
+    "topP": 0.9,
+}
+
+
+def mock_table(mocker):
+    table = mocker.patch("genai_core.applications.table", create=True)
+    table.get_item.return_value = {"Item": stored_application}
+    mocker.patch("genai_core.applications.validate_request")
+    mocker.patch("genai_core.models.get_model_modalities", return_value=["TEXT"])
+    return table
+
+
+def test_update_application_keeps_the_stored_memory_strategy(mocker):
+    mock_table(mocker)
+
+    item = update_application(**application_input)
+
+    # The limits are cleared, the defaults of the strategy are used
+    assert item["MemoryStrategy"] == "summary"
+    assert "MemoryWindowSize" not in item
+    assert "MemoryMaxTokens" not in item
+    assert item["CreateTime"] == stored_application["CreateTime"]
+
+
+def test_update_application_memory_settings(mocker):
+    table = mock_table(mocker)
+
+    item = update_application(
+        **application_input, memoryStrategy="window", memoryWindowSize=6
+    )
+
+    assert item["MemoryStrategy"] == "window"
+    assert item["MemoryWindowSize"] == 6
+    assert "MemoryMaxTokens" not in item
+    table.put_item.assert_called_once_with(Item=item)
@@ -0,0 +1,52 @@
+import threading
+import time
+from aws_lambda_powertools.utilities.batch import EventType
+from genai_core.utils.batch import ConcurrentBatchProcessor
+
+
+def _get_records(count):
+    return [
+        {
+            "messageId": f"message{idx}",
+            "body": str(idx),
+            "eventSource": "aws:sqs",
+            "attributes": {},
+            "messageAttributes": {},
+        }
+        for idx in range(count)
+    ]
+
+
+def test_concurrent_batch_processor():
+    lock = threading.Lock()
+    running = {"current": 0, "max": 0}
+
+    def record_handler(record):
+        with lock:
+            running["current"] += 1
+            running["max"] = max(running["max"], running["current"])
+        time.sleep(0.05)
+        with lock:
+            running["current"] -= 1
+        if record.body == "3":
+            raise ValueError("Failed")
+        return record.body
+
+    processor = ConcurrentBatchProcessor(event_type=EventType.SQS, max_concurrency=3)
+    with processor(records=_get_records(7), handler=record_handler):
+        results = processor.process()
+
+    assert running["max"] == 3
+    assert [result[0] for result in results] == [
+        "success",
+        "success",
+        "success",
+        "fail",
+        "success",
+        "success",
+        "success",
+    ]
+    assert results[0][1] == "0"
+    assert processor.response() == {
+        "batchItemFailures": [{"itemIdentifier": "message3"}]
+    }
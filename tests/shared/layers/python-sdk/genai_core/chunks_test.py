@@ -0,0 +1,184 @@
+import json
+import genai_core.chunks
+from genai_core.chunks import add_chunks, _diff_chunks, _get_chunk_hash
+
+workspace = {
+    "workspace_id": "workspace_id",
+    "engine": "aurora",
+    "embeddings_model_provider": "bedrock",
+    "embeddings_model_name": "model",
+}
+document = {
+    "document_id": "document_id",
+    "document_type": "file",
+    "document_sub_type": None,
+    "path": "path",
+    "title": "title",
+}
+
+
+def _mock_add_chunks(mocker, manifest):
+    mocker.patch("genai_core.embeddings.get_embeddings_model")
+    embeddings = mocker.patch(
+        "genai_core.embeddings.generate_embeddings",
+        side_effect=lambda _, chunks, __: [[0.1] for _ in chunks],
+    )
+    mocker.patch("genai_core.chunks.get_chunks_manifest", return_value=manifest)
+    store_manifest = mocker.patch("genai_core.chunks.store_chunks_manifest")
+    mocker.patch("genai_core.chunks.store_chunks_on_s3")
+    mocker.patch("genai_core.chunks._delete_chunks_from_s3")
+    add_aurora = mocker.patch(
+        "genai_core.aurora.chunks.add_chunks_aurora",
+        side_effect=lambda **kwargs: {
+            "removed_vectors": 0,
+            "added_vectors": len(kwargs["chunk_ids"]),
+        },
+    )
+    delete_aurora = mocker.patch("genai_core.aurora.chunks.delete_chunks_aurora")
+    set_vectors = mocker.patch("genai_core.documents.set_document_vectors")
+
+    return embeddings, store_manifest, add_aurora, delete_aurora, set_vectors
+
+
+def test_add_chunks_incremental(mocker):
+    manifest = [
+        {"hash": _get_chunk_hash("a", None), "chunk_id": "id-a"},
+        {"hash": _get_chunk_hash("b", None), "chunk_id": "id-b"},
+    ]
+    embeddings, store_manifest, add_aurora, delete_aurora, set_vectors = (
+        _mock_add_chunks(mocker, manifest)
+    )
+
+    add_chunks(
+        replace=True,
+        workspace=workspace,
+        document=document,
+        document_sub_id=None,
+        chunks=["a", "c"],
+        chunk_complements=None,
+        incremental=True,
+    )
+
+    assert embeddings.call_args[0][1] == ["c"]
+    assert add_aurora.call_args.kwargs["chunks"] == ["c"]
+    assert add_aurora.call_args.kwargs["replace"] is False
+    delete_aurora.assert_called_once_with(
+        workspace_id="workspace_id", chunk_ids=["id-b"]
+    )
+    set_vectors.assert_called_once_with("workspace_id", "document_id", 2, replace=True)
+    entries = store_manifest.call_args[0][3]
+    assert [entry["hash"] for entry in entries] == [
+        _get_chunk_hash("a", None),
+        _get_chunk_hash("c", None),
+    ]
+
+
+def test_add_chunks_incremental_without_manifest(mocker):
+    embeddings, store_manifest, add_aurora, delete_aurora, set_vectors = (
+        _mock_add_chunks(mocker, None)
+    )
+
+    add_chunks(
+        replace=True,
+        workspace=workspace,
+        document=document,
+        document_sub_id=None,
+        chunks=["a", "b"],
+        chunk_complements=None,
+        incremental=True,
+    )
+
+    assert embeddings.call_args[0][1] == ["a", "b"]
+    assert add_aurora.call_args.kwargs["replace"] is True
+    delete_aurora.assert_not_called()
+    set_vectors.assert_called_once_with("workspace_id", "document_id", 2, replace=True)
+    assert len(store_manifest.call_args[0][3]) == 2
+
+
+def test_add_chunks_incremental_unchanged(mocker):
+    manifest = [{"hash": _get_chunk_hash("a", None), "chunk_id": "id-a"}]
+    embeddings, _, add_aurora, delete_aurora, set_vectors = _mock_add_chunks(
+        mocker, manifest
+    )
+
+    add_chunks(
+        replace=False,
+        workspace=workspace,
+        document=document,
+        document_sub_id="sub_id",
+        chunks=["a"],
+        chunk_complements=None,
+        incremental=True,
+    )
+
+    embeddings.assert_not_called()
+    delete_aurora.assert_not_called()
+    assert add_aurora.call_args.kwargs["chunks"] == []
+    set_vectors.assert_called_once_with("workspace_id", "document_id", 1, replace=False)
+
+
+def test_diff_chunks_duplicates():
+    hash_a = _get_chunk_hash("a", None)
+    manifest = [
+        {"hash": hash_a, "chunk_id": "1"},
+        {"hash": hash_a, "chunk_id": "2"},
+    ]
+
+    kept, new_indexes, removed = _diff_chunks(manifest, [hash_a, hash_a, hash_a])
+
+    assert [entry["chunk_id"] for entry in kept] == ["1", "2"]
+    assert new_indexes == [2]
+    assert removed == []
+
+    kept, new_indexes, removed = _diff_chunks(manifest, [hash_a])
+    assert [entry["chunk_id"] for entry in kept] == ["1"]
+    assert removed == ["2"]
+
+
+def test_chunk_hash_includes_complement():
+    assert genai_core.chunks._get_chunk_hash(
+        "a", None
+    ) != genai_core.chunks._get_chunk_hash("a", "b")
+
+
+def test_store_chunks_on_s3_uploads_every_chunk(mocker):
+    client = mocker.patch("genai_core.chunks.s3_client")
+
+    genai_core.chunks.store_chunks_on_s3(
+        "workspace_id", "document_id", None, ["1", "2", "3"], ["a", "b", "c"]
+    )
+
+    keys = sorted(call.kwargs["Key"] for call in client.put_object.call_args_list)
+    assert keys == [
+        "workspace_id/document_id/chunks/1.txt",
+        "workspace_id/document_id/chunks/2.txt",
+        "workspace_id/document_id/chunks/3.txt",
+    ]
+
+
+def test_store_packed_chunks_on_s3_offsets(mocker):
+    client = mocker.patch("genai_core.chunks.s3_client")
+
+    genai_core.chunks.store_packed_chunks_on_s3(
+        "workspace_id", "document_id", "sub_id", ["1", "2"], ["a", "é"]
+    )
+
+    bodies = {
+        call.kwargs["Key"]: call.kwargs["Body"]
+        for call in client.put_object.call_args_list
+    }
+    packed = bodies["workspace_id/document_id/sub_id/chunks/chunks.jsonl"]
+    index = json.loads(
+        bodies["workspace_id/document_id/sub_id/chunks/chunks.index.json"]
+    )
+
+    for chunk_id, content in [("1", "a"), ("2", "é")]:
+        offset, length = index[chunk_id]
+        line = json.loads(packed[offset : offset + length].decode("utf-8"))
+        assert line == {"chunk_id": chunk_id, "content": content}
+
+
+def test_merge_chunk_ids_keeps_chunk_order():
+    assert genai_core.chunks._merge_chunk_ids(
+        4, [{"chunk_id": "k1"}, {"chunk_id": "k2"}], [1, 3], ["n1", "n2"]
+    ) == ["k1", "n1", "k2", "n2"]
@@ -0,0 +1,52 @@
+import genai_core.clients
+import genai_core.parameters
+
+
+def _setup(mocker, config):
+    mocker.patch.object(genai_core.clients, "_bedrock_clients", {})
+    mocker.patch("genai_core.parameters.get_config", return_value=config)
+    create_client = mocker.patch(
+        "genai_core.clients._create_bedrock_client",
+        side_effect=lambda service_name: mocker.Mock(name=service_name),
+    )
+
+    return create_client
+
+
+def test_bedrock_clients_are_cached_by_config_version(mocker):
+    config = {"bedrock": {"region": "us-east-1"}, "genaieh": {"enabled": False}}
+    create_client = _setup(mocker, config)
+
+    runtime = genai_core.clients._get_cached_bedrock_client("bedrock-runtime")
+    bedrock = genai_core.clients._get_cached_bedrock_client("bedrock")
+
+    assert genai_core.clients._get_cached_bedrock_client("bedrock-runtime") is runtime
+    assert runtime is not bedrock
+    assert create_client.call_count == 2
+
+    # A new config creates new clients and drops the previous ones
+    config["bedrock"] = {"region": "us-west-2"}
+    updated = genai_core.clients._get_cached_bedrock_client("bedrock-runtime")
+    assert updated is not runtime
+    assert list(genai_core.clients._bedrock_clients) == [
+        ("bedrock-runtime", genai_core.clients._get_bedrock_config_version())
+    ]
+
+
+def test_genaieh_client_requests_a_valid_token(mocker):
+    client = mocker.Mock()
+    genaieh_client = mocker.patch(
+        "genai_core.model_providers.genaieh.genaieh_client.GenAIEHGatewayClient"
+    ).return_value
+    genaieh_client.get_access_token.side_effect = ["token-1", "token-2"]
+
+    genai_core.clients._setup_token_handlers(client, {})
+    add_token = client.meta.events.register.call_args_list[0].args[1]
+    first, second = mocker.MagicMock(), mocker.MagicMock()
+    first.headers, second.headers = {}, {}
+    add_token(first)
+    add_token(second)
+
+    # The client is reused, the token is not kept past its expiry
+    assert first.headers["Authorization-Token"] == "Bearer token-1"
+    assert second.headers["Authorization-Token"] == "Bearer token-2"
@@ -0,0 +1,110 @@
+import botocore
+import pytest
+
+
+class LocalDynamoDBClient:
+    """In memory stand-in for the DynamoDB client calls used on the
+    documents table. Items are stored with their attribute value types.
+
+    The first batch get request leaves part of its keys unprocessed, like a
+    throttled table does, so retries are exercised.
+    """
+
+    def __init__(self, status_index_name: str, page_size: int = 2):
+        self.status_index_name = status_index_name
+        self.page_size = page_size
+        self.items = {}
+        self.calls = {"query": 0, "batch_get_item": 0, "put_item": 0}
+
+    @staticmethod
+    def _key(item: dict):
+        return (item["workspace_id"]["S"], item["document_id"]["S"])
+
+    def put(self, item: dict):
+        self.items[self._key(item)] = item
+
+    def query(self, IndexName, ExpressionAttributeValues, Limit=None, **kwargs):
+        self.calls["query"] += 1
+        assert IndexName == self.status_index_name
+
+        status = ExpressionAttributeValues[":status"]["S"]
+        document_type = ExpressionAttributeValues[":document_type"]["S"]
+        matches = sorted(
+            key
+            for key, item in self.items.items()
+            if item["status"]["S"] == status
+            and item["document_type"]["S"] == document_type
+        )
+
+        start_key = kwargs.get("ExclusiveStartKey")
+        if start_key:
+            matches = [key for key in matches if key > self._key(start_key)]
+
+        page_size = min(Limit or self.page_size, self.page_size)
+        page = matches[:page_size]
+        response = {
+            "Items": [self.items[key] for key in page],
+            "Count": len(page),
+        }
+        if len(matches) > page_size:
+            last = self.items[page[-1]]
+            response["LastEvaluatedKey"] = {
+                "workspace_id": last["workspace_id"],
+                "document_id": last["document_id"],
+            }
+
+        return response
+
+    def batch_get_item(self, RequestItems):
+        self.calls["batch_get_item"] += 1
+        responses = {}
+        unprocessed = {}
+        for table_name, request in RequestItems.items():
+            keys = request["Keys"]
+            assert len(keys) <= 100
+            if self.calls["batch_get_item"] == 1 and len(keys) > 1:
+                unprocessed[table_name] = {**request, "Keys": keys[1:]}
+                keys = keys[:1]
+
+            responses[table_name] = [
+                {"document_id": self.items[self._key(key)]["document_id"]}
+                for key in keys
+                if self._key(key) in self.items
+            ]
+
+        return {"Responses": responses, "UnprocessedKeys": unprocessed}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues, **kwargs):
+        # Supports the "SET a = :a ADD b :b" expressions of the documents
+        item = self.items[self._key(Key)]
+        set_clause, add_clause = UpdateExpression.split(" ADD ")
+        for assignment in set_clause.removeprefix("SET ").split(","):
+            name, value = [part.strip() for part in assignment.split("=")]
+            item[name] = ExpressionAttributeValues[value]
+        name, value = add_clause.split()
+        current = int(item.get(name, {"N": "0"})["N"])
+        added = int(ExpressionAttributeValues[value]["N"])
+        item[name] = {"N": str(current + added)}
+
+        return {"Attributes": {name: item[name]}}
+
+    def put_item(self, TableName, Item, ConditionExpression=None):
+        self.calls["put_item"] += 1
+        if ConditionExpression == "attribute_not_exists(document_id)":
+            if self._key(Item) in self.items:
+                raise botocore.exceptions.ClientError(
+                    {"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem"
+                )
+
+        self.put(Item)
+
+
+@pytest.fixture
+def local_dynamodb(mocker):
+    import genai_core.documents
+
+    client = LocalDynamoDBClient(genai_core.documents.DOCUMENTS_BY_STATUS_INDEX)
+    mocker.patch("genai_core.documents.dynamodb_client", client)
+    mocker.patch("genai_core.documents.time.sleep")
+
+    return client
@@ -1,28 +1,33 @@
-from genai_core.documents import batch_crawl_websites
+from genai_core.documents import (
+    batch_crawl_websites,
+    check_rss_feed_for_posts,
+    ingest_rss_feeds,
+    _get_hash_id_from_path,
+    _count_posts,
+)
 
 
 def test_batch_crawl_websites(mocker):
     mocker.patch(
         "genai_core.documents._get_batch_pending_posts",
-        return_value={
-            "Count": 1,
-            "Items": [
-                {
-                    "workspace_id": {"S": "123"},
-                    "document_id": {"S": "123"},
-                    "crawler_properties": {
-                        "M": {
-                            "content_types": {"L": [{"S": "text/html"}, {"S": "pdf"}]},
-                            "follow_links": {"BOOL": False},
-                            "limit": {"N": "1"},
-                        }
-                    },
-                    "path": {"S": "https://example"},
-                    "rss_feed_id": {"S": "123"},
-                }
-            ],
-        },
+        return_value=[
+            {
+                "workspace_id": {"S": "123"},
+                "document_id": {"S": "123"},
+                "crawler_properties": {
+                    "M": {
+                        "content_types": {"L": [{"S": "text/html"}, {"S": "pdf"}]},
+                        "follow_links": {"BOOL": False},
+                        "limit": {"N": "1"},
+                    }
+                },
+                "path": {"S": "https://example"},
+                "rss_feed_id": {"S": "123"},
+            }
+        ],
     )
+    mocker.patch("genai_core.documents._count_running_crawls", return_value=0)
+    mocker.patch("genai_core.documents._count_posts", return_value=0)
     mock = mocker.patch("genai_core.documents.create_document")
     mocker.patch("genai_core.documents.set_status")
     mocker.patch("genai_core.documents.update_subscription_timestamp")
@@ -43,19 +48,18 @@ def test_batch_crawl_websites(mocker):
 def test_batch_crawl_websites_not_set(mocker):
     mocker.patch(
         "genai_core.documents._get_batch_pending_posts",
-        return_value={
-            "Count": 1,
-            "Items": [
-                {
-                    "workspace_id": {"S": "123"},
-                    "document_id": {"S": "123"},
-                    "crawler_properties": {"M": {}},
-                    "path": {"S": "https://example"},
-                    "rss_feed_id": {"S": "123"},
-                }
-            ],
-        },
+        return_value=[
+            {
+                "workspace_id": {"S": "123"},
+                "document_id": {"S": "123"},
+                "crawler_properties": {"M": {}},
+                "path": {"S": "https://example"},
+                "rss_feed_id": {"S": "123"},
+            }
+        ],
     )
+    mocker.patch("genai_core.documents._count_running_crawls", return_value=0)
+    mocker.patch("genai_core.documents._count_posts", return_value=0)
     mock = mocker.patch("genai_core.documents.create_document")
     mocker.patch("genai_core.documents.set_status")
     mocker.patch("genai_core.documents.update_subscription_timestamp")
@@ -71,3 +75,203 @@ def test_batch_crawl_websites_not_set(mocker):
             "content_types": ["text/html"],
         },
     )
+
+
+def test_check_rss_feed_for_posts(mocker, local_dynamodb):
+    links = [f"https://example.com/post-{idx}" for idx in range(30)]
+    # post-0 was already found by a previous poll and crawled since
+    local_dynamodb.put(
+        {
+            "workspace_id": {"S": "workspace"},
+            "document_id": {"S": _get_hash_id_from_path(links[0])},
+            "document_type": {"S": "rsspost"},
+            "status": {"S": "processed"},
+        }
+    )
+    feed = mocker.MagicMock()
+    feed.entries = [{"link": link, "title": link} for link in links + links[:2]]
+    mocker.patch("feedparser.parse", return_value=feed)
+    mocker.patch(
+        "genai_core.workspaces.get_workspace",
+        return_value={"workspace_id": "workspace"},
+    )
+    mocker.patch(
+        "genai_core.documents.get_document",
+        return_value={
+            "path": "https://example.com/feed",
+            "crawler_properties": {"follow_links": False, "limit": 1},
+        },
+    )
+    update_mock = mocker.patch("genai_core.documents.update_subscription_timestamp")
+
+    check_rss_feed_for_posts("workspace", "feed")
+
+    assert len(local_dynamodb.items) == 30
+    existing = local_dynamodb.items[("workspace", _get_hash_id_from_path(links[0]))]
+    assert existing["status"] == {"S": "processed"}
+    post = local_dynamodb.items[("workspace", _get_hash_id_from_path(links[1]))]
+    assert post["status"] == {"S": "pending"}
+    assert post["rss_feed_id"] == {"S": "feed"}
+    assert post["document_sub_type"] == {"NULL": True}
+    assert post["crawler_properties"]["M"]["limit"] == {"N": "1"}
+    # 30 unique posts read in one request (+1 retry), only the 29 new ones put
+    assert local_dynamodb.calls["batch_get_item"] == 2
+    assert local_dynamodb.calls["put_item"] == 29
+    update_mock.assert_called_once_with("workspace", "feed")
+
+
+def test_check_rss_feed_for_posts_keeps_posts_created_since_read(
+    mocker, local_dynamodb
+):
+    link = "https://example.com/post"
+    feed = mocker.MagicMock()
+    feed.entries = [{"link": link, "title": link}]
+    mocker.patch("feedparser.parse", return_value=feed)
+    mocker.patch(
+        "genai_core.workspaces.get_workspace",
+        return_value={"workspace_id": "workspace"},
+    )
+    mocker.patch(
+        "genai_core.documents.get_document",
+        return_value={"path": "https://example.com/feed"},
+    )
+    mocker.patch("genai_core.documents.update_subscription_timestamp")
+
+    def get_existing_document_ids(workspace_id, document_ids):
+        # An overlapping poll creates and crawls the post after it is read
+        local_dynamodb.put(
+            {
+                "workspace_id": {"S": "workspace"},
+                "document_id": {"S": _get_hash_id_from_path(link)},
+                "status": {"S": "processed"},
+            }
+        )
+        return set()
+
+    mocker.patch(
+        "genai_core.documents._get_existing_document_ids",
+        side_effect=get_existing_document_ids,
+    )
+
+    check_rss_feed_for_posts("workspace", "feed")
+
+    post = local_dynamodb.items[("workspace", _get_hash_id_from_path(link))]
+    assert post["status"] == {"S": "processed"}
+
+
+def test_ingest_rss_feeds(mocker, local_dynamodb):
+    for idx in range(5):
+        local_dynamodb.put(
+            {
+                "workspace_id": {"S": "workspace"},
+                "document_id": {"S": f"feed-{idx}"},
+                "document_type": {"S": "rssfeed"},
+                "status": {"S": "enabled" if idx != 2 else "disabled"},
+            }
+        )
+    trigger_mock = mocker.patch("genai_core.documents._trigger_rss_feed_ingestor")
+
+    assert ingest_rss_feeds() == 4
+
+    # The status index is read in pages of 2 items
+    assert local_dynamodb.calls["query"] == 2
+    assert sorted(call.args for call in trigger_mock.call_args_list) == [
+        ("workspace", "feed-0"),
+        ("workspace", "feed-1"),
+        ("workspace", "feed-3"),
+        ("workspace", "feed-4"),
+    ]
+
+
+def test_batch_crawl_websites_scheduler(mocker, local_dynamodb):
+    for idx in range(30):
+        local_dynamodb.put(
+            {
+                "workspace_id": {"S": "workspace"},
+                "document_id": {"S": f"post-{idx:02}"},
+                "rss_feed_id": {"S": "feed"},
+                "document_type": {"S": "rsspost"},
+                "status": {"S": "pending"},
+                "path": {"S": f"https://example.com/post-{idx}"},
+                "crawler_properties": {"NULL": True},
+            }
+        )
+
+    def create_document(workspace_id, document_type, path, crawler_properties):
+        if path == "https://example.com/post-3":
+            raise Exception("Workflow error")
+
+    def set_status(workspace_id, document_id, status):
+        local_dynamodb.items[(workspace_id, document_id)]["status"] = {"S": status}
+
+    create_mock = mocker.patch(
+        "genai_core.documents.create_document", side_effect=create_document
+    )
+    mocker.patch("genai_core.documents.set_status", side_effect=set_status)
+    mocker.patch("genai_core.documents.update_subscription_timestamp")
+    mocker.patch("genai_core.documents.RSS_CRAWL_TARGET_RATE_PER_MINUTE", 4)
+    mocker.patch("genai_core.documents.RSS_CRAWL_SCHEDULE_MINUTES", 5)
+    mocker.patch("genai_core.documents.RSS_CRAWL_MAX_RUNNING_CRAWLS", 15)
+    mocker.patch("genai_core.documents.RSS_CRAWL_MAX_ATTEMPTS", 2)
+    mocker.patch("genai_core.documents._count_running_crawls", return_value=3)
+
+    report = batch_crawl_websites()
+
+    # 20 posts for 5 minutes at 4 per minute, limited to 12 by the
+    # 3 crawls still running. The status index is read in pages of 2.
+    assert create_mock.call_count == 12
+    assert report == {
+        "running_crawls": 3,
+        "batch_size": 12,
+        "dispatched": 11,
+        "failed": 1,
+        "backlog": 19,
+        "failed_posts": 0,
+        "drain_rate_per_minute": 2.2,
+        "estimated_minutes_to_drain": 9,
+    }
+    failed_post = local_dynamodb.items[("workspace", "post-03")]
+    assert failed_post["status"] == {"S": "pending"}
+    assert failed_post["crawl_attempts"] == {"N": "1"}
+
+    # The second failure sets it to error, it leaves the backlog
+    report = batch_crawl_websites()
+
+    assert failed_post["status"] == {"S": "error"}
+    assert report["dispatched"] == 11
+    assert report["backlog"] == 7
+    assert report["failed_posts"] == 1
+
+
+def test_batch_crawl_websites_workflow_busy(mocker):
+    mocker.patch("genai_core.documents.RSS_CRAWL_MAX_RUNNING_CRAWLS", 15)
+    mocker.patch("genai_core.documents._count_running_crawls", return_value=15)
+    mocker.patch(
+        "genai_core.documents._count_posts",
+        side_effect=lambda status, limit: 42 if status == "pending" else 0,
+    )
+    get_posts_mock = mocker.patch("genai_core.documents._get_batch_pending_posts")
+
+    report = batch_crawl_websites()
+
+    get_posts_mock.assert_not_called()
+    assert report["dispatched"] == 0
+    assert report["backlog"] == 42
+    assert report["estimated_minutes_to_drain"] is None
+
+
+def test_count_posts_stops_at_the_limit(local_dynamodb):
+    for idx in range(7):
+        local_dynamodb.put(
+            {
+                "workspace_id": {"S": "workspace"},
+                "document_id": {"S": f"post-{idx}"},
+                "status": {"S": "pending"},
+                "document_type": {"S": "rsspost"},
+            }
+        )
+
+    assert _count_posts("pending", 5) == 5
+    assert local_dynamodb.calls["query"] == 3
+    assert _count_posts("pending", 100) == 7
+    assert _count_posts("error", 100) == 0
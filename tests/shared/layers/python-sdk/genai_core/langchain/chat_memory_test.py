@@ -0,0 +1,150 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from genai_core.langchain.chat_memory import (
+    WindowedChatMessageHistory,
+    get_last_turns,
+    summarize_messages,
+    trim_to_token_budget,
+)
+from genai_core.langchain.chat_message_history import DynamoDBChatMessageHistory
+from genai_core.types import ChatMemoryStrategy
+
+
+def _get_stored_history(turns):
+    history = []
+    for idx in range(turns):
+        history.append(
+            {"type": "human", "data": {"type": "human", "content": f"Question {idx}"}}
+        )
+        history.append(
+            {"type": "ai", "data": {"type": "ai", "content": f"Answer {idx}"}}
+        )
+    return history
+
+
+def _get_history(mocker, turns=6, item={}):
+    chat_history = DynamoDBChatMessageHistory("table", "session", "user")
+    chat_history.table = mocker.MagicMock()
+    chat_history.table.get_item.return_value = {
+        "Item": {"History": _get_stored_history(turns), **item}
+    }
+
+    return chat_history
+
+
+def test_get_last_turns_starts_with_a_question():
+    messages = [
+        AIMessage("Welcome"),
+        HumanMessage("Q1"),
+        AIMessage("A1"),
+        HumanMessage("Q2"),
+        AIMessage("A2"),
+    ]
+
+    assert get_last_turns(messages, 1) == messages[3:]
+    assert get_last_turns(messages, 5) == messages[1:]
+    assert get_last_turns(messages, 0) == []
+
+
+def test_trim_to_token_budget_keeps_whole_turns():
+    messages = [
+        HumanMessage("a" * 400),
+        AIMessage("b" * 400),
+        HumanMessage("c" * 40),
+        AIMessage("d" * 40),
+    ]
+
+    # The budget ends in the middle of the first turn
+    assert trim_to_token_budget(messages, 150) == messages[2:]
+    assert trim_to_token_budget(messages, 1000) == messages
+
+
+def test_window_strategy_keeps_the_files_of_the_turn(mocker):
+    chat_history = _get_history(mocker)
+    image = HumanMessage(content=[{"type": "image", "image": {}}])
+    chat_history.add_temporary_message(image)
+    memory = WindowedChatMessageHistory(
+        chat_history, ChatMemoryStrategy.WINDOW, window_size=2
+    )
+
+    messages = memory.messages
+
+    assert [m.content for m in messages[:-1]] == [
+        "Question 4",
+        "Answer 4",
+        "Question 5",
+        "Answer 5",
+    ]
+    assert messages[-1] == image
+
+
+def test_window_strategy_writes_to_the_history(mocker):
+    chat_history = _get_history(mocker)
+    memory = WindowedChatMessageHistory(chat_history, ChatMemoryStrategy.WINDOW)
+
+    memory.add_messages([HumanMessage("Question 6"), AIMessage("Answer 6")])
+
+    assert chat_history.table.update_item.call_count == 2
+
+
+def test_summary_strategy_returns_the_summary_and_the_recent_turns(mocker):
+    chat_history = _get_history(
+        mocker, item={"Summary": "Earlier questions", "SummaryMessageCount": 8}
+    )
+    memory = WindowedChatMessageHistory(
+        chat_history, ChatMemoryStrategy.SUMMARY, window_size=2
+    )
+
+    messages = memory.messages
+
+    assert isinstance(messages[0], SystemMessage)
+    assert "Earlier questions" in messages[0].content
+    assert [m.content for m in messages[1:]] == [
+        "Question 4",
+        "Answer 4",
+        "Question 5",
+        "Answer 5",
+    ]
+
+
+def test_get_summary_update_returns_the_turns_out_of_the_window(mocker):
+    chat_history = _get_history(
+        mocker, item={"Summary": "Earlier questions", "SummaryMessageCount": 4}
+    )
+    memory = WindowedChatMessageHistory(
+        chat_history, ChatMemoryStrategy.SUMMARY, window_size=2
+    )
+
+    summary, messages, message_count = memory.get_summary_update()
+
+    assert summary == "Earlier questions"
+    assert [m.content for m in messages] == [
+        "Question 2",
+        "Answer 2",
+        "Question 3",
+        "Answer 3",
+    ]
+    assert message_count == 8
+    assert chat_history.table.get_item.call_count == 1
+
+
+def test_get_summary_update_when_up_to_date(mocker):
+    chat_history = _get_history(mocker, turns=2)
+    memory = WindowedChatMessageHistory(
+        chat_history, ChatMemoryStrategy.SUMMARY, window_size=2
+    )
+
+    assert memory.get_summary_update() is None
+
+
+def test_summarize_messages(mocker):
+    llm = mocker.Mock()
+    llm.invoke.return_value = AIMessage(content=[{"type": "text", "text": " New "}])
+
+    summary = summarize_messages(
+        llm, "Previous", [HumanMessage("Question"), AIMessage("Answer")]
+    )
+
+    assert summary == "New"
+    prompt = llm.invoke.call_args.args[0]
+    assert "Previous" in prompt
+    assert "Human: Question\nAI: Answer" in prompt
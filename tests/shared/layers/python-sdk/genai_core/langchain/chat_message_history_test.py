@@ -0,0 +1,280 @@
+from decimal import Decimal
+from botocore.exceptions import ClientError
+from langchain_core.messages import AIMessage, HumanMessage
+from genai_core.langchain.chat_message_history import DynamoDBChatMessageHistory
+
+STORED_HISTORY = [
+    {"type": "human", "data": {"type": "human", "content": "Hello"}},
+    {"type": "ai", "data": {"type": "ai", "content": "Hi"}},
+]
+
+
+def _get_history(mocker, history=STORED_HISTORY):
+    chat_history = DynamoDBChatMessageHistory("table", "session", "user")
+    chat_history.table = mocker.MagicMock()
+    chat_history.table.get_item.return_value = {
+        "Item": {"StartTime": "2024-01-01T00:00:00", "History": list(history)}
+    }
+
+    return chat_history
+
+
+def test_add_message_appends_without_reading(mocker):
+    chat_history = _get_history(mocker)
+
+    chat_history.add_message(HumanMessage("How are you?"))
+
+    chat_history.table.get_item.assert_not_called()
+    kwargs = chat_history.table.update_item.call_args.kwargs
+    assert kwargs["Key"] == {"SessionId": "session", "UserId": "user"}
+    assert "list_append(if_not_exists(History, :empty), :messages)" in (
+        kwargs["UpdateExpression"]
+    )
+    assert kwargs["ExpressionAttributeValues"][":messages"][0]["data"]["content"] == (
+        "How are you?"
+    )
+
+
+def test_add_message_stores_the_title(mocker):
+    chat_history = _get_history(mocker, history=[])
+    assert chat_history.messages == []
+
+    chat_history.add_message(HumanMessage(content=[{"type": "text", "text": "Hi"}]))
+
+    kwargs = chat_history.table.update_item.call_args.kwargs
+    assert "Title = if_not_exists(Title, :title)" in kwargs["UpdateExpression"]
+    assert kwargs["ExpressionAttributeValues"][":title"] == "Hi"
+
+    # Once the session is read, the title is its first message
+    chat_history.table.get_item.return_value = {"Item": {"History": STORED_HISTORY}}
+    assert len(chat_history.messages) == 2
+    chat_history.add_message(AIMessage("Fine"))
+    kwargs = chat_history.table.update_item.call_args.kwargs
+    assert kwargs["ExpressionAttributeValues"][":title"] == "Hello"
+
+
+def test_add_message_without_known_title(mocker):
+    chat_history = _get_history(mocker)
+
+    chat_history.add_message(HumanMessage("How are you?"))
+
+    kwargs = chat_history.table.update_item.call_args.kwargs
+    assert "Title" not in kwargs["UpdateExpression"]
+    assert ":title" not in kwargs["ExpressionAttributeValues"]
+
+
+def test_add_metadata_updates_last_message(mocker):
+    chat_history = _get_history(mocker)
+    assert len(chat_history.messages) == 2
+
+    chat_history.add_message(AIMessage("Fine"))
+    chat_history.add_metadata({"score": 0.5})
+
+    assert chat_history.table.get_item.call_count == 1
+    kwargs = chat_history.table.update_item.call_args.kwargs
+    assert kwargs["UpdateExpression"] == "SET History[2].#data.#field = :value"
+    assert kwargs["ConditionExpression"] == "size(History) = :messageCount"
+    assert kwargs["ExpressionAttributeNames"] == {
+        "#data": "data",
+        "#field": "additional_kwargs",
+    }
+    assert kwargs["ExpressionAttributeValues"] == {
+        ":value": {"score": Decimal("0.5")},
+        ":messageCount": 3,
+    }
+
+
+def test_add_metadata_reads_the_history_size_once(mocker):
+    chat_history = _get_history(mocker)
+
+    chat_history.add_metadata({"provider": "test"})
+    chat_history.replace_last_message("Blocked")
+
+    assert chat_history.table.get_item.call_count == 1
+    kwargs = chat_history.table.update_item.call_args.kwargs
+    assert kwargs["UpdateExpression"] == "SET History[1].#data.#field = :value"
+    assert kwargs["ExpressionAttributeNames"]["#field"] == "content"
+    assert kwargs["ExpressionAttributeValues"][":value"] == "Blocked"
+
+
+def test_add_metadata_retries_when_history_changed(mocker):
+    chat_history = _get_history(mocker)
+    chat_history.message_count = 1
+    chat_history.table.update_item.side_effect = [
+        ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+        ),
+        {},
+    ]
+
+    chat_history.add_metadata({"provider": "test"})
+
+    assert chat_history.table.get_item.call_count == 1
+    assert chat_history.table.update_item.call_count == 2
+    kwargs = chat_history.table.update_item.call_args.kwargs
+    assert kwargs["UpdateExpression"] == "SET History[1].#data.#field = :value"
+
+
+def test_add_metadata_empty_history(mocker):
+    chat_history = _get_history(mocker, history=[])
+
+    chat_history.add_metadata({"provider": "test"})
+
+    chat_history.table.update_item.assert_not_called()
+
+
+def test_write_batch_stores_the_turn_with_one_write(mocker):
+    chat_history = _get_history(mocker)
+
+    with chat_history.write_batch():
+        chat_history.add_user_message("How are you?")
+        chat_history.add_metadata({"provider": "test"})
+        with chat_history.write_batch():
+            chat_history.add_ai_message("Fine")
+        chat_history.add_metadata({"provider": "test", "score": 0.5})
+        chat_history.table.update_item.assert_not_called()
+        assert [m.content for m in chat_history.messages] == [
+            "Hello",
+            "Hi",
+            "How are you?",
+            "Fine",
+        ]
+
+    chat_history.table.update_item.assert_called_once()
+    messages = chat_history.table.update_item.call_args.kwargs[
+        "ExpressionAttributeValues"
+    ][":messages"]
+    assert [m["data"]["content"] for m in messages] == ["How are you?", "Fine"]
+    assert messages[0]["data"]["additional_kwargs"] == {"provider": "test"}
+    assert messages[1]["data"]["additional_kwargs"] == {
+        "provider": "test",
+        "score": Decimal("0.5"),
+    }
+    assert chat_history.message_count == 4
+
+
+def test_write_batch_is_conditioned_on_the_history_size(mocker):
+    chat_history = _get_history(mocker)
+    # Another turn is stored between the first read and the write
+    chat_history.table.get_item.side_effect = [
+        {"Item": {"History": STORED_HISTORY}},
+        {"Item": {"History": STORED_HISTORY * 2}},
+    ]
+    chat_history.table.update_item.side_effect = [
+        ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+        ),
+        {},
+    ]
+
+    # The size is not known, it is read before the write
+    with chat_history.write_batch():
+        chat_history.add_user_message("How are you?")
+        chat_history.add_ai_message("Fine")
+
+    first, second = chat_history.table.update_item.call_args_list
+    assert first.kwargs["ConditionExpression"] == "size(History) = :messageCount"
+    assert first.kwargs["ExpressionAttributeValues"][":messageCount"] == 2
+    # The turn is appended after the other one
+    assert chat_history.table.get_item.call_count == 2
+    assert second.kwargs["ExpressionAttributeValues"][":messageCount"] == 4
+    assert chat_history.message_count == 6
+    # The title is known once the history is read
+    assert second.kwargs["ExpressionAttributeValues"][":title"] == "Hello"
+
+
+def test_write_batch_new_session(mocker):
+    chat_history = _get_history(mocker, history=[])
+    chat_history.table.get_item.return_value = {}
+
+    with chat_history.write_batch():
+        chat_history.add_user_message("Hello")
+
+    kwargs = chat_history.table.update_item.call_args.kwargs
+    assert kwargs["ConditionExpression"] == (
+        "attribute_not_exists(History) OR size(History) = :messageCount"
+    )
+    assert kwargs["ExpressionAttributeValues"][":messageCount"] == 0
+    assert kwargs["ExpressionAttributeValues"][":title"] == "Hello"
+
+
+def test_write_batch_replace_last_message(mocker):
+    chat_history = _get_history(mocker)
+
+    with chat_history.write_batch():
+        chat_history.add_ai_message("Blocked content")
+        chat_history.replace_last_message("Sorry, I cannot answer")
+
+    messages = chat_history.table.update_item.call_args.kwargs[
+        "ExpressionAttributeValues"
+    ][":messages"]
+    assert [m["data"]["content"] for m in messages] == ["Sorry, I cannot answer"]
+
+
+def test_write_batch_without_messages(mocker):
+    chat_history = _get_history(mocker)
+
+    with chat_history.write_batch():
+        pass
+
+    chat_history.table.update_item.assert_not_called()
+
+
+def test_messages_are_read_once_until_a_write(mocker):
+    chat_history = _get_history(mocker)
+
+    for _ in range(3):
+        assert [m.content for m in chat_history.messages] == ["Hello", "Hi"]
+    assert chat_history.table.get_item.call_count == 1
+    assert chat_history.table.get_item.call_args.kwargs["ConsistentRead"] is False
+
+    chat_history.add_user_message("How are you?")
+    chat_history.messages
+
+    assert chat_history.table.get_item.call_count == 2
+
+
+def test_messages_consistent_read(mocker):
+    chat_history = _get_history(mocker)
+    chat_history.consistent_read = True
+
+    chat_history.messages
+    chat_history.invalidate_messages()
+    chat_history.messages
+
+    assert chat_history.table.get_item.call_count == 2
+    assert chat_history.table.get_item.call_args.kwargs["ConsistentRead"] is True
+
+
+def test_messages_read_error(mocker):
+    chat_history = _get_history(mocker)
+    chat_history.table.get_item.side_effect = ClientError(
+        {"Error": {"Code": "ProvisionedThroughputExceededException"}}, "GetItem"
+    )
+
+    assert chat_history.messages == []
+    assert chat_history.stored_messages is None
+
+
+def test_update_summary_keeps_a_more_recent_summary(mocker):
+    chat_history = _get_history(mocker)
+    chat_history.table.get_item.return_value["Item"].update(
+        {"Summary": "Greetings", "SummaryMessageCount": Decimal(2)}
+    )
+    chat_history.messages
+
+    assert chat_history.summary == "Greetings"
+    assert chat_history.summary_message_count == 2
+
+    assert chat_history.update_summary("New summary", 4) is True
+    kwargs = chat_history.table.update_item.call_args.kwargs
+    assert kwargs["ExpressionAttributeValues"] == {
+        ":summary": "New summary",
+        ":messageCount": 4,
+    }
+    assert "SummaryMessageCount < :messageCount" in kwargs["ConditionExpression"]
+
+    chat_history.table.update_item.side_effect = ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+    )
+    assert chat_history.update_summary("Older summary", 3) is False
@@ -0,0 +1,99 @@
+import threading
+
+from genai_core.model_providers.catalog import ModelCatalog
+
+
+def _get_catalog(mocker, ttl=300, max_staleness=0):
+    list_models = mocker.Mock(
+        side_effect=lambda: [
+            {"provider": "bedrock", "name": "model-a"},
+            {"provider": "openai", "name": "model-a"},
+            {"provider": "openai", "name": "model-b"},
+        ]
+    )
+    clock = mocker.patch("genai_core.model_providers.catalog.time.monotonic")
+    clock.return_value = 1000
+
+    return ModelCatalog(list_models, ttl, max_staleness), list_models, clock
+
+
+def test_get_models_within_the_ttl(mocker):
+    catalog, list_models, clock = _get_catalog(mocker)
+
+    models = catalog.get_models()
+    clock.return_value = 1299
+
+    assert catalog.get_models() is models
+    assert list_models.call_count == 1
+
+
+def test_get_models_after_the_ttl(mocker):
+    catalog, list_models, clock = _get_catalog(mocker)
+
+    models = catalog.get_models()
+    clock.return_value = 1300
+
+    assert catalog.get_models() is not models
+    assert list_models.call_count == 2
+
+
+def test_get_models_when_stale_refreshes_in_background(mocker):
+    catalog, list_models, clock = _get_catalog(mocker, max_staleness=60)
+    started = threading.Event()
+    thread = mocker.patch("genai_core.model_providers.catalog.threading.Thread")
+    thread.return_value.start.side_effect = started.set
+
+    models = catalog.get_models()
+    clock.return_value = 1330
+
+    assert catalog.get_models() is models
+    assert catalog.get_models() is models
+    assert started.is_set()
+    # A single refresh is started while it runs
+    assert thread.call_count == 1
+
+    thread.call_args.kwargs["target"]()
+    assert catalog.get_models() is not models
+    assert list_models.call_count == 2
+    assert not catalog.refreshing
+
+
+def test_background_refresh_failure_keeps_the_models(mocker):
+    catalog, list_models, clock = _get_catalog(mocker, max_staleness=60)
+    thread = mocker.patch("genai_core.model_providers.catalog.threading.Thread")
+
+    models = catalog.get_models()
+    clock.return_value = 1330
+    list_models.side_effect = Exception("Throttled")
+    catalog.get_models()
+    thread.call_args.kwargs["target"]()
+
+    assert not catalog.refreshing
+    assert catalog.get_models() is models
+
+
+def test_get_model_returns_the_first_model_with_the_name(mocker):
+    catalog, list_models, _ = _get_catalog(mocker)
+
+    assert catalog.get_model("model-a")["provider"] == "bedrock"
+    assert catalog.get_model("model-b")["provider"] == "openai"
+    assert catalog.get_model("model-c") is None
+    assert list_models.call_count == 1
+
+
+def test_get_model_of_a_provider(mocker):
+    catalog, list_models, _ = _get_catalog(mocker)
+
+    assert catalog.get_model("model-a", "openai")["provider"] == "openai"
+    assert catalog.get_model("model-b", "bedrock") is None
+    assert list_models.call_count == 1
+
+
+def test_get_model_after_invalidate(mocker):
+    catalog, list_models, _ = _get_catalog(mocker)
+
+    catalog.get_models()
+    catalog.invalidate()
+
+    assert catalog.get_model("model-b")["provider"] == "openai"
+    assert list_models.call_count == 2
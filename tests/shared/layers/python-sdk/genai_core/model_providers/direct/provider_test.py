@@ -113,3 +113,91 @@ def test_get_model_modalities():
         assert modalities == ["text"]
         # The parameter is passed positionally, not as a keyword argument
         mock_get_modalities.assert_called_once_with("bedrock::claude-3-sonnet")
+
+
+def test_list_all_models_lists_the_foundation_models_once(mocker):
+    import genai_core.model_providers.direct.provider as direct_provider
+
+    model = {
+        "modelId": "amazon.nova-micro-v1:0",
+        "modelName": "Nova Micro",
+        "providerName": "Amazon",
+        "inputModalities": ["TEXT"],
+        "outputModalities": ["TEXT"],
+        "responseStreamingSupported": True,
+        "inferenceTypesSupported": ["ON_DEMAND", "INFERENCE_PROFILE"],
+        "modelLifecycle": {"status": "ACTIVE"},
+    }
+    bedrock = mocker.Mock()
+    bedrock.list_foundation_models.return_value = {"modelSummaries": [model]}
+    mocker.patch("genai_core.clients.get_bedrock_client", return_value=bedrock)
+    mocker.patch.object(
+        direct_provider,
+        "_list_cross_region_inference_profiles",
+        return_value=[
+            {
+                "inferenceProfileId": "us.amazon.nova-micro-v1:0",
+                "models": [
+                    {
+                        "modelArn": "arn:aws:bedrock:us-east-1::foundation-model/"
+                        "amazon.nova-micro-v1:0"
+                    }
+                ],
+            }
+        ],
+    )
+    for source in [
+        "_list_bedrock_finetuned_models",
+        "_list_bedrock_agent_models",
+        "_list_sagemaker_models",
+        "_list_azure_openai_models",
+    ]:
+        mocker.patch.object(direct_provider, source, return_value=None)
+    mocker.patch.object(
+        direct_provider,
+        "_list_openai_models",
+        return_value=[{"provider": "openai", "name": "gpt-4o"}],
+    )
+
+    models = direct_provider._list_all_models()
+
+    assert [m["name"] for m in models] == [
+        "amazon.nova-micro-v1:0",
+        "us.amazon.nova-micro-v1:0",
+        "gpt-4o",
+    ]
+    assert bedrock.list_foundation_models.call_count == 1
+    # The profiles do not share the modalities of the foundation model
+    assert models[0]["inputModalities"] is not models[1]["inputModalities"]
+
+
+def test_list_models_returns_copies(mocker, mock_models):
+    import genai_core.model_providers.direct.provider as direct_provider
+
+    mocker.patch.object(
+        direct_provider.model_catalog, "get_models", return_value=mock_models
+    )
+
+    models = DirectModelProvider().list_models()
+    models[0]["inputModalities"].append("image")
+
+    assert models[0]["inputModalities"] == ["text", "image"]
+    assert mock_models[0]["inputModalities"] == ["text"]
+
+
+def test_get_model_by_name_uses_the_catalog(mocker, mock_models):
+    import genai_core.model_providers.direct.provider as direct_provider
+    from genai_core.models import get_model_by_name
+
+    mocker.patch("genai_core.model_providers._is_genaieh_enabled", return_value=False)
+    catalog_get_model = mocker.patch.object(
+        direct_provider.model_catalog, "get_model", return_value=mock_models[1]
+    )
+    list_models = mocker.patch.object(direct_provider.model_catalog, "get_models")
+
+    model = get_model_by_name("anthropic.claude-3-haiku")
+
+    assert model == mock_models[1]
+    assert model is not mock_models[1]
+    catalog_get_model.assert_called_once_with("claude-3-haiku", "anthropic")
+    list_models.assert_not_called()
@@ -3,7 +3,10 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
-from genai_core.model_providers.genaieh.genaieh_client import GenAIEHGatewayClient
+from genai_core.model_providers.genaieh.genaieh_client import (
+    GenAIEHGatewayClient,
+    OpenAIStreamParser,
+)
 from genai_core.model_providers.genaieh.types import (
     ApiError,
     ModelResponse,
@@ -102,7 +105,7 @@ def test_client_initialization_with_config_object():
 
 def test_get_access_token(mock_config, mock_token_response):
     """Test that get_access_token fetches and caches token"""
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         # Configure mock response
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -129,7 +132,7 @@ def test_get_access_token(mock_config, mock_token_response):
 
 def test_get_access_token_force_refresh(mock_config, mock_token_response):
     """Test that get_access_token with force_refresh gets a new token"""
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         # Configure mock response
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -153,7 +156,7 @@ def test_get_access_token_force_refresh(mock_config, mock_token_response):
 
 def test_get_access_token_error(mock_config):
     """Test that get_access_token handles errors gracefully"""
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         # Configure mock response for error
         mock_post.side_effect = requests.exceptions.RequestException("Connection error")
 
@@ -168,7 +171,7 @@ def test_get_access_token_error(mock_config):
 
 def test_get_access_token_invalid_response(mock_config):
     """Test that get_access_token handles invalid responses"""
-    with patch("requests.post") as mock_post:
+    with patch("requests.Session.post") as mock_post:
         # Configure mock response with missing token
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -187,8 +190,8 @@ def test_get_access_token_invalid_response(mock_config):
 def test_list_models(mock_config, mock_token_response, mock_models_response):
     """Test that list_application_models returns models from API"""
     with (
-        patch("requests.post") as mock_token_post,
-        patch("requests.request") as mock_request,
+        patch("requests.Session.post") as mock_token_post,
+        patch("requests.Session.request") as mock_request,
     ):
         # Configure token response
         token_response = MagicMock()
@@ -223,8 +226,8 @@ def test_list_models(mock_config, mock_token_response, mock_models_response):
 def test_list_application_models_error(mock_config, mock_token_response):
     """Test that list_application_models handles errors gracefully"""
     with (
-        patch("requests.post") as mock_token_post,
-        patch("requests.request") as mock_request,
+        patch("requests.Session.post") as mock_token_post,
+        patch("requests.Session.request") as mock_request,
     ):
         # Configure token response
         token_response = MagicMock()
@@ -248,8 +251,8 @@ def test_list_application_models_error(mock_config, mock_token_response):
 def test_make_request_success(mock_config, mock_token_response):
     """Test that _make_request successfully makes API requests"""
     with (
-        patch("requests.post") as mock_token_post,
-        patch("requests.request") as mock_request,
+        patch("requests.Session.post") as mock_token_post,
+        patch("requests.Session.request") as mock_request,
     ):
         # Configure token response
         token_response = MagicMock()
@@ -280,8 +283,8 @@ def test_make_request_success(mock_config, mock_token_response):
 def test_make_request_error(mock_config, mock_token_response):
     """Test that _make_request handles errors gracefully"""
     with (
-        patch("requests.post") as mock_token_post,
-        patch("requests.request") as mock_request,
+        patch("requests.Session.post") as mock_token_post,
+        patch("requests.Session.request") as mock_request,
     ):
         # Configure token response
         token_response = MagicMock()
@@ -306,8 +309,8 @@ def test_make_request_error(mock_config, mock_token_response):
 def test_make_request_http_error(mock_config, mock_token_response):
     """Test that _make_request handles HTTP errors gracefully"""
     with (
-        patch("requests.post") as mock_token_post,
-        patch("requests.request") as mock_request,
+        patch("requests.Session.post") as mock_token_post,
+        patch("requests.Session.request") as mock_request,
     ):
         # Configure token response
         token_response = MagicMock()
@@ -335,3 +338,148 @@ def test_make_request_http_error(mock_config, mock_token_response):
         assert result.status_code == 404
         assert result.status_code == 404
         mock_request.assert_called_once()
+
+
+def test_concurrent_callers_refresh_the_token_once(mock_config, mock_token_response):
+    """Test that a single caller refreshes an expired token"""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def post(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = mock_token_response
+        return response
+
+    with patch("requests.Session.post", side_effect=post) as mock_post:
+        client = GenAIEHGatewayClient(mock_config)
+
+        with ThreadPoolExecutor(4) as executor:
+            first = executor.submit(client.get_access_token)
+            started.wait(5)
+            others = [executor.submit(client.get_access_token) for _ in range(3)]
+            release.set()
+            tokens = [first.result()] + [other.result() for other in others]
+
+        assert tokens == ["test-access-token"] * 4
+        mock_post.assert_called_once()
+
+
+def test_requests_reuse_the_session(mock_config, mock_token_response):
+    """Test that the requests share the pooled session of the client"""
+    with (
+        patch("requests.Session.post") as mock_token_post,
+        patch("requests.Session.request") as mock_request,
+    ):
+        token_response = MagicMock()
+        token_response.status_code = 200
+        token_response.json.return_value = mock_token_response
+        mock_token_post.return_value = token_response
+        request_response = MagicMock()
+        request_response.status_code = 200
+        request_response.json.return_value = {"data": "result"}
+        mock_request.return_value = request_response
+
+        client = GenAIEHGatewayClient(mock_config)
+        client._make_request("GET", "test/endpoint")
+        client._make_request("GET", "test/endpoint")
+
+        assert mock_request.call_count == 2
+        adapter = client._session.get_adapter(mock_config["gatewayUrl"])
+        assert adapter._pool_maxsize > 1
+
+
+def test_async_requests_reuse_the_session(mock_config):
+    """Test that the async requests run on the loop and session of the client"""
+    client = GenAIEHGatewayClient(mock_config)
+    client._access_token = "test-access-token"
+    client._token_expiry = time.time() + 3600
+    sessions = []
+
+    async def request(*args, **kwargs):
+        sessions.append(client._get_async_session())
+        return {"chunks": [], "stream": True}
+
+    with patch.object(client, "_make_async_request", side_effect=request):
+        client.invoke_openai_stream_chat({})
+        client.invoke_openai_stream_chat({})
+
+    assert len(sessions) == 2
+    assert sessions[0] is sessions[1]
+    client.close()
+    assert sessions[0].closed
+
+
+def test_openai_stream_parser_handles_split_lines():
+    """Test that a line split across reads is parsed once complete"""
+    parser = OpenAIStreamParser()
+    body = (
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "lo é"}}]}\n\n'
+        'data: {"choices": [], "usage": {"total_tokens": 3}}\n\n'
+        "data: [DONE]\n\n"
+    ).encode("utf-8")
+
+    deltas = []
+    for idx in range(0, len(body), 7):
+        deltas.append(parser.feed(body[idx : idx + 7]))
+
+    assert [delta for delta in deltas if delta] == [["Hel"], ["lo é"]]
+    assert parser.usage == {"total_tokens": 3}
+    assert parser.done
+    assert parser.feed(b'data: {"choices": [{"delta": {"content": "x"}}]}\n') == []
+
+
+def test_stream_openai_chat_yields_the_deltas(mock_config):
+    """Test that stream_openai_chat yields the deltas of the response"""
+    client = GenAIEHGatewayClient(mock_config)
+    client._access_token = "test-access-token"
+    client._token_expiry = time.time() + 3600
+    response = MagicMock()
+    response.status_code = 200
+    response.iter_content.return_value = [
+        b'data: {"choices": [{"delta": {"content": "a"}}]}\ndata: {"cho',
+        b'ices": [{"delta": {"content": "b"}}]}\n',
+        b'data: {"choices": [{"delta": {"content": "c"}}]}',
+    ]
+
+    response.iter_content.return_value.append(
+        b'\ndata: {"choices": [], "usage": {"total_tokens": 3}}\n'
+    )
+    parser = OpenAIStreamParser()
+
+    with patch("requests.Session.request", return_value=response) as mock_request:
+        stream = client.stream_openai_chat({"stream": True}, parser=parser)
+
+        assert list(stream) == ["a", "b", "c"]
+        assert parser.usage == {"total_tokens": 3}
+        assert mock_request.call_args[1]["stream"] is True
+        response.close.assert_called_once()
+
+
+def test_invoke_openai_stream_chat_reads_the_stream(mock_config):
+    """Test that the chunks of the stream are parsed as the body is read"""
+    client = GenAIEHGatewayClient(mock_config)
+    client._access_token = "test-access-token"
+    client._token_expiry = time.time() + 3600
+
+    async def iter_any():
+        yield b'data: {"choices": [{"delta": {"content": "a"}}]}\ndata: {"ch'
+        yield b'oices": [{"delta": {"content": "b"}}]}\ndata: [DONE]\n'
+
+    response = MagicMock()
+    response.status = 200
+    response.content.iter_any = iter_any
+    request = MagicMock()
+    request.__aenter__.return_value = response
+
+    with patch("aiohttp.ClientSession.request", return_value=request):
+        result = client.invoke_openai_stream_chat({})
+
+    client.close()
+    assert result["chunks"] == ["a", "b"]
@@ -0,0 +1,87 @@
+import pytest
+from genai_core.registry.index import AdapterRegistry, _get_literal_prefix
+
+
+def test_get_literal_prefix():
+    assert _get_literal_prefix(r"^bedrock.anthropic.claude*") == "bedrock"
+    assert _get_literal_prefix(r"^bedrock\.cohere\.command-r.*") == (
+        "bedrock.cohere.command-r"
+    )
+    assert _get_literal_prefix(r"^openai*") == "opena"
+    assert _get_literal_prefix(r"(?i)sagemaker\.meta-LLama.*\d+b") == (
+        "sagemaker.meta-LLama"
+    )
+    assert _get_literal_prefix(r"^bedrock\.(?:bedrock_agent|Agent_.+)$") == ""
+    assert _get_literal_prefix(r"^\d+") == ""
+
+
+def test_get_adapter(mocker):
+    get_config = mocker.patch(
+        "genai_core.parameters.get_config", return_value={"genaieh": {}}
+    )
+    is_genaieh_configured = mocker.patch(
+        "genai_core.clients.is_genaieh_configured", return_value=(False, {})
+    )
+    registry = AdapterRegistry()
+    registry.register(r"^bedrock.amazon.nova-canvas*", "media")
+    registry.register(r"^bedrock.amazon.nova*", "chat")
+    registry.register(r"^bedrock.*.amazon.nova*", "profile")
+    registry.register(r"(?i)sagemaker\.mistralai-Mixtral*", "mixtral")
+    registry.register(r"^.*", "default")
+
+    assert registry.get_adapter("bedrock.amazon.nova-canvas-v1") == "media"
+    assert registry.get_adapter("bedrock.amazon.nova-pro-v1") == "chat"
+    assert registry.get_adapter("bedrock.us.amazon.nova-pro-v1") == "profile"
+    assert registry.get_adapter("SageMaker.mistralai-mixtral-8x7b") == "mixtral"
+    assert registry.get_adapter("other") == "default"
+
+    # Resolved once per config version
+    assert registry.get_adapter("bedrock.amazon.nova-pro-v1") == "chat"
+    assert is_genaieh_configured.call_count == 1
+    assert len(registry.cache) == 5
+
+    get_config.return_value = {"genaieh": {"enabled": True}}
+    assert registry.get_adapter("bedrock.amazon.nova-pro-v1") == "chat"
+    assert is_genaieh_configured.call_count == 2
+
+
+def test_get_adapter_genaieh_catalog(mocker):
+    mocker.patch("genai_core.parameters.get_config", return_value={"genaieh": {}})
+    mocker.patch("genai_core.clients.is_genaieh_configured", return_value=(True, {}))
+    clock = mocker.patch("genai_core.registry.index.time.monotonic", return_value=1)
+    mocker.patch("genai_core.registry.index.ADAPTER_CACHE_TTL", 300)
+    get_model_by_name = mocker.patch(
+        "genai_core.registry.index.get_model_by_name",
+        side_effect=[
+            None,  # The catalog could not be listed
+            {"providerModelName": "amazon.nova-pro-v1"},
+            {"providerModelName": "anthropic.claude-v3"},
+        ],
+    )
+    registry = AdapterRegistry()
+    registry.register(r"^genaieh.amazon.nova*", "nova")
+    registry.register(r"^genaieh.anthropic.claude*", "claude")
+    registry.register(r"^genaieh.*", "gateway")
+
+    # Not cached, the next request looks the model up again
+    assert registry.get_adapter("genaieh.chat") == "gateway"
+    assert len(registry.cache) == 0
+    assert registry.get_adapter("genaieh.chat") == "nova"
+    assert registry.get_adapter("genaieh.chat") == "nova"
+    assert get_model_by_name.call_count == 2
+
+    # The model is mapped again on the gateway once the entry expired
+    clock.return_value = 302
+    assert registry.get_adapter("genaieh.chat") == "claude"
+    assert get_model_by_name.call_count == 3
+
+
+def test_get_adapter_not_found(mocker):
+    mocker.patch("genai_core.parameters.get_config", return_value={})
+    mocker.patch("genai_core.clients.is_genaieh_configured", return_value=(False, {}))
+    registry = AdapterRegistry()
+    registry.register(r"^bedrock.*", "chat")
+
+    with pytest.raises(ValueError, match="not found"):
+        registry.get_adapter("openai.gpt")
+    assert len(registry.cache) == 0
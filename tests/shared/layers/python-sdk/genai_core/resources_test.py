@@ -0,0 +1,18 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from genai_core.utils.resources import get_thread_resource
+
+
+def test_get_thread_resource(mocker):
+    mocker.patch("genai_core.utils.resources.thread_resources", threading.local())
+    session = mocker.patch("boto3.session.Session")
+    session.side_effect = lambda: mocker.MagicMock()
+
+    resource = get_thread_resource("dynamodb")
+    assert get_thread_resource("dynamodb") is resource
+    assert get_thread_resource("s3") is not resource
+
+    # Each thread uses its own resource
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other = executor.submit(get_thread_resource, "dynamodb").result()
+    assert other is not resource
@@ -0,0 +1,167 @@
+import pytest
+import genai_core.sessions
+from genai_core.sessions import list_user_sessions
+from genai_core.types import CommonError
+
+
+def test_list_user_sessions(mocker):
+    table = mocker.patch("genai_core.sessions.table")
+    table.query.return_value = {
+        "Items": [
+            {"SessionId": "session1", "StartTime": "2024-01-02", "Title": "Title"},
+        ],
+        "LastEvaluatedKey": {
+            "SessionId": "session1",
+            "UserId": "userId",
+            "StartTime": "2024-01-02",
+        },
+    }
+
+    result = list_user_sessions("userId", limit=1)
+
+    assert result["items"][0]["Title"] == "Title"
+    assert result["next_token"] is not None
+    kwargs = table.query.call_args.kwargs
+    assert kwargs["ScanIndexForward"] is False
+    assert kwargs["Limit"] == 1
+    assert "ExclusiveStartKey" not in kwargs
+
+    # The token is the last key, the user of the next page is the caller
+    table.query.return_value = {"Items": []}
+    result = list_user_sessions("userId", limit=1, next_token=result["next_token"])
+
+    assert result == {"items": [], "next_token": None}
+    assert table.query.call_args.kwargs["ExclusiveStartKey"] == {
+        "SessionId": "session1",
+        "UserId": "userId",
+        "StartTime": "2024-01-02",
+    }
+
+
+def test_list_user_sessions_invalid_token(mocker):
+    mocker.patch("genai_core.sessions.table")
+
+    with pytest.raises(CommonError):
+        list_user_sessions("userId", next_token="invalid")
+    with pytest.raises(CommonError):
+        list_user_sessions("userId", next_token="e30=")
+
+
+def test_list_user_sessions_without_title(mocker):
+    table = mocker.patch("genai_core.sessions.table")
+    table.query.return_value = {
+        "Items": [
+            {"SessionId": "session1", "StartTime": "2024-01-02"},
+            {"SessionId": "session2", "StartTime": "2024-01-01"},
+        ]
+    }
+    dynamodb = mocker.patch("genai_core.sessions.dynamodb")
+    table_name = genai_core.sessions.SESSIONS_TABLE_NAME
+    dynamodb.batch_get_item.side_effect = [
+        {
+            "Responses": {
+                table_name: [
+                    {"SessionId": "session1", "History": [{"data": {"content": "Q"}}]}
+                ]
+            },
+            "UnprocessedKeys": {table_name: {"Keys": [{"SessionId": "session2"}]}},
+        },
+        {"Responses": {table_name: [{"SessionId": "session2", "History": []}]}},
+    ]
+
+    result = list_user_sessions("userId")
+
+    assert result["items"][0]["Title"] == "Q"
+    assert "Title" not in result["items"][1]
+    assert dynamodb.batch_get_item.call_count == 2
+    request = dynamodb.batch_get_item.call_args_list[0].kwargs["RequestItems"]
+    assert request[table_name]["ProjectionExpression"] == "SessionId, #history[0]"
+
+    # The title is stored, the next listings do not read the first message
+    table.update_item.assert_called_once()
+    kwargs = table.update_item.call_args.kwargs
+    assert kwargs["Key"] == {"SessionId": "session1", "UserId": "userId"}
+    assert kwargs["UpdateExpression"] == "SET Title = if_not_exists(Title, :title)"
+    assert kwargs["ExpressionAttributeValues"] == {":title": "Q"}
+
+
+def _get_session(session_id, files):
+    return {
+        "SessionId": session_id,
+        "History": [
+            {"data": {"additional_kwargs": {"images": [{"key": key} for key in files]}}}
+        ],
+    }
+
+
+def test_delete_user_sessions(mocker, monkeypatch):
+    monkeypatch.setenv("CHATBOT_FILES_BUCKET_NAME", "bucket")
+    sessions = [_get_session(f"session{idx}", [f"file{idx}"]) for idx in range(30)]
+    sessions.append({"SessionId": "session30", "History": []})
+    mocker.patch("genai_core.sessions.list_sessions_by_user_id", return_value=sessions)
+    mocker.patch("genai_core.sessions.S3_DELETE_BATCH_SIZE", 20)
+    mocker.patch("genai_core.sessions.time.sleep")
+    s3_client = mocker.patch("genai_core.sessions.s3").meta.client
+    s3_client.delete_objects.side_effect = lambda Bucket, Delete: {
+        "Errors": [
+            {"Key": o["Key"], "Code": "AccessDenied"}
+            for o in Delete["Objects"]
+            if o["Key"] == "private/userId/file0"
+        ]
+    }
+    table_name = genai_core.sessions.SESSIONS_TABLE_NAME
+    dynamodb_client = mocker.patch("genai_core.sessions.table").meta.client
+    written = []
+
+    def batch_write_item(RequestItems):
+        requests = RequestItems[table_name]
+        assert len(requests) <= 25
+        # The first item of each request is throttled once
+        if requests[0] not in written:
+            written.append(requests[0])
+            return {"UnprocessedItems": {table_name: requests[:1]}}
+        return {}
+
+    dynamodb_client.batch_write_item.side_effect = batch_write_item
+
+    result = genai_core.sessions.delete_user_sessions("userId")
+
+    assert len(result) == 31
+    assert result[0] == {"id": "session0", "deleted": False}
+    assert all(r["deleted"] for r in result[1:])
+    assert s3_client.delete_objects.call_count == 2
+    assert dynamodb_client.batch_write_item.call_count == 4
+    deleted = [
+        request["DeleteRequest"]["Key"]["SessionId"]
+        for call in dynamodb_client.batch_write_item.call_args_list
+        for request in call.kwargs["RequestItems"][table_name]
+    ]
+    # The session whose files are not deleted is kept
+    assert "session0" not in deleted
+
+
+def test_delete_session_unprocessed(mocker, monkeypatch):
+    monkeypatch.setenv("CHATBOT_FILES_BUCKET_NAME", "bucket")
+    table = mocker.patch("genai_core.sessions.table")
+    table.get_item.return_value = {"Item": _get_session("session", ["file"])}
+    mocker.patch("genai_core.sessions.time.sleep")
+    s3_client = mocker.patch("genai_core.sessions.s3").meta.client
+    s3_client.delete_objects.return_value = {}
+    table_name = genai_core.sessions.SESSIONS_TABLE_NAME
+    table.meta.client.batch_write_item.side_effect = lambda RequestItems: {
+        "UnprocessedItems": RequestItems
+    }
+
+    result = genai_core.sessions.delete_session("session", "userId")
+
+    assert result == {"id": "session", "deleted": False}
+    assert s3_client.delete_objects.call_args.kwargs["Delete"]["Objects"] == [
+        {"Key": "private/userId/file"}
+    ]
+    assert table.meta.client.batch_write_item.call_count == (
+        genai_core.sessions.DYNAMODB_BATCH_WRITE_RETRIES
+    )
+    assert (
+        table_name
+        in table.meta.client.batch_write_item.call_args.kwargs["RequestItems"]
+    )
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from genai_core.splitters import RecursiveTextSplitter, get_recursive_splitter
+
+WORDS = ["lorem", "ipsum", "\n", "\n\n", " ", "x" * 40, "\x00", "é", "\t"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_same_chunks_as_langchain(seed):
+    rng = random.Random(seed)
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 300)))
+    chunk_size = rng.choice([10, 50, 200])
+    chunk_overlap = rng.randint(0, chunk_size // 2)
+
+    expected = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=len
+    ).split_text(text)
+    expected = [chunk.replace("\x00", "\uFFFD") for chunk in expected]
+
+    splitter = RecursiveTextSplitter(chunk_size, chunk_overlap)
+    assert splitter.split_text(text) == expected
+
+
+def test_split_spans_offsets():
+    text = "First paragraph.\n\n  Second\x00 paragraph is longer.  \n\nThird."
+    spans = RecursiveTextSplitter(40, 0).split_spans(text)
+
+    assert [chunk for chunk, _, _ in spans] == [
+        "First paragraph.",
+        "Second\uFFFD paragraph is longer.",
+        "Third.",
+    ]
+    for chunk, start, end in spans:
+        assert text[start:end].replace("\x00", "\uFFFD") == chunk
+
+
+def test_get_recursive_splitter_is_cached():
+    assert get_recursive_splitter(100, 10) is get_recursive_splitter(100, 10)
+    assert get_recursive_splitter(100, 10) is not get_recursive_splitter(100, 20)
+
+
+def test_overlap_larger_than_size():
+    with pytest.raises(ValueError):
+        RecursiveTextSplitter(10, 20)
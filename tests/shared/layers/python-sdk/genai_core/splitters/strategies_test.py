@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+import genai_core.chunks
+from genai_core.splitters import (
+    get_chunking_strategy,
+    get_semantic_breakpoints,
+    list_chunking_strategies,
+    split_sentence_spans,
+)
+from genai_core.types import CommonError
+
+MARKDOWN = """# Title
+Intro.
+
+## Install
+Run the installer.
+
+```
+# not a heading
+```
+
+## Usage
+Call the function."""
+
+
+def _workspace(strategy, chunk_size=40, chunk_overlap=0):
+    return {
+        "chunking_strategy": strategy,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "embeddings_model_provider": "bedrock",
+        "embeddings_model_name": "model",
+    }
+
+
+def test_registered_strategies():
+    assert set(list_chunking_strategies()) == {
+        "recursive",
+        "markdown",
+        "sentence_window",
+        "semantic",
+    }
+
+
+def test_split_content_unsupported_strategy():
+    with pytest.raises(CommonError, match="Chunking strategy not supported"):
+        genai_core.chunks.split_content(_workspace("invalid"), "text")
+
+
+def test_markdown_strategy_splits_at_headings():
+    chunks = get_chunking_strategy("markdown")(_workspace("markdown"), MARKDOWN)
+
+    assert chunks == [
+        "# Title\nIntro.",
+        "## Install\nRun the installer.",
+        "```\n# not a heading\n```",
+        "## Usage\nCall the function.",
+    ]
+
+
+def test_markdown_strategy_merges_small_sections():
+    chunks = get_chunking_strategy("markdown")(_workspace("markdown", 1000), MARKDOWN)
+
+    assert chunks == [MARKDOWN]
+
+
+def test_split_sentence_spans():
+    content = 'One. Two! "Three?" Four\n\nFive'
+    sentences = [content[start:end] for start, end in split_sentence_spans(content)]
+
+    assert sentences == ["One.", "Two!", '"Three?"', "Four", "Five"]
+
+
+def test_sentence_window_strategy_overlaps_whole_sentences():
+    content = "Aaaa aaaa. Bbbb bbbb. Cccc cccc. Dddd dddd."
+    chunks = get_chunking_strategy("sentence_window")(
+        _workspace("sentence_window", 21, 10), content
+    )
+
+    assert chunks == [
+        "Aaaa aaaa. Bbbb bbbb.",
+        "Bbbb bbbb. Cccc cccc.",
+        "Cccc cccc. Dddd dddd.",
+    ]
+
+
+def test_get_semantic_breakpoints():
+    vectors = np.array([[1, 0], [1, 0.1], [0, 1], [0.1, 1]], dtype=np.float32)
+
+    assert get_semantic_breakpoints(vectors, 50).tolist() == [2]
+
+
+def test_semantic_strategy_groups_sentences(mocker):
+    content = "Cats purr. Cats meow. Stocks rose. Stocks fell."
+    topics = {"Cats": [1.0, 0.0], "Stocks": [0.0, 1.0]}
+    mocker.patch("genai_core.splitters.semantic.SEMANTIC_BUFFER_SIZE", 0)
+    mocker.patch("genai_core.embeddings.get_embeddings_model")
+    mocker.patch(
+        "genai_core.embeddings.generate_embeddings",
+        side_effect=lambda _, texts, __: [
+            np.sum([topics[word] for word in topics if word in text], axis=0)
+            for text in texts
+        ],
+    )
+
+    chunks = get_chunking_strategy("semantic")(_workspace("semantic", 100), content)
+
+    assert chunks == [
+        "Cats purr. Cats meow.",
+        "Stocks rose. Stocks fell.",
+    ]
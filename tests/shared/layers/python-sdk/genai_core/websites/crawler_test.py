@@ -1,4 +1,10 @@
-from genai_core.websites.crawler import parse_url
+from genai_core.websites.crawler import (
+    CrawlFrontier,
+    CrawlerEngine,
+    _get_content_hash,
+    crawl_urls,
+    parse_url,
+)
 
 
 def test_parse_url(mocker):
@@ -9,3 +15,191 @@ def test_parse_url(mocker):
     assert "Release v.4.0.7 " in reponse[0]
     assert len(reponse[1]) > 0  # Found urls from the same domain
     assert len(reponse[2]) > 0  # Found urls from a differnt domain
+
+
+def test_crawl_frontier_priority_and_dedup():
+    frontier = CrawlFrontier(
+        [
+            {"url": "https://example.com/b", "priority": 1},
+            {"url": "https://example.com/a", "priority": 0},
+        ],
+        ["https://example.com/done"],
+    )
+
+    assert frontier.push("https://example.com/done", 0) is False
+    assert frontier.push("https://example.com/a", 2) is False
+    assert frontier.push("https://example.com/c", 1) is True
+
+    assert frontier.pop() == ("https://example.com/a", 0)
+    assert frontier.to_priority_queue() == [
+        {"url": "https://example.com/b", "priority": 1},
+        {"url": "https://example.com/c", "priority": 1},
+    ]
+    assert frontier.processed_urls == [
+        "https://example.com/done",
+        "https://example.com/a",
+    ]
+
+
+def test_crawl_urls(mocker):
+    pages = {
+        "https://example.com/": '<a href="/a">a</a><a href="/b">b</a>',
+        "https://example.com/a": '<a href="/">home</a><a href="/c">c</a>',
+        "https://example.com/b": "page b",
+        "https://example.com/c": "page c",
+    }
+
+    async def fetch(session, url, headers):
+        return 200, "text/html", pages[url].encode(), None, None
+
+    mocker.patch.object(CrawlerEngine, "_fetch", side_effect=fetch)
+    mocker.patch.object(CrawlerEngine, "_get_crawl_state", return_value=None)
+    mocker.patch.object(CrawlerEngine, "_store_crawl_state")
+    store_mock = mocker.patch("genai_core.websites.crawler._store_content_on_s3")
+    mocker.patch("genai_core.chunks.split_content", return_value=["chunk"])
+    add_chunks_mock = mocker.patch("genai_core.chunks.add_chunks")
+    set_sub_documents_mock = mocker.patch("genai_core.documents.set_sub_documents")
+
+    response = crawl_urls(
+        workspace={"workspace_id": "workspace_id"},
+        document={"document_id": "document_id"},
+        priority_queue=[{"url": "https://example.com/", "priority": 0}],
+        processed_urls=[],
+        follow_links=True,
+        limit=3,
+        content_types=["text/html"],
+    )
+
+    assert len(response["processed_urls"]) == 3
+    assert len(set(response["processed_urls"])) == 3
+    assert response["processed_urls"][0] == "https://example.com/"
+    assert store_mock.call_count == 3
+    assert add_chunks_mock.call_count == 3
+    assert add_chunks_mock.call_args.kwargs["incremental"] is True
+    # Only the page not crawled yet remains in the checkpoint
+    assert response["priority_queue"] == [
+        {"url": "https://example.com/c", "priority": 2}
+    ]
+    set_sub_documents_mock.assert_called_with("workspace_id", "document_id", 3)
+
+
+def test_crawl_urls_skips_failed_urls(mocker):
+    async def fetch(session, url, headers):
+        raise Exception("Unexpected status 404")
+
+    mocker.patch.object(CrawlerEngine, "_fetch", side_effect=fetch)
+    mocker.patch.object(CrawlerEngine, "_get_crawl_state", return_value=None)
+    mocker.patch.object(CrawlerEngine, "_store_crawl_state")
+    add_chunks_mock = mocker.patch("genai_core.chunks.add_chunks")
+    mocker.patch("genai_core.documents.set_sub_documents")
+
+    response = crawl_urls(
+        workspace={"workspace_id": "workspace_id"},
+        document={"document_id": "document_id"},
+        priority_queue=[{"url": "https://example.com/", "priority": 0}],
+        processed_urls=[],
+        follow_links=True,
+        limit=3,
+        content_types=["text/html"],
+    )
+
+    assert response["processed_urls"] == ["https://example.com/"]
+    assert response["priority_queue"] == []
+    add_chunks_mock.assert_not_called()
+
+
+def test_crawl_urls_continues_when_a_page_is_not_ingested(mocker):
+    pages = {
+        "https://example.com/": '<a href="/a">a</a><a href="/b">b</a>',
+        "https://example.com/a": "page a",
+        "https://example.com/b": "page b",
+    }
+
+    async def fetch(session, url, headers):
+        return 200, "text/html", pages[url].encode(), None, None
+
+    def add_chunks(document_sub_id, path, **kwargs):
+        if path == "https://example.com/":
+            raise Exception("Throttled")
+
+    mocker.patch.object(CrawlerEngine, "_fetch", side_effect=fetch)
+    mocker.patch.object(CrawlerEngine, "_get_crawl_state", return_value=None)
+    store_state_mock = mocker.patch.object(CrawlerEngine, "_store_crawl_state")
+    mocker.patch("genai_core.websites.crawler._store_content_on_s3")
+    mocker.patch("genai_core.chunks.split_content", return_value=["chunk"])
+    mocker.patch("genai_core.chunks.add_chunks", side_effect=add_chunks)
+    mocker.patch("genai_core.documents.set_sub_documents")
+
+    response = crawl_urls(
+        workspace={"workspace_id": "workspace_id"},
+        document={"document_id": "document_id"},
+        priority_queue=[{"url": "https://example.com/", "priority": 0}],
+        processed_urls=[],
+        follow_links=True,
+        limit=10,
+        content_types=["text/html"],
+    )
+
+    # The links of the failed page are crawled, its state is not stored
+    assert len(response["processed_urls"]) == 3
+    assert store_state_mock.call_count == 2
+    stored_urls = [call.args[1]["url"] for call in store_state_mock.call_args_list]
+    assert "https://example.com/" not in stored_urls
+
+
+def test_crawl_urls_skips_unchanged_pages(mocker):
+    url = "https://example.com/"
+    state = {
+        "format_version": 1,
+        "url": url,
+        "etag": '"v1"',
+        "last_modified": "Wed, 21 Oct 2015 07:28:00 GMT",
+        "content_hash": _get_content_hash("unchanged page"),
+        "links": ["https://example.com/a"],
+        "chunks": 3,
+    }
+    states = {url: state}
+    requests_headers = {}
+
+    async def fetch(session, url, headers):
+        requests_headers[url] = headers
+        if url == "https://example.com/":
+            return 304, "", b"", None, None
+        # Same content but the server does not support conditional requests
+        return 200, "text/html", b"unchanged page", '"v2"', None
+
+    def get_crawl_state(self, document_sub_id):
+        if len(states) == 1:
+            return states.pop(url)
+        return {**state, "url": "https://example.com/a", "links": []}
+
+    mocker.patch.object(CrawlerEngine, "_fetch", side_effect=fetch)
+    mocker.patch.object(CrawlerEngine, "_get_crawl_state", get_crawl_state)
+    store_state_mock = mocker.patch.object(CrawlerEngine, "_store_crawl_state")
+    add_chunks_mock = mocker.patch("genai_core.chunks.add_chunks")
+    set_vectors_mock = mocker.patch("genai_core.documents.set_document_vectors")
+    mocker.patch("genai_core.documents.set_sub_documents")
+
+    response = crawl_urls(
+        workspace={"workspace_id": "workspace_id"},
+        document={"document_id": "document_id"},
+        priority_queue=[{"url": url, "priority": 0}],
+        processed_urls=[],
+        follow_links=True,
+        limit=10,
+        content_types=["text/html"],
+    )
+
+    assert response["processed_urls"] == [url, "https://example.com/a"]
+    assert requests_headers[url] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+    add_chunks_mock.assert_not_called()
+    # The vectors of unchanged pages are counted again
+    assert set_vectors_mock.call_count == 2
+    set_vectors_mock.assert_called_with("workspace_id", "document_id", 3, replace=False)
+    # The new ETag is stored for the next crawl
+    new_state = store_state_mock.call_args.args[1]
+    assert new_state["etag"] == '"v2"'
+    assert new_state["chunks"] == 3
@@ -0,0 +1,76 @@
+from genai_core.websites.extractors import get_html_extractor
+
+PAGE = b"""<!DOCTYPE html>
+<html>
+  <head>
+    <title>Guide</title>
+    <style>body { margin: 0 }</style>
+    <script>var tracking = true;</script>
+  </head>
+  <body>
+    <nav><a href="/docs/a">Docs A</a> <a href="/docs/b">Docs B</a></nav>
+    <main>
+      <h1>Getting   started</h1>
+      <!-- a comment -->
+      <p>Install the <b>package</b>&nbsp;first.<br>Then run it.</p>
+      <a href="https://example.org/more">Read more</a>
+      <a>No link</a>
+    </main>
+    <footer>Copyright <a href="/legal">Legal</a></footer>
+  </body>
+</html>"""
+
+
+def test_extract_lxml():
+    content, links = get_html_extractor("lxml")(PAGE)
+
+    assert content == (
+        "Guide Getting started Install the package first. Then run it. "
+        + "Read more No link"
+    )
+    assert links == ["/docs/a", "/docs/b", "https://example.org/more", "/legal"]
+
+
+def test_extract_lxml_form_page():
+    # ASP.NET WebForms pages wrap the whole body in a form
+    body = b"""<html><body><form method="post" action="./page.aspx">
+      <header><a href="/">Site</a></header>
+      <h1>Annual report</h1>
+      <p>Revenue grew.</p>
+      <aside>Note: figures are unaudited.</aside>
+    </form></body></html>"""
+
+    content, links = get_html_extractor("lxml")(body)
+
+    assert content == "Annual report Revenue grew. Note: figures are unaudited."
+    assert links == ["/"]
+
+
+def test_extract_lxml_article_header():
+    body = b"""<html><body>
+      <header>Site menu</header>
+      <article><header><h1>Release notes</h1></header><p>Fixes.</p></article>
+      <main><header>Changelog</header></main>
+    </body></html>"""
+
+    content, _ = get_html_extractor("lxml")(body)
+
+    assert content == "Release notes Fixes. Changelog"
+
+
+def test_extract_beautifulsoup():
+    content, links = get_html_extractor("beautifulsoup")(PAGE)
+
+    assert "Getting started" in content
+    assert "Docs A" in content
+    assert sorted(links) == sorted(
+        ["/docs/a", "/docs/b", "https://example.org/more", "/legal"]
+    )
+
+
+def test_extract_empty_page():
+    assert get_html_extractor("lxml")(b"") == ("", [])
+
+
+def test_get_html_extractor_fallback():
+    assert get_html_extractor("unknown") == get_html_extractor("beautifulsoup")
@@ -1,10 +1,84 @@
+import io
 import gzip
-from genai_core.websites.sitemap import decompress_gzip_data
+from datetime import datetime
+from genai_core.websites.sitemap import extract_urls_from_sitemap
 
+INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-1.xml</loc></sitemap>
+  <sitemap>
+    <loc>https://example.com/sitemap-2.xml.gz</loc>
+    <lastmod>2023-01-01</lastmod>
+  </sitemap>
+  <sitemap><loc>https://example.com/sitemap-1.xml</loc></sitemap>
+</sitemapindex>"""
 
-def test_decompress_gzip_data():
-    assert (
-        decompress_gzip_data(
-            type("obj", (object,), {"url": "url", "content": gzip.compress(b"test")})
-        )
-    ) == b"test"
+SITEMAP_1 = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/a</loc><lastmod>2024-01-01</lastmod></url>
+  <url><loc>https://example.com/b</loc><lastmod>2024-06-01T10:00:00Z</lastmod></url>
+</urlset>"""
+
+SITEMAP_2 = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc> https://example.com/b </loc></url>
+  <url><loc>https://example.com/c</loc><lastmod>yesterday</lastmod></url>
+  <url><loc>https://example.com/d</loc><lastmod>2023-12-31</lastmod></url>
+</urlset>"""
+
+
+def _mock_requests(mocker):
+    files = {
+        "https://example.com/sitemap.xml": INDEX,
+        "https://example.com/sitemap-1.xml": SITEMAP_1,
+        "https://example.com/sitemap-2.xml.gz": gzip.compress(SITEMAP_2),
+    }
+
+    def get(url, **kwargs):
+        response = mocker.MagicMock()
+        response.status_code = 200 if url in files else 404
+        response.raw = io.BytesIO(files.get(url, b""))
+        return response
+
+    return mocker.patch("requests.get", side_effect=get)
+
+
+def test_extract_urls_from_sitemap_index(mocker):
+    get_mock = _mock_requests(mocker)
+
+    urls = extract_urls_from_sitemap("https://example.com/sitemap.xml")
+
+    assert urls == [
+        "https://example.com/a",
+        "https://example.com/b",
+        "https://example.com/c",
+        "https://example.com/d",
+    ]
+    # The duplicated sub sitemap is fetched once
+    assert get_mock.call_count == 3
+
+
+def test_extract_urls_from_sitemap_limit(mocker):
+    _mock_requests(mocker)
+
+    urls = extract_urls_from_sitemap("https://example.com/sitemap-1.xml", limit=1)
+
+    assert urls == ["https://example.com/a"]
+
+
+def test_extract_urls_from_sitemap_not_found(mocker):
+    _mock_requests(mocker)
+
+    assert extract_urls_from_sitemap("https://example.com/missing.xml") == []
+
+
+def test_extract_urls_from_sitemap_modified_since(mocker):
+    _mock_requests(mocker)
+
+    urls = extract_urls_from_sitemap(
+        "https://example.com/sitemap.xml", modified_since=datetime(2024, 3, 1)
+    )
+
+    # The urls without a valid lastmod are kept, the older sub sitemap is
+    # still read
+    assert urls == ["https://example.com/b", "https://example.com/c"]
@@ -0,0 +1,136 @@
+import threading
+from unittest.mock import Mock
+from genai_core.utils.websocket import TokenCoalescer
+
+
+def _get_values(send):
+    return [
+        (
+            call.args[0]["data"]["token"]["sequenceNumber"],
+            call.args[0]["data"]["token"]["value"],
+        )
+        for call in send.call_args_list
+    ]
+
+
+def test_token_coalescer_flushes_per_interval(mocker):
+    clock = mocker.patch("genai_core.utils.websocket.time.monotonic")
+    send = mocker.Mock()
+    coalescer = TokenCoalescer("user", "session", flush_interval=0.05, send=send)
+
+    clock.return_value = 1.0
+    coalescer.add_token("Hello", run_id="run")
+    coalescer.add_token(" world")
+    clock.return_value = 1.02
+    coalescer.add_token(",")
+    clock.return_value = 1.06
+    coalescer.add_token(" how")
+    coalescer.add_token(" are you?")
+    coalescer.flush()
+    coalescer.flush()
+
+    # The first token is not delayed
+    assert _get_values(send) == [
+        (1, "Hello"),
+        (2, " world, how"),
+        (3, " are you?"),
+    ]
+    message = send.call_args_list[0].args[0]
+    assert message["action"] == "llm_new_token"
+    assert message["userId"] == "user"
+    assert message["data"]["sessionId"] == "session"
+    assert message["data"]["token"]["runId"] == "run"
+    assert "runId" not in send.call_args_list[1].args[0]["data"]["token"]
+
+
+def test_token_coalescer_flushes_per_size(mocker):
+    mocker.patch("genai_core.utils.websocket.time.monotonic", return_value=1.0)
+    send = mocker.Mock()
+    coalescer = TokenCoalescer(
+        "user", "session", flush_interval=10, flush_size=4, send=send
+    )
+
+    for token in ["a", "b", "c", "d", "e", "", "f"]:
+        coalescer.add_token(token, run_id="run")
+    coalescer.flush()
+
+    assert _get_values(send) == [(1, "a"), (2, "bcde"), (3, "f")]
+
+
+def test_token_coalescer_flushes_at_the_end_of_the_interval():
+    send = Mock()
+    sent = threading.Event()
+    send.side_effect = lambda message: sent.set()
+    coalescer = TokenCoalescer("user", "session", flush_interval=0.05, send=send)
+
+    coalescer.add_token("Hello")
+    sent.clear()
+    coalescer.add_token(" world")
+
+    # No token follows, the timer sends the buffered one
+    assert sent.wait(timeout=5)
+    assert _get_values(send) == [(1, "Hello"), (2, " world")]
+
+    coalescer.flush()
+    assert send.call_count == 2
+
+
+def test_publisher_batches_in_order(mocker):
+    import threading
+    from genai_core.utils.websocket import MessagePublisher
+
+    sns = mocker.patch("genai_core.utils.websocket.sns")
+    sns.publish_batch.return_value = {
+        "Failed": [{"Id": "1", "Code": "Throttled", "SenderFault": False}]
+    }
+    started = threading.Event()
+    release = threading.Event()
+
+    def publish(TopicArn, Message):
+        started.set()
+        release.wait(5)
+
+    sns.publish.side_effect = publish
+    publisher = MessagePublisher(max_pending=20)
+
+    # The first message is published alone, the others wait for it
+    publisher.publish("topic", "0")
+    assert started.wait(5)
+    for idx in range(1, 13):
+        publisher.publish("topic", str(idx))
+    publisher.publish("other", "13")
+    release.set()
+    publisher.flush()
+
+    batches = [
+        [e["Message"] for e in call.kwargs["PublishBatchRequestEntries"]]
+        for call in sns.publish_batch.call_args_list
+    ]
+    assert batches == [[str(idx) for idx in range(1, 11)], ["11", "12"]]
+    assert [call.kwargs["Message"] for call in sns.publish.call_args_list] == [
+        "0",
+        "2",  # Retried
+        "12",  # Retried
+        "13",
+    ]
+    assert sns.publish.call_args.kwargs["TopicArn"] == "other"
+
+
+def test_send_to_client(mocker, monkeypatch):
+    from genai_core.utils.websocket import flush_messages, send_to_client
+
+    monkeypatch.setenv("MESSAGES_TOPIC_ARN", "topic")
+    sns = mocker.patch("genai_core.utils.websocket.sns")
+    sns.publish.side_effect = Exception("Unavailable")
+
+    # A failed publish does not stop the publisher
+    send_to_client({"action": "heartbeat"})
+    flush_messages()
+    send_to_client({"action": "final_response"})
+    flush_messages()
+
+    assert sns.publish.call_count == 2
+    assert sns.publish.call_args.kwargs == {
+        "TopicArn": "topic",
+        "Message": '{"action": "final_response", "direction": "OUT"}',
+    }